@@ -0,0 +1,86 @@
+"""
+Compare the ways of turning messages into bytes.
+
+Every message of a transcript (see `generate_corpus.py`) is decoded once and then encoded
+repeatedly by
+
+* `encode+dump`: `Codec.encode(message).dump()`,
+* `dump`: `codec.dump(message)`, which reuses the scratch buffer of the codec, and
+* `encode_into`: `codec.encode_into(message, buffer)` with a `bytearray` that is reused as well.
+
+The benchmark reports the best time per message of every variant over `--repeat` runs.
+"""
+
+import argparse
+import timeit
+from pathlib import Path
+
+from imap_codec import Fragmentizer, ResponseCodec
+
+CORPUS = Path(__file__).parent / "corpus"
+
+
+def load_responses(path: Path) -> list:
+    """Decode all server responses (except greetings) of the transcripts in `path`"""
+    responses = []
+    for server in sorted(path.glob("*.server")):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(server.read_bytes())
+        first = True
+        while fragmentizer.progress() is not None:
+            if not fragmentizer.is_message_complete():
+                continue
+            if first:
+                fragmentizer.skip_message()
+                first = False
+                continue
+            responses.append(fragmentizer.decode_response())
+    if not responses:
+        raise SystemExit(
+            f"no transcripts found in {path}, run generate_corpus.py first"
+        )
+    return responses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--corpus", type=Path, default=CORPUS)
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    responses = load_responses(args.corpus)
+    codec = ResponseCodec()
+    buffer = bytearray()
+
+    def encode_dump() -> None:
+        for response in responses:
+            ResponseCodec.encode(response).dump()
+
+    def dump() -> None:
+        for response in responses:
+            codec.dump(response)
+
+    def encode_into() -> None:
+        for response in responses:
+            codec.encode_into(response, buffer)
+        buffer.clear()
+
+    variants = [
+        ("encode+dump", encode_dump),
+        ("dump", dump),
+        ("encode_into", encode_into),
+    ]
+    print(f"{len(responses)} responses, best of {args.repeat}x{args.number} runs")
+    baseline = None
+    for name, variant in variants:
+        best = min(timeit.repeat(variant, number=args.number, repeat=args.repeat))
+        per_message = best / args.number / len(responses) * 1e9
+        baseline = baseline or per_message
+        print(
+            f"{name:>12}: {per_message:8.1f} ns/message ({baseline / per_message:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Generate the synthetic IMAP transcript corpus used by `replay.py`.
+
+A transcript consists of two files: `<name>.client` holds the bytes sent by the client and
+`<name>.server` the bytes sent by the server. The generated session resembles a typical mail
+client: login, mailbox selection, fetching envelopes and bodies, flag changes, search, and append.
+Generation is deterministic for a given seed, so that the committed corpus can be reproduced.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from pathlib import Path
+
+WORDS = [
+    "lorem",
+    "ipsum",
+    "dolor",
+    "sit",
+    "amet",
+    "consectetur",
+    "adipiscing",
+    "elit",
+    "sed",
+    "do",
+    "eiusmod",
+    "tempor",
+    "incididunt",
+    "ut",
+    "labore",
+    "et",
+    "dolore",
+    "magna",
+    "aliqua",
+    "enim",
+    "ad",
+    "minim",
+    "veniam",
+    "quis",
+    "nostrud",
+    "exercitation",
+    "ullamco",
+    "laboris",
+    "nisi",
+    "aliquip",
+    "ex",
+    "ea",
+    "commodo",
+    "consequat",
+]
+NAMES = ["Alice", "Bob", "Carol", "Dave", "Eve", "Mallory", "Trent", "Peggy"]
+MONTHS = [
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+]
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+FLAGS = ["\\Seen", "\\Answered", "\\Flagged", "\\Draft", "$Forwarded"]
+
+
+def quoted(text: str) -> str:
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def literal(data: bytes) -> bytes:
+    return b"{%d}\r\n" % len(data) + data
+
+
+class Session:
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+        self.client: list[bytes] = []
+        self.server: list[bytes] = []
+        self.tag = 0
+
+    def command(self, line: bytes) -> bytes:
+        self.tag += 1
+        tag = b"A%d" % self.tag
+        self.client.append(tag + b" " + line + b"\r\n")
+        return tag
+
+    def respond(self, *responses: bytes) -> None:
+        self.server.extend(responses)
+
+    def sentence(self, words: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(words)).capitalize()
+
+    def address(self) -> tuple[str, str]:
+        name = self.rng.choice(NAMES)
+        return name, name.lower()
+
+    def address_list(self) -> str:
+        name, mailbox = self.address()
+        return f"(({quoted(name)} NIL {quoted(mailbox)} {quoted('example.org')}))"
+
+    def date(self) -> tuple[str, str]:
+        day, month = self.rng.randint(1, 28), self.rng.randrange(12)
+        year, hour, minute = (
+            self.rng.randint(2015, 2024),
+            self.rng.randrange(24),
+            self.rng.randrange(60),
+        )
+        header = f"{self.rng.choice(DAYS)}, {day} {MONTHS[month]} {year} {hour:02}:{minute:02}:00 +0000"
+        internal = f"{day:02}-{MONTHS[month]}-{year} {hour:02}:{minute:02}:00 +0000"
+        return header, internal
+
+    def body(self, subject: str) -> bytes:
+        name, mailbox = self.address()
+        header, _ = self.date()
+        lines = [
+            f"From: {name} <{mailbox}@example.org>",
+            "To: Alice <alice@example.org>",
+            f"Subject: {subject}",
+            f"Date: {header}",
+            "",
+        ]
+        lines += [
+            self.sentence(self.rng.randint(4, 14))
+            for _ in range(self.rng.randint(3, 40))
+        ]
+        return "\r\n".join(lines).encode() + b"\r\n"
+
+    def flags(self) -> str:
+        return " ".join(self.rng.sample(FLAGS, self.rng.randint(0, 3)))
+
+    def envelope(self, uid: int, subject: str) -> str:
+        header, _ = self.date()
+        sender = self.address_list()
+        return (
+            f"({quoted(header)} {quoted(subject)} {sender} {sender} {sender} "
+            f"{self.address_list()} NIL NIL NIL {quoted(f'<{uid}@example.org>')})"
+        )
+
+
+def generate(rng: random.Random, messages: int) -> tuple[bytes, bytes]:
+    session = Session(rng)
+    subjects = {
+        uid: session.sentence(rng.randint(2, 8)) for uid in range(1, messages + 1)
+    }
+    session.respond(
+        b"* OK [CAPABILITY IMAP4rev1 LITERAL+ IDLE UIDPLUS] Server ready\r\n"
+    )
+
+    tag = session.command(b"LOGIN alice " + quoted("s3cr3t p4ss").encode())
+    session.respond(tag + b" OK LOGIN completed\r\n")
+
+    tag = session.command(b"SELECT INBOX")
+    session.respond(
+        b"* FLAGS (" + " ".join(FLAGS).encode() + b")\r\n",
+        b"* %d EXISTS\r\n" % messages,
+        b"* 0 RECENT\r\n",
+        b"* OK [UIDVALIDITY 3857529045] UIDs valid\r\n",
+        b"* OK [UIDNEXT %d] Predicted next UID\r\n" % (messages + 1),
+        tag + b" OK [READ-WRITE] SELECT completed\r\n",
+    )
+
+    tag = session.command(
+        b"UID FETCH 1:* (UID FLAGS RFC822.SIZE INTERNALDATE ENVELOPE)"
+    )
+    for uid, subject in subjects.items():
+        _, internal = session.date()
+        session.respond(
+            (
+                f"* {uid} FETCH (UID {uid} FLAGS ({session.flags()}) "
+                f"RFC822.SIZE {rng.randint(500, 50000)} INTERNALDATE {quoted(internal)} "
+                f"ENVELOPE {session.envelope(uid, subject)})\r\n"
+            ).encode()
+        )
+    session.respond(tag + b" OK UID FETCH completed\r\n")
+
+    for uid in rng.sample(sorted(subjects), messages // 2):
+        tag = session.command(b"UID FETCH %d (UID BODY.PEEK[])" % uid)
+        session.respond(
+            b"* %d FETCH (UID %d BODY[] " % (uid, uid)
+            + literal(session.body(subjects[uid]))
+            + b")\r\n",
+            tag + b" OK UID FETCH completed\r\n",
+        )
+
+        if rng.random() < 0.3:
+            tag = session.command(b"UID STORE %d +FLAGS (\\Seen)" % uid)
+            session.respond(
+                b"* %d FETCH (UID %d FLAGS (\\Seen))\r\n" % (uid, uid),
+                tag + b" OK UID STORE completed\r\n",
+            )
+
+        if rng.random() < 0.2:
+            tag = session.command(b"NOOP")
+            session.respond(tag + b" OK NOOP completed\r\n")
+
+    tag = session.command(b"UID SEARCH UNSEEN")
+    unseen = sorted(rng.sample(sorted(subjects), messages // 4))
+    session.respond(
+        b"* SEARCH " + b" ".join(b"%d" % uid for uid in unseen) + b"\r\n",
+        tag + b" OK SEARCH completed\r\n",
+    )
+
+    for _ in range(3):
+        body = session.body(session.sentence(4))
+        session.tag += 1
+        tag = b"A%d" % session.tag
+        session.client.append(tag + b" APPEND Sent (\\Seen) " + literal(body) + b"\r\n")
+        session.respond(
+            b"+ Ready for literal data\r\n", tag + b" OK APPEND completed\r\n"
+        )
+
+    tag = session.command(b"LOGOUT")
+    session.respond(b"* BYE Logging out\r\n", tag + b" OK LOGOUT completed\r\n")
+
+    return b"".join(session.client), b"".join(session.server)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic IMAP transcripts")
+    parser.add_argument("--output", type=Path, default=Path(__file__).parent / "corpus")
+    parser.add_argument("--name", default="synthetic")
+    parser.add_argument(
+        "--messages", type=int, default=100, help="messages in the mailbox"
+    )
+    parser.add_argument("--seed", type=int, default=143)
+    args = parser.parse_args()
+
+    client, server = generate(random.Random(args.seed), args.messages)
+    args.output.mkdir(parents=True, exist_ok=True)
+    (args.output / f"{args.name}.client").write_bytes(client)
+    (args.output / f"{args.name}.server").write_bytes(server)
+    print(f"Wrote {len(client)} client and {len(server)} server bytes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
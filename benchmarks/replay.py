@@ -0,0 +1,233 @@
+"""
+Replay IMAP transcripts through the Python bindings and report end-to-end throughput.
+
+Every transcript of the corpus (see `generate_corpus.py`) is fed to a `Fragmentizer` in chunks,
+as if read from a socket. Every complete message is decoded, converted into a `dict` and back,
+and re-encoded. The replay reports messages per second, the p50/p99 latency per message, and the
+peak RSS of the process.
+
+Use `--min-throughput` to fail when the throughput drops below a baseline, and `--profile` to
+record a profile of the replay that includes native (Rust) frames.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from imap_codec import (
+    CommandCodec,
+    Fragmentizer,
+    GreetingCodec,
+    ResponseCodec,
+)
+
+CORPUS = Path(__file__).parent / "corpus"
+
+
+def load_corpus(path: Path) -> list[tuple[str, bytes, bytes]]:
+    """Load all `<name>.client` / `<name>.server` transcript pairs in `path`"""
+    transcripts = []
+    for client in sorted(path.glob("*.client")):
+        server = client.with_suffix(".server")
+        transcripts.append((client.stem, client.read_bytes(), server.read_bytes()))
+    if not transcripts:
+        raise SystemExit(
+            f"no transcripts found in {path}, run generate_corpus.py first"
+        )
+    return transcripts
+
+
+def process_command(fragmentizer: Fragmentizer) -> None:
+    command = fragmentizer.decode_command()
+    command = type(command).from_dict(command.as_dict())
+    CommandCodec.encode(command).dump()
+
+
+def process_response(fragmentizer: Fragmentizer) -> None:
+    response = fragmentizer.decode_response()
+    response = type(response).from_dict(response.as_dict())
+    ResponseCodec.encode(response).dump()
+
+
+def process_greeting(fragmentizer: Fragmentizer) -> None:
+    greeting = fragmentizer.decode_greeting()
+    greeting = type(greeting).from_dict(greeting.as_dict())
+    GreetingCodec.encode(greeting).dump()
+
+
+def replay(
+    data: bytes,
+    chunk_size: int,
+    process: Callable[[Fragmentizer], None],
+    first: Callable[[Fragmentizer], None] | None,
+    latencies: list[int],
+) -> None:
+    """Replay `data` and append the latency (in ns) of every message to `latencies`
+
+    The latency of a message spans from enqueuing the chunk completing it until it is processed,
+    i.e., it includes fragmentizing.
+    """
+    fragmentizer = Fragmentizer(max_message_size=None)
+    for offset in range(0, len(data), chunk_size):
+        start = time.perf_counter_ns()
+        fragmentizer.enqueue_bytes(data[offset : offset + chunk_size])
+        while fragmentizer.progress() is not None:
+            if not fragmentizer.is_message_complete():
+                continue
+            if first is not None:
+                first(fragmentizer)
+                first = None
+            else:
+                process(fragmentizer)
+            end = time.perf_counter_ns()
+            latencies.append(end - start)
+            start = end
+
+
+def peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux, but in bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def percentile(values: list[int], percent: float) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[int(percent) - 1]
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    transcripts = load_corpus(args.corpus)
+    latencies: list[int] = []
+
+    for _ in range(args.warmup):
+        for _, client, server in transcripts:
+            replay(client, args.chunk_size, process_command, None, [])
+            replay(server, args.chunk_size, process_response, process_greeting, [])
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        for _, client, server in transcripts:
+            replay(client, args.chunk_size, process_command, None, latencies)
+            replay(
+                server, args.chunk_size, process_response, process_greeting, latencies
+            )
+    elapsed = time.perf_counter() - start
+
+    return {
+        "transcripts": [name for name, _, _ in transcripts],
+        "bytes": args.iterations
+        * sum(len(client) + len(server) for _, client, server in transcripts),
+        "messages": len(latencies),
+        "seconds": elapsed,
+        "messages_per_second": len(latencies) / elapsed,
+        "p50_us": percentile(latencies, 50) / 1000,
+        "p99_us": percentile(latencies, 99) / 1000,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def profile(args: argparse.Namespace) -> None:
+    """Re-run the replay (without `--profile`) under an external profiler
+
+    Native frames are only symbolized if the extension module is built with symbols, e.g., by
+    `CARGO_PROFILE_RELEASE_STRIP=none CARGO_PROFILE_RELEASE_DEBUG=true maturin develop --release`.
+    """
+    replay_command = [
+        sys.executable,
+        __file__,
+        "--corpus",
+        str(args.corpus),
+        "--iterations",
+        str(args.iterations),
+        "--chunk-size",
+        str(args.chunk_size),
+    ]
+    if args.profile == "py-spy":
+        output = args.profile_output or "replay.speedscope.json"
+        command = [
+            "py-spy",
+            "record",
+            "--native",
+            "--format",
+            "speedscope",
+            "--output",
+            output,
+            "--",
+            *replay_command,
+        ]
+    else:
+        output = args.profile_output or "replay.perf.data"
+        # `-X perf` (Python 3.12+) lets perf attribute samples to Python functions as well
+        replay_command.insert(1, "-Xperf")
+        command = [
+            "perf",
+            "record",
+            "--call-graph",
+            "dwarf",
+            "--output",
+            output,
+            "--",
+            *replay_command,
+        ]
+    subprocess.run(command, check=True)
+    print(f"Profile written to {output}", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay IMAP transcripts")
+    parser.add_argument("--corpus", type=Path, default=CORPUS)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument(
+        "--chunk-size", type=int, default=4096, help="bytes enqueued at once"
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument(
+        "--min-throughput",
+        type=float,
+        help="fail if fewer messages per second are processed",
+    )
+    parser.add_argument("--profile", choices=["py-spy", "perf"])
+    parser.add_argument("--profile-output")
+    args = parser.parse_args()
+
+    if args.profile is not None:
+        profile(args)
+        return
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        rss = results["peak_rss_bytes"]
+        print(
+            f"{results['messages']} messages ({results['bytes']} bytes) "
+            f"in {results['seconds']:.3f} s\n"
+            f"throughput: {results['messages_per_second']:.0f} msgs/s\n"
+            f"latency:    p50 {results['p50_us']:.1f} us, p99 {results['p99_us']:.1f} us\n"
+            f"peak RSS:   {'n/a' if rss is None else f'{rss / 2**20:.1f} MiB'}"
+        )
+
+    if (
+        args.min_throughput is not None
+        and results["messages_per_second"] < args.min_throughput
+    ):
+        raise SystemExit(
+            f"throughput {results['messages_per_second']:.0f} msgs/s is below "
+            f"{args.min_throughput:.0f} msgs/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
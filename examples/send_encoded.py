@@ -0,0 +1,124 @@
+"""
+Send commands with sync literals over asyncio streams.
+
+`send_encoded` writes everything up to the data of the next sync literal at once and only awaits
+a continuation request where the protocol requires one. The demo runs a minimal server which
+requests continuations and completes every command.
+"""
+
+import asyncio
+from typing import Awaitable, Callable
+
+from imap_codec import (
+    Command,
+    CommandCodec,
+    Encoded,
+    Fragmentizer,
+    LineFragmentInfo,
+    LiteralMode,
+    MessageKind,
+    Response,
+)
+
+
+async def send_encoded(
+    writer: asyncio.StreamWriter,
+    encoded: Encoded,
+    continuation_waiter: Callable[[], Awaitable[None]],
+) -> None:
+    """Send `encoded`, awaiting `continuation_waiter` before the data of every sync literal"""
+    for index, segment in enumerate(encoded.dump_segments()):
+        if index > 0:
+            await continuation_waiter()
+        writer.write(segment)
+        await writer.drain()
+
+
+class ResponseReader:
+    """Decode responses from a stream, e.g., to await continuation requests"""
+
+    def __init__(self, reader: asyncio.StreamReader) -> None:
+        self.reader = reader
+        self.fragmentizer = Fragmentizer(max_message_size=64 * 1024)
+
+    async def next_message(self) -> None:
+        """Wait until the fragmentizer holds a complete message"""
+        while True:
+            while self.fragmentizer.progress() is not None:
+                if self.fragmentizer.is_message_complete():
+                    return
+            data = await self.reader.read(4096)
+            if not data:
+                raise ConnectionError("connection closed")
+            self.fragmentizer.enqueue_bytes(data)
+
+    async def read_response(self) -> Response:
+        await self.next_message()
+        return self.fragmentizer.decode_response()
+
+    async def wait_for_continuation(self) -> None:
+        while True:
+            await self.next_message()
+            peek = self.fragmentizer.peek_response()
+            if peek is not None and peek.kind == MessageKind.Continuation:
+                return
+            print(f"S: {self.fragmentizer.decode_response()}")
+
+
+async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Request a continuation for every sync literal and complete every command"""
+    fragmentizer = Fragmentizer(max_message_size=64 * 1024)
+    while data := await reader.read(4096):
+        fragmentizer.enqueue_bytes(data)
+        while (info := fragmentizer.progress()) is not None:
+            if fragmentizer.is_message_complete():
+                tag = fragmentizer.decode_tag()
+                writer.write(f"{tag} OK completed\r\n".encode())
+            elif (
+                isinstance(info, LineFragmentInfo)
+                and info.announcement is not None
+                and info.announcement.mode == LiteralMode.Sync
+            ):
+                writer.write(b"+ Ready for literal data\r\n")
+        await writer.drain()
+    writer.close()
+
+
+def literal(data: bytes) -> dict:
+    return {
+        "type": "String",
+        "content": {"type": "Literal", "content": {"data": list(data), "mode": "Sync"}},
+    }
+
+
+async def main() -> None:
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    responses = ResponseReader(reader)
+
+    command = Command.from_dict(
+        {
+            "tag": "A1",
+            "body": {
+                "type": "Login",
+                "content": {
+                    "username": literal(b"alice"),
+                    "password": literal(b"secret"),
+                },
+            },
+        }
+    )
+    encoded = CommandCodec.encode(command)
+    await send_encoded(writer, encoded, responses.wait_for_continuation)
+    print(f"S: {await responses.read_response()}")
+
+    writer.close()
+    await writer.wait_closed()
+    server.close()
+    await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
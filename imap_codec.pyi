@@ -1,6 +1,19 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple, Union
+from array import array
+from typing import (
+    AbstractSet,
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
 
 class DecodeError(Exception):
     """
@@ -25,6 +38,80 @@ class DecodeLiteralFound(DecodeError):
     The decoder stopped at the beginning of literal data.
     """
 
+class DecodeStatus:
+    """
+    Status of a non-raising decode, see `DecodeResult`.
+
+    - Ok: A message was decoded.
+    - Incomplete: More data is needed (see `DecodeIncomplete`).
+    - LiteralFound: The decoder stopped at the beginning of literal data (see `DecodeLiteralFound`).
+    - Failed: Decoding failed (see `DecodeFailed`).
+    - DecodingRemainder: Not all bytes of the message were used (see
+      `FragmentizerDecodingRemainderError`).
+    - MessageTooLong: Max message size was exceeded (see `FragmentizerMessageTooLongError`).
+    - MessagePoisoned: The message was poisoned (see `FragmentizerMessagePoisonedError`).
+    """
+
+    Ok: DecodeStatus
+    Incomplete: DecodeStatus
+    LiteralFound: DecodeStatus
+    Failed: DecodeStatus
+    DecodingRemainder: DecodeStatus
+    MessageTooLong: DecodeStatus
+    MessagePoisoned: DecodeStatus
+
+class DecodeResult:
+    """
+    Result of a non-raising decode, e.g. by `ResponseCodec.try_decode`.
+
+    Creating and raising exceptions is expensive compared to decoding. When partial reads are
+    common, checking `status` avoids this cost. A result is truthy if a message was decoded.
+    """
+
+    @property
+    def status(self) -> DecodeStatus:
+        """
+        Get the status of the decode
+        """
+
+    @property
+    def consumed(self) -> int:
+        """
+        Get the number of bytes the message was decoded from
+
+        :return: Number of bytes, `0` if no message was decoded
+        """
+
+    @property
+    def message(
+        self,
+    ) -> Optional[Union[Greeting, Command, AuthenticateData, Response, IdleDone]]:
+        """
+        Get the decoded message
+
+        :return: Decoded message, `None` if no message was decoded
+        """
+
+    @property
+    def details(self) -> Optional[dict]:
+        """
+        Get the details of the decoding error
+
+        :return: Dictionary that is passed to the corresponding exception, `None` if there is none
+        """
+
+    @property
+    def raw(self) -> Optional[bytes]:
+        """
+        Get the bytes of the message that was not decoded
+
+        Only retained by `FragmentizerPool`, e.g., to decode the message with another codec.
+
+        :return: Bytes of the message, `None` if a message was decoded or its bytes were not kept
+        """
+
+    def __bool__(self) -> bool: ...
+
 class LiteralMode:
     """
     Literal mode, i.e., sync or non-sync.
@@ -91,6 +178,98 @@ class LiteralFragment:
         :return: Literal mode
         """
 
+class FileLiteral:
+    """
+    Literal whose data is read from a file by the writer, see `Encoded.attach_literals`.
+
+    The codec only produces the framing around the literal. The writer sends the data itself, e.g.,
+    using `os.sendfile(socket.fileno(), literal.fd, literal.offset, literal.length)`.
+    """
+
+    def __init__(
+        self, fd: int, offset: int, length: int, mode: LiteralMode = LiteralMode.Sync
+    ) -> None:
+        """
+        Create a file literal from `length` bytes at `offset` in file descriptor `fd`
+
+        :param fd: File descriptor the data is read from
+        :param offset: Offset of the data in the file
+        :param length: Length of the data
+        :param mode: Literal mode
+        """
+
+    @property
+    def fd(self) -> int:
+        """
+        Get file descriptor of file literal
+        """
+
+    @property
+    def offset(self) -> int:
+        """
+        Get offset of file literal data in its file
+        """
+
+    @property
+    def length(self) -> int:
+        """
+        Get length of file literal data
+        """
+
+    @property
+    def mode(self) -> LiteralMode:
+        """
+        Get literal mode of file literal
+        """
+
+class StreamLiteral:
+    """
+    Literal whose data is produced lazily while sending, see `Encoded.attach_literals`.
+
+    Iterating over a stream literal yields its data as `bytes` chunks, so that huge literals, e.g.,
+    of an APPEND command, are never held in memory as a whole.
+    """
+
+    def __init__(
+        self,
+        source: Union[BinaryIO, Iterable[bytes]],
+        length: int,
+        mode: LiteralMode = LiteralMode.Sync,
+        *,
+        chunk_size: int = 65536,
+    ) -> None:
+        """
+        Create a stream literal of `length` bytes read from `source`
+
+        :param source: Object with a `read(size)` method, e.g., a file opened in binary mode, or an
+                       iterable of `bytes` chunks
+        :param length: Length of the data, the source must provide exactly this number of bytes
+        :param mode: Literal mode
+        :param chunk_size: Maximum number of bytes read from a file object per chunk
+        :raises ValueError: `chunk_size` is not positive
+        """
+
+    @property
+    def length(self) -> int:
+        """
+        Get length of stream literal data
+        """
+
+    @property
+    def mode(self) -> LiteralMode:
+        """
+        Get literal mode of stream literal
+        """
+
+    def __iter__(self) -> StreamLiteral: ...
+    def __next__(self) -> bytes:
+        """
+        Read the next chunk of data from the source.
+
+        :raises ValueError: The source provided less or more than `length` bytes
+        :raises TypeError: The source provided an object that is not `bytes`
+        """
+
 class Encoded:
     """
     An encoded message.
@@ -102,10 +281,71 @@ class Encoded:
     """
 
     def __iter__(self) -> Encoded: ...
-    def __next__(self) -> Union[LineFragment, LiteralFragment]: ...
+    def __next__(
+        self,
+    ) -> Union[LineFragment, LiteralFragment, FileLiteral, StreamLiteral]: ...
     def dump(self) -> bytes:
         """
         Dump the (remaining) encoded data without being guided by fragments.
+
+        :raises ValueError: Literals were attached using `attach_literals`
+        """
+
+    def dump_into(self, buffer: bytearray) -> int:
+        """
+        Append the (remaining) encoded data to `buffer` without being guided by fragments.
+
+        :param buffer: Buffer the encoded data is appended to
+        :raises ValueError: Literals were attached using `attach_literals`
+        :return: Number of bytes appended
+        """
+
+    def dump_segments(self) -> List[bytes]:
+        """
+        Dump the (remaining) encoded data in segments, split before the data of every sync
+        literal.
+
+        Every segment can be sent in a single write. Before sending the next segment, a
+        continuation request must be awaited, e.g.:
+
+        ```python
+        for index, segment in enumerate(encoded.dump_segments()):
+            if index > 0:
+                await wait_for_continuation()
+            writer.write(segment)
+        ```
+
+        Non-sync literals do not require a continuation request and are not split off. The first
+        segment is empty if the remaining data starts with the data of a sync literal.
+
+        :raises ValueError: Literals were attached using `attach_literals`
+        :return: Segments, at least one unless all data was already consumed
+        """
+
+    def attach_literals(
+        self, literals: Iterable[Union[FileLiteral, StreamLiteral]]
+    ) -> None:
+        """
+        Replace the empty literals of the (remaining) encoded data by `literals`, in order.
+
+        This allows to encode a message whose literal data is not held in memory: The message is
+        created with empty placeholder literals, e.g., `{"data": [], "mode": "Sync"}`, and the
+        attached literals are yielded in their place when iterating. The announcements of the
+        placeholders are updated to the length and mode of the attached literals.
+
+        :param literals: One literal for every empty literal
+        :raises TypeError: `literals` contains an unsupported object
+        :raises ValueError: The number of `literals` does not match the number of empty literals
+        """
+
+    def set_line_ending(self, line_ending: LineEnding) -> None:
+        """
+        End the lines of the (remaining) encoded data with `line_ending`.
+
+        Encoders always emit CRLF, `LineEnding.Lf` is meant for testing peers that accept relaxed
+        line endings. The data of literals is not changed.
+
+        :param line_ending: Line ending of all line fragments
         """
 
 class Greeting:
@@ -132,31 +372,235 @@ class Greeting:
         :return: Dictionary representation of greeting
         """
 
+    @staticmethod
+    def from_json(json: bytes) -> Greeting:
+        """
+        Create greeting from JSON
+
+        :param json: JSON representation of greeting, as returned by `to_json`
+        :raises ValueError: JSON could not be deserialized into greeting
+        """
+
+    def to_json(self) -> bytes:
+        """
+        Return greeting as JSON
+
+        Serializes directly from the underlying Rust type, i.e., without creating an intermediate
+        `dict`. The JSON representation equals the `dict` representation.
+
+        :return: UTF-8 encoded JSON representation of greeting
+        """
+
+    @staticmethod
+    def from_msgpack(msgpack: bytes) -> Greeting:
+        """
+        Create greeting from MessagePack
+
+        :param msgpack: MessagePack representation of greeting, as returned by `to_msgpack`
+        :raises ValueError: MessagePack could not be deserialized into greeting
+        """
+
+    def to_msgpack(self) -> bytes:
+        """
+        Return greeting as MessagePack
+
+        Like `to_json`, but with MessagePack encoding. Structs are encoded as maps.
+
+        :return: MessagePack representation of greeting
+        """
+
+    @property
+    def raw(self) -> Optional[bytes]:
+        """
+        Get the original bytes of the greeting
+
+        The original bytes are retained when decoding with `keep_raw`. They are not taken into
+        account when comparing greetings.
+
+        :return: Original bytes or `None` if not retained
+        """
+
+    def __sizeof__(self) -> int:
+        """
+        Estimate the memory held by the greeting
+
+        Includes nested fields and original bytes. The estimate is derived from the structure of
+        the greeting, e.g. padding and spare capacity are not taken into account.
+
+        :return: Estimated size in bytes
+        """
+
 class GreetingCodec:
     """
     Codec for greetings.
+
+    `decode` and `encode` can be called on the class directly. Instances additionally provide
+    `encode_into` and `dump`, which reuse a scratch buffer owned by the instance. Instances can be
+    shared between threads.
     """
 
+    def __init__(self, *, retain_capacity: int = 4096) -> None:
+        """
+        Create codec instance.
+
+        :param retain_capacity: Capacity (in bytes) the scratch buffer retains between calls
+        """
+
+    @property
+    def retain_capacity(self) -> int:
+        """
+        Get the capacity (in bytes) the scratch buffer retains between calls
+        """
+
+    @property
+    def scratch_capacity(self) -> int:
+        """
+        Get the current capacity (in bytes) of the scratch buffer, 0 while it is in use
+        """
+
     @staticmethod
-    def decode(bytes: bytes) -> Tuple[bytes, Greeting]:
+    def decode(bytes: bytes, *, keep_raw: bool = False) -> Tuple[bytes, Greeting]:
         """
         Decode greeting from given bytes.
 
         :param bytes: Given bytes
+        :param keep_raw: Retain the original bytes of the greeting (see `Greeting.raw`)
         :raises DecodeFailed: Decoding failed.
         :raises DecodeIncomplete: More data is needed.
         :return: Tuple of remaining bytes and decoded greeting
         """
 
     @staticmethod
-    def encode(greeting: Greeting) -> Encoded:
+    def try_decode(bytes: bytes, *, keep_raw: bool = False) -> DecodeResult:
+        """
+        Decode greeting from given bytes without raising on decoding errors.
+
+        :param bytes: Given bytes
+        :param keep_raw: Retain the original bytes of the greeting (see `decode`)
+        :return: Result with status `Ok`, `Incomplete`, or `Failed`
+        """
+
+    @staticmethod
+    def encode(greeting: Greeting, *, passthrough: bool = False) -> Encoded:
         """
         Encode greeting into fragments.
 
+        With `passthrough`, a greeting decoded with `keep_raw` yields its original bytes
+        instead of being re-encoded.
+
         :param greeting: Given greeting
+        :param passthrough: Use the original bytes of the greeting if retained
         :return: `Encoded` type holding fragments of encoded greeting
         """
 
+    def encode_into(
+        self, greeting: Greeting, buffer: bytearray, *, passthrough: bool = False
+    ) -> int:
+        """
+        Encode greeting and append the encoded bytes to `buffer`.
+
+        Like `Encoded.dump`, this is not guided by fragments.
+
+        :param greeting: Given greeting
+        :param buffer: Buffer to append to
+        :param passthrough: Use the original bytes of the greeting if retained
+        :return: Number of bytes written
+        """
+
+    def dump(self, greeting: Greeting, *, passthrough: bool = False) -> bytes:
+        """
+        Encode greeting into bytes without being guided by fragments.
+
+        :param greeting: Given greeting
+        :param passthrough: Use the original bytes of the greeting if retained
+        :return: Encoded greeting
+        """
+
+class SequenceSet:
+    """
+    Sequence set (or UID set), e.g. `1:100,200:*`.
+
+    The set is stored as a canonical list of ranges, i.e., numbers are never materialized unless
+    iterated over. `*` is treated as being larger than any number.
+    """
+
+    def __init__(self, sequence_set: str) -> None:
+        """
+        Create sequence set from its IMAP representation
+
+        :param sequence_set: IMAP representation, e.g. `1:100,200:*`
+        :raises ValueError: `sequence_set` is invalid
+        """
+
+    @staticmethod
+    def from_ranges(
+        ranges: Iterable[Tuple[Optional[int], Optional[int]]],
+    ) -> SequenceSet:
+        """
+        Create sequence set from inclusive `(start, end)` tuples
+
+        :param ranges: Inclusive ranges, `None` denotes `*`
+        :raises ValueError: A number is zero
+        """
+
+    @staticmethod
+    def from_numbers(numbers: Iterable[int]) -> SequenceSet:
+        """
+        Create sequence set from numbers, compressing them into ranges
+
+        :param numbers: Numbers
+        :raises ValueError: A number is zero
+        """
+
+    def ranges(self) -> List[Tuple[Optional[int], Optional[int]]]:
+        """
+        Return canonical inclusive ranges
+
+        :return: Sorted and merged `(start, end)` tuples, `None` denotes `*`
+        """
+
+    def resolve(self, largest: int) -> SequenceSet:
+        """
+        Return sequence set with `*` replaced by the largest number in use
+
+        :param largest: Largest sequence number or UID in use
+        """
+
+    def union(self, other: SequenceSet) -> SequenceSet:
+        """
+        Return union of both sequence sets
+        """
+
+    def intersection(self, other: SequenceSet) -> SequenceSet:
+        """
+        Return intersection of both sequence sets
+        """
+
+    def __or__(self, other: SequenceSet) -> SequenceSet: ...
+    def __and__(self, other: SequenceSet) -> SequenceSet: ...
+    def __contains__(self, number: int) -> bool: ...
+    def __len__(self) -> int:
+        """
+        Return number of contained numbers
+
+        :raises ValueError: Sequence set contains `*`
+        """
+
+    def __iter__(self) -> SequenceSetIterator:
+        """
+        Iterate over contained numbers in ascending order
+
+        :raises ValueError: Sequence set contains `*`
+        """
+
+class SequenceSetIterator:
+    """
+    Iterator over the numbers of a sequence set, created by `iter(sequence_set)`.
+    """
+
+    def __iter__(self) -> SequenceSetIterator: ...
+    def __next__(self) -> int: ...
+
 class Command:
     """
     Command.
@@ -167,6 +611,8 @@ class Command:
         """
         Create command from `dict`
 
+        `SequenceSet` objects are accepted in place of their dictionary representation.
+
         :param command: Dictionary representation of command
         :raises RuntimeError: Dictionary could not be deserialized into command
         """
@@ -178,127 +624,932 @@ class Command:
         :return: Dictionary representation of command
         """
 
-class CommandCodec:
-    """
-    Codec for commands.
-    """
+    @staticmethod
+    def from_json(json: bytes) -> Command:
+        """
+        Create command from JSON
+
+        :param json: JSON representation of command, as returned by `to_json`
+        :raises ValueError: JSON could not be deserialized into command
+        """
+
+    def to_json(self) -> bytes:
+        """
+        Return command as JSON
+
+        Serializes directly from the underlying Rust type, i.e., without creating an intermediate
+        `dict`. The JSON representation equals the `dict` representation.
+
+        :return: UTF-8 encoded JSON representation of command
+        """
 
     @staticmethod
-    def decode(bytes: bytes) -> Tuple[bytes, Command]:
+    def from_msgpack(msgpack: bytes) -> Command:
         """
-        Decode command from given bytes.
+        Create command from MessagePack
 
-        :param bytes: Given bytes
-        :raises DecodeFailed: Decoding failed.
-        :raises DecodeIncomplete: More data is needed.
-        :raises DecodeLiteralFound: The decoder stopped at the beginning of literal data.
-        :return: Tuple of remaining bytes and decoded command
+        :param msgpack: MessagePack representation of command, as returned by `to_msgpack`
+        :raises ValueError: MessagePack could not be deserialized into command
+        """
+
+    def to_msgpack(self) -> bytes:
+        """
+        Return command as MessagePack
+
+        Like `to_json`, but with MessagePack encoding. Structs are encoded as maps.
+
+        :return: MessagePack representation of command
+        """
+
+    @staticmethod
+    def from_dicts(commands: Iterable[dict]) -> List[Command]:
+        """
+        Create commands from `dict`s in one call
+
+        :param commands: Dictionary representations of commands
+        :raises RuntimeError: Dictionary could not be deserialized into command
+        """
+
+    @staticmethod
+    def as_dicts(commands: Sequence[Command]) -> List[dict]:
+        """
+        Return commands as `dict`s in one call
+
+        :return: Dictionary representations of commands
+        """
+
+    @staticmethod
+    def to_json_lines(commands: Sequence[Command]) -> bytes:
+        """
+        Serialize commands into JSON Lines without creating intermediate dictionaries
+
+        Every line holds the JSON representation of one command, which equals its `dict`
+        representation.
+
+        :return: UTF-8 encoded JSON Lines, each line terminated by `\\n`
+        """
+
+    @property
+    def raw(self) -> Optional[bytes]:
+        """
+        Get the original bytes of the command
+
+        The original bytes are retained when decoding with `keep_raw`. They are not taken into
+        account when comparing commands.
+
+        :return: Original bytes or `None` if not retained
+        """
+
+    @property
+    def sequence_set(self) -> Optional[SequenceSet]:
+        """
+        Get sequence set (or UID set) of FETCH, STORE, COPY, MOVE, or UID EXPUNGE command
+
+        The search keys of a SEARCH command may contain any number of sequence sets, they are not
+        taken into account.
+
+        :return: Sequence set or `None` for other commands
+        """
+
+    def __sizeof__(self) -> int:
+        """
+        Estimate the memory held by the command
+
+        Includes nested fields and original bytes. The estimate is derived from the structure of
+        the command, e.g. padding and spare capacity are not taken into account.
+
+        :return: Estimated size in bytes
+        """
+
+class CommandCodec:
+    """
+    Codec for commands.
+
+    `decode` and `encode` can be called on the class directly. Instances additionally provide
+    `encode_into` and `dump`, which reuse a scratch buffer owned by the instance. Instances can be
+    shared between threads.
+    """
+
+    def __init__(self, *, retain_capacity: int = 4096) -> None:
+        """
+        Create codec instance.
+
+        :param retain_capacity: Capacity (in bytes) the scratch buffer retains between calls
+        """
+
+    @property
+    def retain_capacity(self) -> int:
+        """
+        Get the capacity (in bytes) the scratch buffer retains between calls
+        """
+
+    @property
+    def scratch_capacity(self) -> int:
+        """
+        Get the current capacity (in bytes) of the scratch buffer, 0 while it is in use
+        """
+
+    @staticmethod
+    def decode(bytes: bytes, *, keep_raw: bool = False) -> Tuple[bytes, Command]:
+        """
+        Decode command from given bytes.
+
+        :param bytes: Given bytes
+        :param keep_raw: Retain the original bytes of the command (see `Command.raw`)
+        :raises DecodeFailed: Decoding failed.
+        :raises DecodeIncomplete: More data is needed.
+        :raises DecodeLiteralFound: The decoder stopped at the beginning of literal data.
+        :return: Tuple of remaining bytes and decoded command
+        """
+
+    @staticmethod
+    def try_decode(bytes: bytes, *, keep_raw: bool = False) -> DecodeResult:
+        """
+        Decode command from given bytes without raising on decoding errors.
+
+        :param bytes: Given bytes
+        :param keep_raw: Retain the original bytes of the command (see `decode`)
+        :return: Result with status `Ok`, `Incomplete`, `LiteralFound`, or `Failed`
+        """
+
+    @staticmethod
+    def encode(command: Command, *, passthrough: bool = False) -> Encoded:
+        """
+        Encode command into fragments.
+
+        With `passthrough`, a command decoded with `keep_raw` yields its original bytes
+        instead of being re-encoded.
+
+        :param command: Given command
+        :param passthrough: Use the original bytes of the command if retained
+        :return: `Encoded` type holding fragments of encoded command
+        """
+
+    def encode_into(
+        self, command: Command, buffer: bytearray, *, passthrough: bool = False
+    ) -> int:
+        """
+        Encode command and append the encoded bytes to `buffer`.
+
+        Like `Encoded.dump`, this is not guided by fragments.
+
+        :param command: Given command
+        :param buffer: Buffer to append to
+        :param passthrough: Use the original bytes of the command if retained
+        :return: Number of bytes written
+        """
+
+    def dump(self, command: Command, *, passthrough: bool = False) -> bytes:
+        """
+        Encode command into bytes without being guided by fragments.
+
+        :param command: Given command
+        :param passthrough: Use the original bytes of the command if retained
+        :return: Encoded command
+        """
+
+class AuthenticateData:
+    """
+    Authenticate data line
+
+    Data line used, e.g., during AUTHENTICATE.
+    """
+
+    @staticmethod
+    def from_dict(authenticate_data: dict) -> AuthenticateData:
+        """
+        Create authenticate data line from `dict`
+
+        :param authenticate_data: Dictionary representation of authenticate data line
+        :raises RuntimeError: Dictionary could not be deserialized into authenticate data line
+        """
+
+    def as_dict(self) -> dict:
+        """
+        Return authenticate data line as `dict`
+
+        :return: Dictionary representation of authenticate data line
+        """
+
+    @staticmethod
+    def from_json(json: bytes) -> AuthenticateData:
+        """
+        Create authenticate data line from JSON
+
+        :param json: JSON representation of authenticate data line, as returned by `to_json`
+        :raises ValueError: JSON could not be deserialized into authenticate data line
+        """
+
+    def to_json(self) -> bytes:
+        """
+        Return authenticate data line as JSON
+
+        Serializes directly from the underlying Rust type, i.e., without creating an intermediate
+        `dict`. The JSON representation equals the `dict` representation.
+
+        :return: UTF-8 encoded JSON representation of authenticate data line
+        """
+
+    @staticmethod
+    def from_msgpack(msgpack: bytes) -> AuthenticateData:
+        """
+        Create authenticate data line from MessagePack
+
+        :param msgpack: MessagePack representation of authenticate data line, as returned by `to_msgpack`
+        :raises ValueError: MessagePack could not be deserialized into authenticate data line
+        """
+
+    def to_msgpack(self) -> bytes:
+        """
+        Return authenticate data line as MessagePack
+
+        Like `to_json`, but with MessagePack encoding. Structs are encoded as maps.
+
+        :return: MessagePack representation of authenticate data line
+        """
+
+    @property
+    def raw(self) -> Optional[bytes]:
+        """
+        Get the original bytes of the authenticate data line
+
+        The original bytes are retained when decoding with `keep_raw`. They are not taken into
+        account when comparing authenticate data lines.
+
+        :return: Original bytes or `None` if not retained
+        """
+
+    def __sizeof__(self) -> int:
+        """
+        Estimate the memory held by the authenticate data
+
+        Includes nested fields and original bytes. The estimate is derived from the structure of
+        the authenticate data, e.g. padding and spare capacity are not taken into account.
+
+        :return: Estimated size in bytes
+        """
+
+class AuthenticateDataCodec:
+    """
+    Codec for authenticate data lines.
+
+    `decode` and `encode` can be called on the class directly. Instances additionally provide
+    `encode_into` and `dump`, which reuse a scratch buffer owned by the instance. Instances can be
+    shared between threads.
+    """
+
+    def __init__(self, *, retain_capacity: int = 4096) -> None:
+        """
+        Create codec instance.
+
+        :param retain_capacity: Capacity (in bytes) the scratch buffer retains between calls
+        """
+
+    @property
+    def retain_capacity(self) -> int:
+        """
+        Get the capacity (in bytes) the scratch buffer retains between calls
+        """
+
+    @property
+    def scratch_capacity(self) -> int:
+        """
+        Get the current capacity (in bytes) of the scratch buffer, 0 while it is in use
+        """
+
+    @staticmethod
+    def decode(
+        bytes: bytes, *, keep_raw: bool = False
+    ) -> Tuple[bytes, AuthenticateData]:
+        """
+        Decode authenticate data line from given bytes.
+
+        :param bytes: Given bytes
+        :param keep_raw: Retain the original bytes of the authenticate data line (see
+                         `AuthenticateData.raw`)
+        :raises DecodeFailed: Decoding failed.
+        :raises DecodeIncomplete: More data is needed.
+        :return: Tuple of remaining bytes and decoded authenticate data line
+        """
+
+    @staticmethod
+    def try_decode(bytes: bytes, *, keep_raw: bool = False) -> DecodeResult:
+        """
+        Decode authenticate data line from given bytes without raising on decoding errors.
+
+        :param bytes: Given bytes
+        :param keep_raw: Retain the original bytes of the authenticate data line (see `decode`)
+        :return: Result with status `Ok`, `Incomplete`, or `Failed`
+        """
+
+    @staticmethod
+    def encode(
+        authenticate_data: AuthenticateData, *, passthrough: bool = False
+    ) -> Encoded:
+        """
+        Encode authenticate data line into fragments.
+
+        With `passthrough`, an authenticate data line decoded with `keep_raw` yields its original
+        bytes instead of being re-encoded.
+
+        :param authenticate_data: Given authenticate data line
+        :param passthrough: Use the original bytes of the authenticate data line if retained
+        :return: `Encoded` type holding fragments of encoded authenticate data line
+        """
+
+    def encode_into(
+        self,
+        authenticate_data: AuthenticateData,
+        buffer: bytearray,
+        *,
+        passthrough: bool = False,
+    ) -> int:
+        """
+        Encode authenticate data line and append the encoded bytes to `buffer`.
+
+        Like `Encoded.dump`, this is not guided by fragments.
+
+        :param authenticate_data: Given authenticate data line
+        :param buffer: Buffer to append to
+        :param passthrough: Use the original bytes of the authenticate data line if retained
+        :return: Number of bytes written
+        """
+
+    def dump(
+        self, authenticate_data: AuthenticateData, *, passthrough: bool = False
+    ) -> bytes:
+        """
+        Encode authenticate data line into bytes without being guided by fragments.
+
+        :param authenticate_data: Given authenticate data line
+        :param passthrough: Use the original bytes of the authenticate data line if retained
+        :return: Encoded authenticate data line
+        """
+
+class Response:
+    """
+    Response.
+    """
+
+    @staticmethod
+    def from_dict(response: dict) -> Response:
+        """
+        Create response from `dict`
+
+        `SequenceSet` objects are accepted in place of their dictionary representation.
+
+        :param response: Dictionary representation of response
+        :raises RuntimeError: Dictionary could not be deserialized into response
+        """
+
+    def as_dict(self) -> dict:
+        """
+        Return response as `dict`
+
+        :return: Dictionary representation of response
+        """
+
+    @staticmethod
+    def from_json(json: bytes) -> Response:
+        """
+        Create response from JSON
+
+        :param json: JSON representation of response, as returned by `to_json`
+        :raises ValueError: JSON could not be deserialized into response
+        """
+
+    def to_json(self) -> bytes:
+        """
+        Return response as JSON
+
+        Serializes directly from the underlying Rust type, i.e., without creating an intermediate
+        `dict`. The JSON representation equals the `dict` representation.
+
+        :return: UTF-8 encoded JSON representation of response
+        """
+
+    @staticmethod
+    def from_msgpack(msgpack: bytes) -> Response:
+        """
+        Create response from MessagePack
+
+        :param msgpack: MessagePack representation of response, as returned by `to_msgpack`
+        :raises ValueError: MessagePack could not be deserialized into response
+        """
+
+    def to_msgpack(self) -> bytes:
+        """
+        Return response as MessagePack
+
+        Like `to_json`, but with MessagePack encoding. Structs are encoded as maps.
+
+        :return: MessagePack representation of response
+        """
+
+    @staticmethod
+    def from_dicts(responses: Iterable[dict]) -> List[Response]:
+        """
+        Create responses from `dict`s in one call
+
+        :param responses: Dictionary representations of responses
+        :raises RuntimeError: Dictionary could not be deserialized into response
+        """
+
+    @staticmethod
+    def as_dicts(responses: Sequence[Response]) -> List[dict]:
+        """
+        Return responses as `dict`s in one call
+
+        :return: Dictionary representations of responses
+        """
+
+    @staticmethod
+    def to_json_lines(responses: Sequence[Response]) -> bytes:
+        """
+        Serialize responses into JSON Lines without creating intermediate dictionaries
+
+        Every line holds the JSON representation of one response, which equals its `dict`
+        representation.
+
+        :return: UTF-8 encoded JSON Lines, each line terminated by `\\n`
+        """
+
+    @property
+    def raw(self) -> Optional[bytes]:
+        """
+        Get the original bytes of the response
+
+        The original bytes are retained when decoding with `keep_raw`. They are not taken into
+        account when comparing responses.
+
+        :return: Original bytes or `None` if not retained
+        """
+
+    def compact(self) -> CompactResponse:
+        """
+        Return response in compact form
+
+        A compact response holds the encoded bytes of the response (or its original bytes, if
+        retained) in a single buffer, which takes considerably less memory than the decoded
+        response. Use `CompactResponse.expand` to decode it again.
+
+        :return: Compact representation of response
+        """
+
+    def __sizeof__(self) -> int:
+        """
+        Estimate the memory held by the response
+
+        Includes nested fields and original bytes. The estimate is derived from the structure of
+        the response, e.g. padding and spare capacity are not taken into account.
+
+        :return: Estimated size in bytes
+        """
+
+class CompactResponse:
+    """
+    Response in compact form, as returned by `Response.compact`.
+    """
+
+    def expand(self) -> Response:
+        """
+        Decode the response
+
+        :raises ValueError: Bytes could not be decoded into a response
+        :return: Decoded response
+        """
+
+    @property
+    def data(self) -> bytes:
+        """
+        Get the encoded bytes of the response
+
+        :return: Encoded bytes
+        """
+
+    def __sizeof__(self) -> int: ...
+    def __len__(self) -> int: ...
+
+class FetchColumns:
+    """
+    FETCH responses in columnar form, one row per FETCH response.
+
+    Numeric columns are `array.array` objects, which support the buffer protocol and can be
+    wrapped without copying, e.g. using `numpy.frombuffer`. Every column is created on first
+    access, later accesses return the same object. Columns of 32-bit values use type code `"I"`,
+    or `"L"` on platforms where `"I"` has another size.
+    """
+
+    @staticmethod
+    def from_responses(responses: Iterable[Response]) -> FetchColumns:
+        """
+        Create columns from FETCH responses
+
+        :param responses: Responses, non-FETCH responses are skipped
+        :raises TypeError: An element of `responses` is not a `Response`
+        """
+
+    @property
+    def seq(self) -> array[int]:
+        """
+        Get message sequence numbers
+
+        :return: `array.array("I")` of 32-bit sequence numbers
+        """
+
+    @property
+    def uid(self) -> array[int]:
+        """
+        Get UIDs
+
+        :return: `array.array("I")` of 32-bit UIDs, `0` if UID is missing
+        """
+
+    @property
+    def size(self) -> array[int]:
+        """
+        Get RFC822 sizes
+
+        :return: `array.array("q")` of sizes, `-1` if size is missing
+        """
+
+    @property
+    def internal_date(self) -> array[int]:
+        """
+        Get internal dates
+
+        :return: `array.array("q")` of Unix timestamps, `-2**63` if date is missing
+        """
+
+    @property
+    def flags(self) -> List[Optional[List[str]]]:
+        """
+        Get flags
+
+        :return: Flags per row, `None` if flags are missing
+        """
+
+    @property
+    def modseq(self) -> array[int]:
+        """
+        Get mod-sequences (CONDSTORE, RFC 7162)
+
+        :return: `array.array("Q")` of mod-sequences, `0` if the mod-sequence is missing
+        """
+
+    def __len__(self) -> int: ...
+
+class BodyStructure:
+    """
+    Part of a BODYSTRUCTURE (RFC 3501), navigable without converting it into a `dict`.
+
+    All parts share the structure of the FETCH response they were taken from, child parts are
+    created on access. The children of a `message/rfc822` part are the parts of the encapsulated
+    message, in line with IMAP part numbers.
+    """
+
+    @staticmethod
+    def from_response(response: Response) -> Optional[BodyStructure]:
+        """
+        Take the BODYSTRUCTURE of a FETCH response
+
+        If the response has no BODYSTRUCTURE, but a BODY, the latter is used.
+
+        :param response: FETCH response
+        :return: Root part or `None` if `response` holds no body structure
+        """
+
+    def part(self, number: str) -> BodyStructure:
+        """
+        Look up a part by its part number, e.g. `"1.2.3"`
+
+        Part numbers are absolute, i.e., resolved from the root. The body of a non-multipart
+        message is part `"1"`.
+
+        :param number: Part number, as used in `BODY[<number>]`
+        :raises ValueError: `number` is not a valid part number
+        :raises KeyError: There is no part with this number
+        :return: Part
+        """
+
+    def attachments(self) -> List[BodyStructure]:
+        """
+        Return all attachments below (or at) this part in depth-first order
+
+        A non-multipart part is an attachment if its disposition is `attachment`, or if it has
+        no disposition but a filename. Attachments are not searched for further attachments.
+
+        :return: Attachment parts
+        """
+
+    def as_dict(self) -> dict:
+        """
+        Return part as `dict`
+
+        :return: Dictionary representation of part
+        """
+
+    @property
+    def parts(self) -> List[BodyStructure]:
+        """
+        Get the direct child parts
+
+        :return: Child parts, empty for non-multipart parts
+        """
+
+    @property
+    def part_number(self) -> Optional[str]:
+        """
+        Get the part number
+
+        :return: Part number or `None` for the root of a multipart message
+        """
+
+    @property
+    def is_multipart(self) -> bool: ...
+    @property
+    def is_attachment(self) -> bool: ...
+    @property
+    def media_type(self) -> str:
+        """
+        Get the lowercase media type, e.g. `"text/plain"` or `"multipart/mixed"`
+
+        :return: Media type
+        """
+
+    @property
+    def parameters(self) -> Dict[str, str]:
+        """
+        Get the content type parameters, e.g. `charset` or `boundary`
+
+        :return: Parameters with lowercase names
+        """
+
+    @property
+    def id(self) -> Optional[str]: ...
+    @property
+    def description(self) -> Optional[str]: ...
+    @property
+    def encoding(self) -> Optional[str]:
+        """
+        Get the content transfer encoding, `None` for multipart parts
+
+        :return: Content transfer encoding as sent by the server, e.g. `"BASE64"`
+        """
+
+    @property
+    def size(self) -> Optional[int]:
+        """
+        Get the size in octets, `None` for multipart parts
+
+        :return: Size in its content transfer encoding
+        """
+
+    @property
+    def lines(self) -> Optional[int]:
+        """
+        Get the number of lines of `text/*` and `message/rfc822` parts
+
+        :return: Number of lines or `None`
+        """
+
+    @property
+    def disposition(self) -> Optional[str]:
+        """
+        Get the lowercase disposition type, e.g. `"attachment"`
+
+        :return: Disposition type or `None` if not given
+        """
+
+    @property
+    def disposition_parameters(self) -> Dict[str, str]: ...
+    @property
+    def filename(self) -> Optional[str]:
+        """
+        Get the filename
+
+        :return: `filename` disposition parameter, `name` content type parameter, or `None`
+        """
+
+    @property
+    def envelope(self) -> Optional[dict]:
+        """
+        Get the envelope of a `message/rfc822` part
+
+        :return: Dictionary representation of envelope or `None` for other parts
+        """
+
+    def __len__(self) -> int: ...
+
+class CapabilitySet:
+    """
+    Capabilities announced by a server, compared case-insensitively
+    """
+
+    @staticmethod
+    def from_greeting(greeting: Greeting) -> Optional[CapabilitySet]:
+        """
+        Retrieve the capabilities of a greeting with a `CAPABILITY` response code
+
+        :param greeting: Decoded greeting
+        :return: Announced capabilities or `None` if the greeting announces none
         """
 
     @staticmethod
-    def encode(command: Command) -> Encoded:
+    def from_response(response: Response) -> Optional[CapabilitySet]:
         """
-        Encode command into fragments.
+        Retrieve the capabilities of a `CAPABILITY` response or a `CAPABILITY` response code
 
-        :param command: Given command
-        :return: `Encoded` type holding fragments of encoded command
+        :param response: Decoded response
+        :return: Announced capabilities or `None` if the response announces none
         """
 
-class AuthenticateData:
-    """
-    Authenticate data line
+    def has(self, name: str) -> bool:
+        """
+        Check if a capability was announced
 
-    Data line used, e.g., during AUTHENTICATE.
-    """
+        :param name: Capability, e.g. `"IDLE"` or `"AUTH=PLAIN"`
+        :return: Whether the capability was announced
+        """
 
-    @staticmethod
-    def from_dict(authenticate_data: dict) -> AuthenticateData:
+    def has_auth(self, mechanism: str) -> bool:
         """
-        Create authenticate data line from `dict`
+        Check if an authentication mechanism was announced
 
-        :param authenticate_data: Dictionary representation of authenticate data line
-        :raises RuntimeError: Dictionary could not be deserialized into authenticate data line
+        :param mechanism: Authentication mechanism, e.g. `"PLAIN"`
+        :return: Whether `AUTH=<mechanism>` was announced
         """
 
-    def as_dict(self) -> dict:
+    @property
+    def auth_mechanisms(self) -> List[str]: ...
+    def to_list(self) -> List[str]:
         """
-        Return authenticate data line as `dict`
+        Retrieve the capabilities in the order of their announcement
 
-        :return: Dictionary representation of authenticate data line
+        :return: List of capabilities, e.g. `["AUTH=PLAIN", "IDLE"]`
         """
 
-class AuthenticateDataCodec:
+    def __contains__(self, name: str) -> bool: ...
+    def __len__(self) -> int: ...
+
+class DecodeCache:
     """
-    Codec for authenticate data lines.
+    Cache of decoded greetings and responses keyed by their bytes
+
+    Meant for messages that are received over and over again, e.g. the greeting and `CAPABILITY`
+    response of an upstream server. Decoded messages are immutable, so every lookup returns the
+    same instance. When full, the oldest message is evicted.
     """
 
-    @staticmethod
-    def decode(bytes: bytes) -> Tuple[bytes, AuthenticateData]:
+    def __init__(self, max_entries: int = 64) -> None:
         """
-        Decode authenticate data line from given bytes.
+        Create a cache
 
-        :param bytes: Given bytes
-        :raises DecodeFailed: Decoding failed.
-        :raises DecodeIncomplete: More data is needed.
-        :return: Tuple of remaining bytes and decoded authenticate data line
+        :param max_entries: Maximum number of greetings and of responses retained, `0` disables
+                            caching
         """
 
-    @staticmethod
-    def encode(authenticate_data: AuthenticateData) -> Encoded:
+    @property
+    def max_entries(self) -> int: ...
+    def decode_greeting(self, bytes: bytes) -> Greeting:
         """
-        Encode authenticate data line into fragments.
+        Decode greeting from given bytes, or return the greeting decoded from the same bytes before
 
-        :param authenticate_data: Given authenticate data line
-        :return: `Encoded` type holding fragments of encoded authenticate data line
+        :param bytes: Complete greeting
+        :return: Decoded greeting
+        :raises DecodeError: `bytes` do not contain a valid greeting, errors are not cached
+        :raises ValueError: `bytes` contain trailing bytes after the greeting
         """
 
-class Response:
-    """
-    Response.
-    """
-
-    @staticmethod
-    def from_dict(response: dict) -> Response:
+    def decode_response(self, bytes: bytes) -> Response:
         """
-        Create response from `dict`
+        Decode response from given bytes, or return the response decoded from the same bytes before
 
-        :param response: Dictionary representation of response
-        :raises RuntimeError: Dictionary could not be deserialized into response
+        :param bytes: Complete response
+        :return: Decoded response
+        :raises DecodeError: `bytes` do not contain a valid response, errors are not cached
+        :raises ValueError: `bytes` contain trailing bytes after the response
         """
 
-    def as_dict(self) -> dict:
+    def clear(self) -> None:
         """
-        Return response as `dict`
-
-        :return: Dictionary representation of response
+        Remove all cached messages
         """
 
+    def __len__(self) -> int: ...
+
 class ResponseCodec:
     """
     Codec for responses.
+
+    `decode` and `encode` can be called on the class directly. Instances additionally provide
+    `encode_into` and `dump`, which reuse a scratch buffer owned by the instance. Instances can be
+    shared between threads.
     """
 
+    def __init__(self, *, retain_capacity: int = 4096) -> None:
+        """
+        Create codec instance.
+
+        :param retain_capacity: Capacity (in bytes) the scratch buffer retains between calls
+        """
+
+    @property
+    def retain_capacity(self) -> int:
+        """
+        Get the capacity (in bytes) the scratch buffer retains between calls
+        """
+
+    @property
+    def scratch_capacity(self) -> int:
+        """
+        Get the current capacity (in bytes) of the scratch buffer, 0 while it is in use
+        """
+
+    @overload
     @staticmethod
-    def decode(bytes: bytes) -> Tuple[bytes, Response]:
+    def decode(
+        bytes: bytes, *, fields: None = None, keep_raw: bool = False
+    ) -> Tuple[bytes, Response]:
         """
         Decode response from given bytes.
 
+        If `fields` is given, FETCH responses only retain the listed attributes, e.g.
+        `{"UID", "FLAGS"}`. Dropped attributes are never copied or converted. FETCH responses
+        without any listed attribute are skipped, i.e., `None` is returned instead.
+
         :param bytes: Given bytes
+        :param fields: Names of FETCH attributes to retain, `BODY[<section>]` retains all sections
+        :param keep_raw: Retain the original bytes of the response (see `Response.raw`)
+        :raises ValueError: `fields` contains an unknown attribute name or is combined with
+                            `keep_raw`
         :raises DecodeFailed: Decoding failed.
         :raises DecodeIncomplete: More data is needed.
         :raises DecodeLiteralFound: The decoder stopped at the beginning of literal data.
         :return: Tuple of remaining bytes and decoded response
         """
 
+    @overload
+    @staticmethod
+    def decode(
+        bytes: bytes, *, fields: AbstractSet[str], keep_raw: bool = False
+    ) -> Tuple[bytes, Optional[Response]]: ...
+    @staticmethod
+    def try_decode(
+        bytes: bytes,
+        *,
+        fields: Optional[AbstractSet[str]] = None,
+        keep_raw: bool = False,
+    ) -> DecodeResult:
+        """
+        Decode response from given bytes without raising on decoding errors.
+
+        A FETCH response skipped due to `fields` results in status `Ok` without message.
+
+        :param bytes: Given bytes
+        :param fields: Names of FETCH attributes to retain (see `decode`)
+        :param keep_raw: Retain the original bytes of the response (see `decode`)
+        :raises ValueError: `fields` contains an unknown attribute name or is combined with
+                            `keep_raw`
+        :return: Result with status `Ok`, `Incomplete`, `LiteralFound`, or `Failed`
+        """
+
     @staticmethod
-    def encode(response: Response) -> Encoded:
+    def encode(response: Response, *, passthrough: bool = False) -> Encoded:
         """
         Encode response into fragments.
 
+        With `passthrough`, a response decoded with `keep_raw` yields its original bytes instead
+        of being re-encoded.
+
         :param response: Given response
+        :param passthrough: Use the original bytes of the response if retained
         :return: `Encoded` type holding fragments of encoded response
         """
 
+    def encode_into(
+        self, response: Response, buffer: bytearray, *, passthrough: bool = False
+    ) -> int:
+        """
+        Encode response and append the encoded bytes to `buffer`.
+
+        Like `Encoded.dump`, this is not guided by fragments.
+
+        :param response: Given response
+        :param buffer: Buffer to append to
+        :param passthrough: Use the original bytes of the response if retained
+        :return: Number of bytes written
+        """
+
+    def dump(self, response: Response, *, passthrough: bool = False) -> bytes:
+        """
+        Encode response into bytes without being guided by fragments.
+
+        :param response: Given response
+        :param passthrough: Use the original bytes of the response if retained
+        :return: Encoded response
+        """
+
 class IdleDone:
     """
     Denotes the continuation data message "DONE\r\n" to end the IDLE command.
@@ -312,8 +1563,31 @@ class IdleDone:
 class IdleDoneCodec:
     """
     Codec for idle dones.
+
+    `decode` and `encode` can be called on the class directly. Instances additionally provide
+    `encode_into` and `dump`, which reuse a scratch buffer owned by the instance. Instances can be
+    shared between threads.
     """
 
+    def __init__(self, *, retain_capacity: int = 4096) -> None:
+        """
+        Create codec instance.
+
+        :param retain_capacity: Capacity (in bytes) the scratch buffer retains between calls
+        """
+
+    @property
+    def retain_capacity(self) -> int:
+        """
+        Get the capacity (in bytes) the scratch buffer retains between calls
+        """
+
+    @property
+    def scratch_capacity(self) -> int:
+        """
+        Get the current capacity (in bytes) of the scratch buffer, 0 while it is in use
+        """
+
     @staticmethod
     def decode(bytes: bytes) -> Tuple[bytes, IdleDone]:
         """
@@ -326,6 +1600,15 @@ class IdleDoneCodec:
         :return: Tuple of remaining bytes and decoded idle done
         """
 
+    @staticmethod
+    def try_decode(bytes: bytes) -> DecodeResult:
+        """
+        Decode idle done from given bytes without raising on decoding errors.
+
+        :param bytes: Given bytes
+        :return: Result with status `Ok`, `Incomplete`, or `Failed`
+        """
+
     @staticmethod
     def encode(idle_done: IdleDone) -> Encoded:
         """
@@ -335,6 +1618,25 @@ class IdleDoneCodec:
         :return: `Encoded` type holding fragments of encoded idle done
         """
 
+    def encode_into(self, idle_done: IdleDone, buffer: bytearray) -> int:
+        """
+        Encode idle done and append the encoded bytes to `buffer`.
+
+        Like `Encoded.dump`, this is not guided by fragments.
+
+        :param idle_done: Given idle done
+        :param buffer: Buffer to append to
+        :return: Number of bytes written
+        """
+
+    def dump(self, idle_done: IdleDone) -> bytes:
+        """
+        Encode idle done into bytes without being guided by fragments.
+
+        :param idle_done: Given idle done
+        :return: Encoded idle done
+        """
+
 class LineEnding:
     """
     The character sequence used for ending a line.
@@ -491,14 +1793,107 @@ class FragmentizerMessagePoisonedError(FragmentizerDecodeError):
     The message was explicitly poisoned to prevent decoding.
     """
 
+class MessageKind:
+    """
+    Kind of a message classified by `Fragmentizer.peek_command` or `Fragmentizer.peek_response`.
+
+    - Command: A command sent by the client.
+    - Tagged: A tagged status response, e.g., `A1 OK ...`.
+    - Untagged: An untagged response, e.g., `* 3 EXISTS`.
+    - Continuation: A continuation request, e.g., `+ Ready`.
+    """
+
+    Command: MessageKind
+    Tagged: MessageKind
+    Untagged: MessageKind
+    Continuation: MessageKind
+
+class MessagePeek:
+    """
+    Message classified from its first line without decoding it.
+
+    The message is not validated, i.e., decoding it might still fail.
+    """
+
+    @property
+    def kind(self) -> MessageKind:
+        """
+        Get the kind of the message
+        """
+
+    @property
+    def tag(self) -> Optional[str]:
+        """
+        Get the tag of a command or tagged response
+        """
+
+    @property
+    def name(self) -> Optional[str]:
+        """
+        Get the upper-cased name of the message
+
+        :return: Command name (e.g. `SELECT` or `UID FETCH`), response name (e.g. `EXISTS`), or
+                 status (e.g. `OK`), `None` for continuation requests
+        """
+
+    @property
+    def mailbox(self) -> Optional[str]:
+        """
+        Get the (undecoded) mailbox name the message refers to
+
+        :return: Mailbox of SELECT, EXAMINE, CREATE, DELETE, RENAME, SUBSCRIBE, UNSUBSCRIBE,
+                 STATUS, APPEND, COPY, and MOVE commands or STATUS responses, otherwise `None`
+        """
+
+    @property
+    def length(self) -> Optional[int]:
+        """
+        Get the number of bytes of the message
+
+        :return: Length in bytes, `None` while the message is incomplete
+        """
+
 class Fragmentizer:
     """
     Safely splits IMAP bytes into line and literal fragments.
+
+    A fragmentizer holds the state of a single connection and must only be used by one thread at
+    a time. Concurrent calls on the same fragmentizer are rejected with `RuntimeError` instead of
+    corrupting its state. Different fragmentizers can be used on different threads in parallel,
+    also on free-threaded Python builds.
     """
 
-    def __init__(self, max_message_size: Optional[int]) -> None:
+    def __init__(
+        self, max_message_size: Optional[int], snapshots: bool = False
+    ) -> None:
         """
         Create `Fragmentizer` with maximum message size.
+
+        :param snapshots: Enable `snapshot`, which requires keeping a copy of the current message
+        """
+
+    def snapshot(self) -> bytes:
+        """
+        Serialize the state of the fragmentizer, e.g., to migrate a connection to another process.
+
+        The snapshot contains the maximum message size, the bytes of the current message, enqueued
+        but unprocessed bytes, and whether the current message was poisoned. Bytes of a message
+        exceeding the maximum message size are not retained beyond the maximum, only their number.
+
+        :raises ValueError: Snapshots were not enabled when creating the fragmentizer
+        :return: Opaque snapshot to be passed to `restore`
+        """
+
+    @staticmethod
+    def restore(snapshot: bytes) -> Fragmentizer:
+        """
+        Create a fragmentizer from a snapshot created by `snapshot`.
+
+        Snapshots are enabled for the restored fragmentizer.
+
+        :param snapshot: Snapshot created by `snapshot`
+        :raises ValueError: `snapshot` is invalid
+        :return: Fragmentizer in the same state as the snapshotted one
         """
 
     def progress(self) -> Optional[Union[LineFragmentInfo, LiteralFragmentInfo]]:
@@ -512,10 +1907,16 @@ class Fragmentizer:
         """
 
     def fragment_bytes(
-        self, fragment_info: Union[LineFragmentInfo, LiteralFragmentInfo]
+        self,
+        fragment_info: Union[LineFragmentInfo, LiteralFragmentInfo],
+        *,
+        normalize_crlf: bool = False,
     ) -> bytes:
         """
         Return bytes for fragment of current message.
+
+        :param fragment_info: Fragment of the current message
+        :param normalize_crlf: Return a line fragment ending with `LineEnding.Lf` with CRLF
         """
 
     def is_message_complete(self) -> bool:
@@ -528,9 +1929,13 @@ class Fragmentizer:
         Return whether current message was explicitly poisoned to prevent decoding.
         """
 
-    def message_bytes(self) -> bytes:
+    def message_bytes(self, *, normalize_crlf: bool = False) -> bytes:
         """
         Return bytes of current message.
+
+        :param normalize_crlf: Return all processed lines ending with `LineEnding.Lf` with CRLF,
+                               e.g. for forwarding the message. The data of literals is not
+                               changed.
         """
 
     def is_max_message_size_exceeded(self) -> bool:
@@ -559,27 +1964,233 @@ class Fragmentizer:
         Try to decode tag for current message.
         """
 
-    def decode_greeting(self) -> Greeting:
+    def peek_command(self) -> Optional[MessagePeek]:
+        """
+        Classify current message as "command" by inspecting its first line without decoding.
+
+        :return: Classification or `None` if the first line is incomplete or malformed
+        """
+
+    def peek_response(self) -> Optional[MessagePeek]:
+        """
+        Classify current message as "response" by inspecting its first line without decoding.
+
+        :return: Classification or `None` if the first line is incomplete or malformed
+        """
+
+    def decode_greeting(self, *, keep_raw: bool = False) -> Greeting:
         """
         Try to decode current message as "greeting".
+
+        :param keep_raw: Retain the bytes of the current message (see `Greeting.raw`)
         """
 
-    def decode_command(self) -> Command:
+    def decode_command(self, *, keep_raw: bool = False) -> Command:
         """
         Try to decode current message as "command".
+
+        :param keep_raw: Retain the bytes of the current message (see `Command.raw`)
         """
 
-    def decode_authenticate_data(self) -> AuthenticateData:
+    def decode_authenticate_data(self, *, keep_raw: bool = False) -> AuthenticateData:
         """
         Try to decode current message as "authenticate data".
+
+        :param keep_raw: Retain the bytes of the current message (see `AuthenticateData.raw`)
         """
 
-    def decode_response(self) -> Response:
+    @overload
+    def decode_response(
+        self, *, fields: None = None, keep_raw: bool = False
+    ) -> Response:
         """
         Try to decode current message as "response".
+
+        If `fields` is given, FETCH responses only retain the listed attributes, and FETCH
+        responses without any of them are skipped (see `ResponseCodec.decode`).
+
+        :param keep_raw: Retain the bytes of the current message (see `Response.raw`)
+        """
+
+    @overload
+    def decode_response(
+        self, *, fields: AbstractSet[str], keep_raw: bool = False
+    ) -> Optional[Response]: ...
+    def try_decode_greeting(self, *, keep_raw: bool = False) -> DecodeResult:
+        """
+        Try to decode current message as "greeting" without raising on decoding errors.
+
+        :param keep_raw: Retain the bytes of the current message (see `Greeting.raw`)
+        """
+
+    def try_decode_command(self, *, keep_raw: bool = False) -> DecodeResult:
+        """
+        Try to decode current message as "command" without raising on decoding errors.
+
+        :param keep_raw: Retain the bytes of the current message (see `Command.raw`)
+        """
+
+    def try_decode_authenticate_data(self, *, keep_raw: bool = False) -> DecodeResult:
+        """
+        Try to decode current message as "authenticate data" without raising on decoding errors.
+
+        :param keep_raw: Retain the bytes of the current message (see `AuthenticateData.raw`)
+        """
+
+    def try_decode_response(
+        self, *, fields: Optional[AbstractSet[str]] = None, keep_raw: bool = False
+    ) -> DecodeResult:
+        """
+        Try to decode current message as "response" without raising on decoding errors.
+
+        `fields` and `keep_raw` are handled like in `decode_response`.
+        """
+
+    def try_decode_idle_done(self) -> DecodeResult:
+        """
+        Try to decode current message as "idle done" without raising on decoding errors.
+        """
+
+    def decode_fetch_columns(
+        self,
+    ) -> Tuple[FetchColumns, List[Response], Optional[DecodeResult]]:
+        """
+        Decode all complete messages as "response", collecting FETCH responses into columns.
+
+        Decoding stops at a message that can not be decoded. It stays the current message, e.g.,
+        to inspect it with `message_bytes`, and the next call continues after it. An incomplete
+        message at the end of the enqueued bytes is left for the next call.
+
+        A complete current message, e.g., after `progress` returned its last fragment, is decoded
+        first, unless it is the failure returned by the previous call.
+
+        :return: Tuple of FETCH columns, all other responses, and the result of the message that
+                 could not be decoded (or `None`)
         """
 
     def decode_idle_done(self) -> IdleDone:
         """
         Try to decode current message as "idle done".
         """
+
+class FragmentizerPool:
+    """
+    One `Fragmentizer` per connection, fed with the bytes of many connections at once.
+
+    Connections are identified by non-negative integers, e.g., socket file descriptors. A
+    connection's fragmentizer is created when its first bytes are fed. Feeding a whole batch, e.g.,
+    all readable sockets of an event loop tick, crosses the Python/Rust boundary only once.
+    """
+
+    def __init__(self, *, max_message_size: Optional[int]) -> None:
+        """
+        Create pool, every connection gets a fragmentizer with the given maximum message size.
+        """
+
+    def feed_commands(
+        self, batch: Iterable[Tuple[int, bytes]], *, keep_raw: bool = False
+    ) -> List[Tuple[int, DecodeResult]]:
+        """
+        Enqueue bytes of connections and decode all completed messages as "command".
+
+        Decoding errors of a message are reported through its `DecodeResult` and do not affect
+        other messages or connections. Errors raised while decoding a message are reported as
+        `DecodeStatus.Failed` with the exception in `details["error"]`. Results of messages that
+        were not decoded carry the message bytes in `raw`, e.g., to decode the `DONE` of `IDLE` or
+        the continuation of `AUTHENTICATE` with `IdleDoneCodec` or `AuthenticateDataCodec`.
+
+        The whole batch is validated before any bytes are enqueued.
+
+        :param batch: Tuples of connection and received bytes
+        :param keep_raw: Retain the original bytes of decoded commands (see `Command.raw`)
+        :return: Tuples of connection and decode result, in the order of `batch`
+        """
+
+    def feed_responses(
+        self,
+        batch: Iterable[Tuple[int, bytes]],
+        *,
+        fields: Optional[AbstractSet[str]] = None,
+        keep_raw: bool = False,
+    ) -> List[Tuple[int, DecodeResult]]:
+        """
+        Enqueue bytes of connections and decode all completed messages as "response".
+
+        `fields` and `keep_raw` are handled like in `Fragmentizer.decode_response`. Errors are
+        reported like in `feed_commands`.
+
+        :param batch: Tuples of connection and received bytes
+        :return: Tuples of connection and decode result, in the order of `batch`
+        """
+
+    def remove(self, connection: int) -> bool:
+        """
+        Drop the state of a connection, e.g., after it was closed.
+
+        :return: Whether the connection was known
+        """
+
+    def __contains__(self, connection: int) -> bool: ...
+    def __len__(self) -> int: ...
+
+class TagTracker:
+    """
+    Correlation of tagged responses with the commands of a pipelining client.
+
+    Every pending command is identified by its tag and associated with an arbitrary handle, e.g.,
+    a future. Tagged responses are resolved to their handle without converting them into a
+    `dict`.
+    """
+
+    def __init__(self, prefix: str = "A") -> None:
+        """
+        Create tracker issuing the tags `<prefix>1`, `<prefix>2`, ...
+
+        :param prefix: Prefix of issued tags
+        :raises ValueError: `prefix` is not allowed in a tag
+        """
+
+    def issue(self, handle: Any) -> str:
+        """
+        Issue a new tag and associate it with `handle`
+
+        Tags of explicitly registered commands are skipped.
+
+        :param handle: Object returned when the command is resolved
+        :return: Tag to be used for the command
+        """
+
+    def register(self, command: Command, handle: Any) -> None:
+        """
+        Associate the tag of an existing command with `handle`
+
+        :param command: Command sent to the server
+        :param handle: Object returned when the command is resolved
+        :raises ValueError: A command with the same tag is pending
+        """
+
+    def resolve(self, response: Response) -> Optional[Any]:
+        """
+        Remove the command completed by a tagged response and return its handle
+
+        :param response: Response received from the server
+        :raises KeyError: No command with the tag of `response` is pending
+        :return: Handle or `None` for untagged responses and continuation requests
+        """
+
+    def resolve_tag(self, tag: str) -> Any:
+        """
+        Remove the command with `tag` and return its handle
+
+        This allows to resolve a command before decoding the response, e.g., using the tag of a
+        `MessagePeek`.
+
+        :param tag: Tag of the command
+        :raises KeyError: No command with `tag` is pending
+        :return: Handle
+        """
+
+    @property
+    def prefix(self) -> str: ...
+    def __contains__(self, tag: str) -> bool: ...
+    def __len__(self) -> int: ...
@@ -0,0 +1,368 @@
+use std::{collections::HashMap, sync::Arc};
+
+use imap_codec::imap_types::{
+    body::{BasicFields, Body, BodyStructure, SpecificFields},
+    core::IString,
+    fetch::MessageDataItem,
+    response::{Data, Response},
+};
+use pyo3::{
+    exceptions::{PyKeyError, PyValueError},
+    prelude::*,
+    types::PyDict,
+};
+
+use crate::PyResponse;
+
+type Parameters = Vec<(IString<'static>, IString<'static>)>;
+
+/// Retrieve the child parts of `part` in the order of their part numbers
+///
+/// The children of an encapsulated message (`message/rfc822`) are the parts of the message, i.e.,
+/// the body of a non-multipart message is its only child.
+fn children<'a>(part: &'a BodyStructure<'static>) -> &'a [BodyStructure<'static>] {
+    match part {
+        BodyStructure::Multi { bodies, .. } => bodies.as_ref(),
+        BodyStructure::Single {
+            body:
+                Body {
+                    specific: SpecificFields::Message { body_structure, .. },
+                    ..
+                },
+            ..
+        } => match &**body_structure {
+            BodyStructure::Multi { bodies, .. } => bodies.as_ref(),
+            single => std::slice::from_ref(single),
+        },
+        BodyStructure::Single { .. } => &[],
+    }
+}
+
+fn disposition(part: &BodyStructure<'static>) -> Option<&(IString<'static>, Parameters)> {
+    let tail = match part {
+        BodyStructure::Single { extension_data, .. } => extension_data.as_ref()?.tail.as_ref(),
+        BodyStructure::Multi { extension_data, .. } => extension_data.as_ref()?.tail.as_ref(),
+    };
+    tail?.disposition.as_ref()
+}
+
+fn parameter<'a>(parameters: &'a Parameters, name: &str) -> Option<&'a IString<'static>> {
+    parameters
+        .iter()
+        .find(|(key, _)| bytes(key).eq_ignore_ascii_case(name.as_bytes()))
+        .map(|(_, value)| value)
+}
+
+fn bytes<'a>(value: &'a IString) -> &'a [u8] {
+    value.as_ref()
+}
+
+fn string(value: &IString) -> String {
+    String::from_utf8_lossy(bytes(value)).into_owned()
+}
+
+fn filename(part: &BodyStructure<'static>) -> Option<String> {
+    let from_disposition = disposition(part).and_then(|(_, params)| parameter(params, "filename"));
+    let from_type = match part {
+        BodyStructure::Single { body, .. } => parameter(&body.basic.parameter_list, "name"),
+        BodyStructure::Multi { .. } => None,
+    };
+    from_disposition.or(from_type).map(string)
+}
+
+/// A single part is an attachment if its disposition is `attachment`, or if it has no
+/// disposition but a filename
+fn is_attachment(part: &BodyStructure<'static>) -> bool {
+    match part {
+        BodyStructure::Single { .. } => match disposition(part) {
+            Some((kind, _)) => bytes(kind).eq_ignore_ascii_case(b"attachment"),
+            None => filename(part).is_some(),
+        },
+        BodyStructure::Multi { .. } => false,
+    }
+}
+
+/// Python class providing navigation through a BODYSTRUCTURE
+///
+/// All parts share the structure of the FETCH response they were taken from, a part is only
+/// identified by its path from the root. Child parts are created on access.
+#[derive(Debug, Clone)]
+#[pyclass(name = "BodyStructure", frozen)]
+pub(crate) struct PyBodyStructure {
+    root: Arc<BodyStructure<'static>>,
+    /// Indices of the children leading from the root to this part
+    path: Vec<usize>,
+    /// IMAP part number, the root of a multipart message has none
+    part_number: Option<String>,
+}
+
+impl PyBodyStructure {
+    fn new(root: Arc<BodyStructure<'static>>) -> Self {
+        let part_number = match &*root {
+            BodyStructure::Single { .. } => Some("1".to_owned()),
+            BodyStructure::Multi { .. } => None,
+        };
+        Self {
+            root,
+            path: Vec::new(),
+            part_number,
+        }
+    }
+
+    fn resolve(&self) -> &BodyStructure<'static> {
+        self.path
+            .iter()
+            .fold(&*self.root, |part, &index| &children(part)[index])
+    }
+
+    fn basic(&self) -> Option<&BasicFields<'static>> {
+        match self.resolve() {
+            BodyStructure::Single { body, .. } => Some(&body.basic),
+            BodyStructure::Multi { .. } => None,
+        }
+    }
+
+    fn child(&self, index: usize) -> Option<Self> {
+        if index >= children(self.resolve()).len() {
+            return None;
+        }
+
+        let mut path = self.path.clone();
+        path.push(index);
+        let part_number = match &self.part_number {
+            Some(part_number) => format!("{part_number}.{}", index + 1),
+            None => (index + 1).to_string(),
+        };
+        Some(Self {
+            root: self.root.clone(),
+            path,
+            part_number: Some(part_number),
+        })
+    }
+
+    fn collect_attachments(&self, attachments: &mut Vec<Self>) {
+        if is_attachment(self.resolve()) {
+            attachments.push(self.clone());
+            return;
+        }
+        for index in 0..children(self.resolve()).len() {
+            if let Some(child) = self.child(index) {
+                child.collect_attachments(attachments);
+            }
+        }
+    }
+}
+
+#[pymethods]
+impl PyBodyStructure {
+    /// Take the BODYSTRUCTURE (or BODY) of a FETCH response, return `None` if there is none
+    #[staticmethod]
+    fn from_response(response: &PyResponse) -> Option<Self> {
+        let Response::Data(Data::Fetch { items, .. }) = &response.0 else {
+            return None;
+        };
+        let items: &[MessageDataItem] = items.as_ref();
+        let body_structure = items
+            .iter()
+            .find_map(|item| match item {
+                MessageDataItem::BodyStructure(body_structure) => Some(body_structure),
+                _ => None,
+            })
+            .or_else(|| {
+                items.iter().find_map(|item| match item {
+                    MessageDataItem::Body(body_structure) => Some(body_structure),
+                    _ => None,
+                })
+            })?;
+        Some(Self::new(Arc::new(body_structure.clone())))
+    }
+
+    /// Look up a part by its (absolute) part number, e.g. `"1.2.3"`
+    fn part(&self, number: &str) -> PyResult<Self> {
+        let mut indices = Vec::new();
+        for index in number.split('.') {
+            match index.parse::<usize>() {
+                Ok(index) if index > 0 => indices.push(index - 1),
+                _ => {
+                    return Err(PyValueError::new_err(format!(
+                        "invalid part number: {number:?}"
+                    )))
+                }
+            }
+        }
+
+        let not_found = || PyKeyError::new_err(number.to_owned());
+        let mut part = Self::new(self.root.clone());
+        let mut indices = indices.into_iter();
+        // The body of a non-multipart message is part 1
+        if part.part_number.is_some() && indices.next() != Some(0) {
+            return Err(not_found());
+        }
+        for index in indices {
+            part = part.child(index).ok_or_else(not_found)?;
+        }
+        Ok(part)
+    }
+
+    /// Retrieve the direct child parts
+    #[getter]
+    fn parts(&self) -> Vec<Self> {
+        (0..children(self.resolve()).len())
+            .filter_map(|index| self.child(index))
+            .collect()
+    }
+
+    /// Retrieve all attachments below (or at) this part in depth-first order
+    ///
+    /// Attachments are not searched for further attachments.
+    fn attachments(&self) -> Vec<Self> {
+        let mut attachments = Vec::new();
+        self.collect_attachments(&mut attachments);
+        attachments
+    }
+
+    #[getter]
+    fn part_number(&self) -> Option<&str> {
+        self.part_number.as_deref()
+    }
+
+    #[getter]
+    fn is_multipart(&self) -> bool {
+        matches!(self.resolve(), BodyStructure::Multi { .. })
+    }
+
+    #[getter]
+    fn is_attachment(&self) -> bool {
+        is_attachment(self.resolve())
+    }
+
+    /// Retrieve the lowercase media type, e.g. `"text/plain"`
+    #[getter]
+    fn media_type(&self) -> String {
+        let media_type = match self.resolve() {
+            BodyStructure::Multi { subtype, .. } => format!("multipart/{}", string(subtype)),
+            BodyStructure::Single { body, .. } => match &body.specific {
+                SpecificFields::Basic { r#type, subtype } => {
+                    format!("{}/{}", string(r#type), string(subtype))
+                }
+                SpecificFields::Message { .. } => "message/rfc822".to_owned(),
+                SpecificFields::Text { subtype, .. } => format!("text/{}", string(subtype)),
+            },
+        };
+        media_type.to_ascii_lowercase()
+    }
+
+    /// Retrieve the content type parameters, names are lowercase
+    #[getter]
+    fn parameters(&self) -> HashMap<String, String> {
+        let parameters = match self.resolve() {
+            BodyStructure::Single { body, .. } => Some(&body.basic.parameter_list),
+            BodyStructure::Multi { extension_data, .. } => extension_data
+                .as_ref()
+                .map(|extension_data| &extension_data.parameter_list),
+        };
+        parameters
+            .into_iter()
+            .flatten()
+            .map(|(key, value)| (string(key).to_ascii_lowercase(), string(value)))
+            .collect()
+    }
+
+    #[getter]
+    fn id(&self) -> Option<String> {
+        self.basic()?.id.0.as_ref().map(string)
+    }
+
+    #[getter]
+    fn description(&self) -> Option<String> {
+        self.basic()?.description.0.as_ref().map(string)
+    }
+
+    #[getter]
+    fn encoding(&self) -> Option<String> {
+        self.basic()
+            .map(|basic| string(&basic.content_transfer_encoding))
+    }
+
+    #[getter]
+    fn size(&self) -> Option<u32> {
+        self.basic().map(|basic| basic.size)
+    }
+
+    /// Retrieve the number of lines of `text/*` and `message/rfc822` parts
+    #[getter]
+    fn lines(&self) -> Option<u32> {
+        match self.resolve() {
+            BodyStructure::Single { body, .. } => match &body.specific {
+                SpecificFields::Text {
+                    number_of_lines, ..
+                }
+                | SpecificFields::Message {
+                    number_of_lines, ..
+                } => Some(*number_of_lines),
+                SpecificFields::Basic { .. } => None,
+            },
+            BodyStructure::Multi { .. } => None,
+        }
+    }
+
+    /// Retrieve the lowercase disposition type, e.g. `"attachment"`
+    #[getter]
+    fn disposition(&self) -> Option<String> {
+        disposition(self.resolve()).map(|(kind, _)| string(kind).to_ascii_lowercase())
+    }
+
+    /// Retrieve the disposition parameters, names are lowercase
+    #[getter]
+    fn disposition_parameters(&self) -> HashMap<String, String> {
+        disposition(self.resolve())
+            .into_iter()
+            .flat_map(|(_, parameters)| parameters)
+            .map(|(key, value)| (string(key).to_ascii_lowercase(), string(value)))
+            .collect()
+    }
+
+    /// Retrieve the `filename` disposition parameter, or the `name` content type parameter
+    #[getter]
+    fn filename(&self) -> Option<String> {
+        filename(self.resolve())
+    }
+
+    /// Retrieve the envelope of a `message/rfc822` part as dictionary
+    #[getter]
+    fn envelope<'py>(&self, py: Python<'py>) -> PyResult<Option<Bound<'py, PyDict>>> {
+        match self.resolve() {
+            BodyStructure::Single {
+                body:
+                    Body {
+                        specific: SpecificFields::Message { envelope, .. },
+                        ..
+                    },
+                ..
+            } => Ok(Some(
+                serde_pyobject::to_pyobject(py, &**envelope)?.cast_into()?,
+            )),
+            _ => Ok(None),
+        }
+    }
+
+    /// Serialize part into dictionary
+    fn as_dict<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        Ok(serde_pyobject::to_pyobject(py, self.resolve())?.cast_into()?)
+    }
+
+    fn __len__(&self) -> usize {
+        children(self.resolve()).len()
+    }
+
+    fn __repr__(&self) -> String {
+        let part_number = match &self.part_number {
+            Some(part_number) => format!("'{part_number}'"),
+            None => "None".to_owned(),
+        };
+        format!(
+            "BodyStructure(part_number={part_number}, media_type='{}')",
+            self.media_type()
+        )
+    }
+}
@@ -0,0 +1,269 @@
+use std::{
+    collections::{HashMap, HashSet, VecDeque},
+    sync::{Mutex, MutexGuard, PoisonError},
+};
+
+use imap_codec::imap_types::response::{
+    Bye, Capability, Code, Data, Response, Status, StatusBody, Tagged,
+};
+use pyo3::{exceptions::PyValueError, prelude::*, types::PyBytes};
+
+use crate::{PyGreeting, PyGreetingCodec, PyResponse, PyResponseCodec};
+
+/// Default number of messages retained per kind by a `DecodeCache`
+const DEFAULT_MAX_ENTRIES: usize = 64;
+
+/// Python class representing the capabilities announced by a server
+///
+/// Capabilities are compared case-insensitively, e.g., `has("idle")` matches `IDLE`.
+#[derive(Debug, Clone)]
+#[pyclass(name = "CapabilitySet", frozen, eq)]
+pub(crate) struct PyCapabilitySet {
+    // Capabilities in the order of their announcement, without duplicates
+    capabilities: Vec<String>,
+    // Upper-cased capabilities for lookups
+    index: HashSet<String>,
+}
+
+impl PyCapabilitySet {
+    fn new(capabilities: &[Capability]) -> Self {
+        let mut set = Self {
+            capabilities: Vec::with_capacity(capabilities.len()),
+            index: HashSet::with_capacity(capabilities.len()),
+        };
+        for capability in capabilities {
+            let capability = capability.to_string();
+            if set.index.insert(capability.to_ascii_uppercase()) {
+                set.capabilities.push(capability);
+            }
+        }
+        set
+    }
+
+    fn from_code(code: Option<&Code>) -> Option<Self> {
+        match code {
+            Some(Code::Capability(capabilities)) => Some(Self::new(capabilities.as_ref())),
+            _ => None,
+        }
+    }
+}
+
+// Sets announcing the same capabilities in a different order are equal
+impl PartialEq for PyCapabilitySet {
+    fn eq(&self, other: &Self) -> bool {
+        self.index == other.index
+    }
+}
+
+#[pymethods]
+impl PyCapabilitySet {
+    /// Retrieve the capabilities of a greeting with a `CAPABILITY` response code
+    ///
+    /// Returns `None` if the greeting does not announce any capabilities.
+    #[staticmethod]
+    fn from_greeting(greeting: &PyGreeting) -> Option<Self> {
+        Self::from_code(greeting.0.code.as_ref())
+    }
+
+    /// Retrieve the capabilities of a `CAPABILITY` response or a `CAPABILITY` response code
+    ///
+    /// Returns `None` if the response does not announce any capabilities.
+    #[staticmethod]
+    fn from_response(response: &PyResponse) -> Option<Self> {
+        match &response.0 {
+            Response::Data(Data::Capability(capabilities)) => {
+                Some(Self::new(capabilities.as_ref()))
+            }
+            Response::Status(
+                Status::Untagged(StatusBody { code, .. })
+                | Status::Tagged(Tagged {
+                    body: StatusBody { code, .. },
+                    ..
+                })
+                | Status::Bye(Bye { code, .. }),
+            ) => Self::from_code(code.as_ref()),
+            _ => None,
+        }
+    }
+
+    /// Check if the capability `name` was announced, e.g., `IDLE` or `AUTH=PLAIN`
+    fn has(&self, name: &str) -> bool {
+        self.index.contains(&name.to_ascii_uppercase())
+    }
+
+    /// Check if the authentication mechanism `mechanism` was announced, e.g., `PLAIN`
+    fn has_auth(&self, mechanism: &str) -> bool {
+        self.index
+            .contains(&format!("AUTH={}", mechanism.to_ascii_uppercase()))
+    }
+
+    /// Retrieve the announced authentication mechanisms, e.g., `["PLAIN", "XOAUTH2"]`
+    #[getter]
+    fn auth_mechanisms(&self) -> Vec<String> {
+        self.capabilities
+            .iter()
+            .filter_map(|capability| {
+                let prefix = capability.get(..5)?;
+                prefix
+                    .eq_ignore_ascii_case("AUTH=")
+                    .then(|| capability[5..].to_owned())
+            })
+            .collect()
+    }
+
+    /// Retrieve the capabilities in the order of their announcement
+    fn to_list(&self) -> Vec<String> {
+        self.capabilities.clone()
+    }
+
+    fn __contains__(&self, name: &str) -> bool {
+        self.has(name)
+    }
+
+    fn __len__(&self) -> usize {
+        self.capabilities.len()
+    }
+
+    fn __repr__(&self) -> String {
+        let capabilities: Vec<String> = self
+            .capabilities
+            .iter()
+            .map(|capability| format!("'{capability}'"))
+            .collect();
+        format!("CapabilitySet([{}])", capabilities.join(", "))
+    }
+}
+
+/// Decoded messages keyed by their bytes, evicting the oldest message when full
+#[derive(Debug)]
+struct Entries<T> {
+    messages: HashMap<Box<[u8]>, Py<T>>,
+    order: VecDeque<Box<[u8]>>,
+}
+
+impl<T> Default for Entries<T> {
+    fn default() -> Self {
+        Self {
+            messages: HashMap::new(),
+            order: VecDeque::new(),
+        }
+    }
+}
+
+impl<T> Entries<T> {
+    fn get(&self, py: Python, bytes: &[u8]) -> Option<Py<T>> {
+        self.messages
+            .get(bytes)
+            .map(|message| message.clone_ref(py))
+    }
+
+    fn insert(&mut self, bytes: &[u8], message: Py<T>, max_entries: usize) {
+        if max_entries == 0 || self.messages.contains_key(bytes) {
+            return;
+        }
+        while self.messages.len() >= max_entries {
+            let Some(oldest) = self.order.pop_front() else {
+                break;
+            };
+            self.messages.remove(&oldest);
+        }
+        self.order.push_back(bytes.into());
+        self.messages.insert(bytes.into(), message);
+    }
+
+    fn clear(&mut self) {
+        self.messages.clear();
+        self.order.clear();
+    }
+}
+
+/// Lock `entries`, entries stay consistent even if a previous holder panicked
+fn lock<T>(entries: &Mutex<Entries<T>>) -> MutexGuard<'_, Entries<T>> {
+    entries.lock().unwrap_or_else(PoisonError::into_inner)
+}
+
+/// Reject trailing bytes, every cached message is keyed by its complete bytes
+fn ensure_consumed(remaining: &Bound<PyBytes>) -> PyResult<()> {
+    if !remaining.as_bytes().is_empty() {
+        return Err(PyValueError::new_err(format!(
+            "expected a single message, found {} trailing bytes",
+            remaining.as_bytes().len()
+        )));
+    }
+    Ok(())
+}
+
+/// Python class caching decoded greetings and responses keyed by their bytes
+///
+/// Meant for messages that are received over and over again, e.g., the greeting and `CAPABILITY`
+/// response of an upstream server. Decoded messages are immutable, so every lookup returns the
+/// same instance. A cache may be shared by multiple threads.
+#[derive(Debug)]
+#[pyclass(name = "DecodeCache", frozen)]
+pub(crate) struct PyDecodeCache {
+    max_entries: usize,
+    greetings: Mutex<Entries<PyGreeting>>,
+    responses: Mutex<Entries<PyResponse>>,
+}
+
+#[pymethods]
+impl PyDecodeCache {
+    /// Create a cache retaining up to `max_entries` greetings and `max_entries` responses
+    #[new]
+    #[pyo3(signature = (max_entries=DEFAULT_MAX_ENTRIES))]
+    fn new(max_entries: usize) -> Self {
+        Self {
+            max_entries,
+            greetings: Mutex::default(),
+            responses: Mutex::default(),
+        }
+    }
+
+    /// Retrieve the maximum number of greetings and responses retained each
+    #[getter]
+    fn max_entries(&self) -> usize {
+        self.max_entries
+    }
+
+    /// Decode greeting from given bytes, or return the greeting decoded from the same bytes before
+    ///
+    /// `bytes` must contain exactly one greeting. Decoding errors are raised like in
+    /// `GreetingCodec.decode` and are not cached.
+    fn decode_greeting(&self, bytes: Bound<PyBytes>) -> PyResult<Py<PyGreeting>> {
+        let py = bytes.py();
+        if let Some(greeting) = lock(&self.greetings).get(py, bytes.as_bytes()) {
+            return Ok(greeting);
+        }
+        let (remaining, greeting) = PyGreetingCodec::decode(bytes.clone(), false)?;
+        ensure_consumed(&remaining)?;
+        let greeting = Py::new(py, greeting)?;
+        lock(&self.greetings).insert(bytes.as_bytes(), greeting.clone_ref(py), self.max_entries);
+        Ok(greeting)
+    }
+
+    /// Decode response from given bytes, or return the response decoded from the same bytes before
+    ///
+    /// `bytes` must contain exactly one response. Decoding errors are raised like in
+    /// `ResponseCodec.decode` and are not cached.
+    fn decode_response(&self, bytes: Bound<PyBytes>) -> PyResult<Py<PyResponse>> {
+        let py = bytes.py();
+        if let Some(response) = lock(&self.responses).get(py, bytes.as_bytes()) {
+            return Ok(response);
+        }
+        let (remaining, response) = PyResponseCodec::decode(bytes.clone(), None, false)?;
+        ensure_consumed(&remaining)?;
+        let response = Py::new(py, response)?;
+        lock(&self.responses).insert(bytes.as_bytes(), response.clone_ref(py), self.max_entries);
+        Ok(response)
+    }
+
+    /// Remove all cached messages
+    fn clear(&self) {
+        lock(&self.greetings).clear();
+        lock(&self.responses).clear();
+    }
+
+    fn __len__(&self) -> usize {
+        lock(&self.greetings).messages.len() + lock(&self.responses).messages.len()
+    }
+}
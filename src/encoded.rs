@@ -1,8 +1,18 @@
+use std::{collections::VecDeque, sync::Mutex};
+
 use imap_codec::{
     encode::{Encoded, Fragment},
+    fragmentizer::{FragmentInfo, Fragmentizer},
     imap_types::core::LiteralMode,
 };
-use pyo3::{prelude::*, types::PyBytes};
+use pyo3::{
+    exceptions::{PyTypeError, PyValueError},
+    prelude::*,
+    sync::with_critical_section,
+    types::{PyByteArray, PyBytes, PyIterator},
+};
+
+use crate::fragmentizer::PyLineEnding;
 
 /// Python class representing a literal mode
 #[derive(Debug, Clone, Copy, PartialEq)]
@@ -116,12 +126,333 @@ impl PyLiteralFragment {
     }
 }
 
+/// Python class representing a literal whose data is read from a file by the writer
+///
+/// The codec only produces the framing around the literal, so that the data can be sent using
+/// `os.sendfile` without passing through Python.
+#[derive(Debug, Clone, PartialEq)]
+#[pyclass(name = "FileLiteral", eq, frozen)]
+pub(crate) struct PyFileLiteral {
+    fd: i32,
+    offset: u64,
+    length: u32,
+    mode: PyLiteralMode,
+}
+
+#[pymethods]
+impl PyFileLiteral {
+    /// Create a new file literal from `length` bytes at `offset` in file descriptor `fd`
+    #[new]
+    #[pyo3(signature = (fd, offset, length, mode=PyLiteralMode::Sync))]
+    pub(crate) fn new(fd: i32, offset: u64, length: u32, mode: PyLiteralMode) -> Self {
+        Self {
+            fd,
+            offset,
+            length,
+            mode,
+        }
+    }
+
+    /// Retrieve the file descriptor of the file literal
+    #[getter]
+    pub(crate) fn fd(&self) -> i32 {
+        self.fd
+    }
+
+    /// Retrieve the offset of the file literal in its file
+    #[getter]
+    pub(crate) fn offset(&self) -> u64 {
+        self.offset
+    }
+
+    /// Retrieve the length of the file literal
+    #[getter]
+    pub(crate) fn length(&self) -> u32 {
+        self.length
+    }
+
+    /// Retrieve the mode of the file literal
+    #[getter]
+    pub(crate) fn mode(&self) -> PyLiteralMode {
+        self.mode
+    }
+
+    /// Printable representation of the file literal,
+    /// e.g. `FileLiteral(fd=3, offset=0, length=5, mode=LiteralMode.Sync)`
+    pub(crate) fn __repr__(&self) -> String {
+        format!(
+            "FileLiteral(fd={}, offset={}, length={}, mode={})",
+            self.fd, self.offset, self.length, self.mode
+        )
+    }
+}
+
+/// Default number of bytes read from a file object per chunk of a stream literal
+const DEFAULT_CHUNK_SIZE: usize = 64 * 1024;
+
+/// Source of the data of a stream literal
+#[derive(Debug)]
+enum StreamSource {
+    /// Object with a `read(size)` method, e.g. a file opened in binary mode
+    File(Py<PyAny>),
+    /// Iterator over `bytes` chunks
+    Iterator(Py<PyIterator>),
+}
+
+/// Python class representing a literal whose data is produced lazily while sending
+///
+/// Iterating over a stream literal yields its data as `bytes` chunks, so that huge literals are
+/// never held in memory as a whole. The source must provide exactly `length` bytes.
+#[derive(Debug)]
+#[pyclass(name = "StreamLiteral")]
+pub(crate) struct PyStreamLiteral {
+    source: StreamSource,
+    length: u32,
+    mode: PyLiteralMode,
+    chunk_size: usize,
+    remaining: u32,
+}
+
+impl PyStreamLiteral {
+    fn read_chunk<'py>(&self, py: Python<'py>) -> PyResult<Option<Bound<'py, PyBytes>>> {
+        match &self.source {
+            StreamSource::File(file) => {
+                let size = self.chunk_size.min(self.remaining as usize);
+                let chunk = file.bind(py).call_method1("read", (size,))?;
+                let chunk = chunk
+                    .cast_into::<PyBytes>()
+                    .map_err(|_| PyTypeError::new_err("source must return bytes"))?;
+                Ok((!chunk.as_bytes().is_empty()).then_some(chunk))
+            }
+            StreamSource::Iterator(iterator) => {
+                for chunk in iterator.bind(py).clone() {
+                    let chunk = chunk?
+                        .cast_into::<PyBytes>()
+                        .map_err(|_| PyTypeError::new_err("source must yield bytes"))?;
+                    if !chunk.as_bytes().is_empty() {
+                        return Ok(Some(chunk));
+                    }
+                }
+                Ok(None)
+            }
+        }
+    }
+}
+
+#[pymethods]
+impl PyStreamLiteral {
+    /// Create a new stream literal of `length` bytes read from `source`
+    ///
+    /// `source` is either an object with a `read(size)` method, e.g. a file opened in binary mode,
+    /// or an iterable of `bytes` chunks.
+    #[new]
+    #[pyo3(signature = (
+        source, length, mode=PyLiteralMode::Sync, *, chunk_size=DEFAULT_CHUNK_SIZE
+    ))]
+    pub(crate) fn new(
+        source: &Bound<PyAny>,
+        length: u32,
+        mode: PyLiteralMode,
+        chunk_size: usize,
+    ) -> PyResult<Self> {
+        if chunk_size == 0 {
+            return Err(PyValueError::new_err("chunk_size must be positive"));
+        }
+        let source = if source.hasattr("read")? {
+            StreamSource::File(source.clone().unbind())
+        } else {
+            StreamSource::Iterator(source.try_iter()?.unbind())
+        };
+        Ok(Self {
+            source,
+            length,
+            mode,
+            chunk_size,
+            remaining: length,
+        })
+    }
+
+    /// Retrieve the length of the stream literal
+    #[getter]
+    pub(crate) fn length(&self) -> u32 {
+        self.length
+    }
+
+    /// Retrieve the mode of the stream literal
+    #[getter]
+    pub(crate) fn mode(&self) -> PyLiteralMode {
+        self.mode
+    }
+
+    pub(crate) fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    /// Return the next chunk of data
+    pub(crate) fn __next__<'py>(
+        &mut self,
+        py: Python<'py>,
+    ) -> PyResult<Option<Bound<'py, PyBytes>>> {
+        if self.remaining == 0 {
+            return Ok(None);
+        }
+
+        let Some(chunk) = self.read_chunk(py)? else {
+            return Err(PyValueError::new_err(format!(
+                "source ended after {} of {} bytes",
+                self.length - self.remaining,
+                self.length
+            )));
+        };
+        let remaining = u32::try_from(chunk.as_bytes().len())
+            .ok()
+            .and_then(|length| self.remaining.checked_sub(length))
+            .ok_or_else(|| {
+                PyValueError::new_err(format!("source provided more than {} bytes", self.length))
+            })?;
+        self.remaining = remaining;
+        Ok(Some(chunk))
+    }
+
+    /// Printable representation of the stream literal,
+    /// e.g. `StreamLiteral(length=5, mode=LiteralMode.Sync)`
+    pub(crate) fn __repr__(&self) -> String {
+        format!("StreamLiteral(length={}, mode={})", self.length, self.mode)
+    }
+}
+
+/// Fragment of an encoded message
+#[derive(Debug)]
+pub(crate) enum EncodedFragment {
+    /// Fragment produced by the encoder
+    Fragment(Fragment),
+    /// Literal attached by `attach_literals`, its data is provided by the writer
+    File(Py<PyFileLiteral>),
+    /// Literal attached by `attach_literals`, its data is streamed by the writer
+    Stream(Py<PyStreamLiteral>),
+}
+
+impl EncodedFragment {
+    /// Create the fragment for a literal passed to `attach_literals`, with its length and mode
+    fn attached(literal: &Bound<PyAny>) -> PyResult<(Self, u32, PyLiteralMode)> {
+        if let Ok(file_literal) = literal.cast::<PyFileLiteral>() {
+            let (length, mode) = (file_literal.get().length, file_literal.get().mode);
+            return Ok((Self::File(file_literal.clone().unbind()), length, mode));
+        }
+        if let Ok(stream_literal) = literal.cast::<PyStreamLiteral>() {
+            let (length, mode) = {
+                let stream_literal = stream_literal.borrow();
+                (stream_literal.length, stream_literal.mode)
+            };
+            return Ok((Self::Stream(stream_literal.clone().unbind()), length, mode));
+        }
+        Err(PyTypeError::new_err(
+            "literals must be of type FileLiteral or StreamLiteral",
+        ))
+    }
+}
+
+/// Return the length of the `{0}\r\n` (or `{0+}\r\n`) announcement at the end of `line`
+///
+/// Announcements ending with LF are found as well, see `set_line_ending`.
+fn empty_literal_announcement(line: &[u8]) -> Option<usize> {
+    [
+        b"{0}\r\n".as_slice(),
+        b"{0+}\r\n".as_slice(),
+        b"{0}\n".as_slice(),
+        b"{0+}\n".as_slice(),
+    ]
+    .into_iter()
+    .find(|announcement| line.ends_with(announcement))
+    .map(<[u8]>::len)
+}
+
 /// Python wrapper classes for `Encoded`
 ///
 /// This implements a Python iterator over the containing fragments.
-#[derive(Debug, Clone)]
+#[derive(Debug)]
 #[pyclass(name = "Encoded")]
-pub(crate) struct PyEncoded(pub(crate) Option<Encoded>);
+pub(crate) struct PyEncoded(pub(crate) VecDeque<EncodedFragment>);
+
+impl From<Encoded> for PyEncoded {
+    fn from(value: Encoded) -> Self {
+        Self(value.map(EncodedFragment::Fragment).collect())
+    }
+}
+
+impl PyEncoded {
+    /// Split the original bytes of a single message into the fragments an encoder would yield
+    ///
+    /// Literal data keeps the mode of its announcement, so that the message flow of a forwarded
+    /// message is the same as for a re-encoded one.
+    pub(crate) fn from_raw(raw: &[u8]) -> Self {
+        let mut fragmentizer = Fragmentizer::without_max_message_size();
+        fragmentizer.enqueue_bytes(raw);
+
+        let mut fragments = VecDeque::new();
+        let mut mode = LiteralMode::Sync;
+        while let Some(fragment_info) = fragmentizer.progress() {
+            fragments.push_back(EncodedFragment::Fragment(match fragment_info {
+                FragmentInfo::Line {
+                    start,
+                    end,
+                    announcement,
+                    ..
+                } => {
+                    if let Some(announcement) = announcement {
+                        mode = announcement.mode;
+                    }
+                    Fragment::Line {
+                        data: raw[start..end].to_vec(),
+                    }
+                }
+                FragmentInfo::Literal { start, end } => Fragment::Literal {
+                    data: raw[start..end].to_vec(),
+                    mode,
+                },
+            }));
+
+            if fragmentizer.is_message_complete() {
+                break;
+            }
+        }
+
+        Self(fragments)
+    }
+
+    /// Return the total length of the remaining fragments
+    ///
+    /// Fails if a literal was attached, as its data is not available.
+    fn dump_len(&self) -> PyResult<usize> {
+        self.0
+            .iter()
+            .map(|fragment| match fragment {
+                EncodedFragment::Fragment(
+                    Fragment::Line { data } | Fragment::Literal { data, .. },
+                ) => Ok(data.len()),
+                EncodedFragment::File(_) | EncodedFragment::Stream(_) => {
+                    Err(PyValueError::new_err(
+                        "attached literals can not be dumped, iterate over the fragments instead",
+                    ))
+                }
+            })
+            .sum()
+    }
+
+    /// Move the data of the remaining fragments into `buffer`, which must have `dump_len` bytes
+    fn dump_to(&mut self, buffer: &mut [u8]) {
+        let mut position = 0;
+        for fragment in self.0.drain(..) {
+            if let EncodedFragment::Fragment(
+                Fragment::Line { data } | Fragment::Literal { data, .. },
+            ) = fragment
+            {
+                buffer[position..position + data.len()].copy_from_slice(&data);
+                position += data.len();
+            }
+        }
+    }
+}
 
 #[pymethods]
 impl PyEncoded {
@@ -132,31 +463,246 @@ impl PyEncoded {
 
     /// Return next fragment
     pub(crate) fn __next__(mut slf: PyRefMut<'_, Self>) -> PyResult<Option<Py<PyAny>>> {
-        // Try to get next `Fragment` from `Encoded` iterator
-        let Some(fragment) = slf.0.as_mut().and_then(|encoded| encoded.next()) else {
+        // Try to get next `Fragment`
+        let Some(fragment) = slf.0.pop_front() else {
             return Ok(None);
         };
 
-        // Return instance of `PyLineFragment` or `PyLiteralFragment` as a generic `PyObject`.
+        // Return instance of `PyLineFragment`, `PyLiteralFragment`, or an attached literal as a
+        // generic `PyObject`.
         Ok(Some(match fragment {
-            Fragment::Line { data } => Bound::new(slf.py(), PyLineFragment::new(data))?
-                .into_pyobject(slf.py())?
-                .into(),
-            Fragment::Literal { data, mode } => {
+            EncodedFragment::Fragment(Fragment::Line { data }) => {
+                Bound::new(slf.py(), PyLineFragment::new(data))?
+                    .into_pyobject(slf.py())?
+                    .into()
+            }
+            EncodedFragment::Fragment(Fragment::Literal { data, mode }) => {
                 Bound::new(slf.py(), PyLiteralFragment::try_new(data, mode.into())?)?
                     .into_pyobject(slf.py())?
                     .into()
             }
+            EncodedFragment::File(file_literal) => file_literal.into_any(),
+            EncodedFragment::Stream(stream_literal) => stream_literal.into_any(),
         }))
     }
 
     /// Dump remaining fragment data
-    pub(crate) fn dump(mut slf: PyRefMut<'_, Self>) -> PyResult<Bound<'_, PyBytes>> {
-        let encoded = slf.0.take();
-        let dump = match encoded {
-            Some(encoded) => encoded.dump(),
-            None => Vec::new(),
-        };
-        Ok(PyBytes::new(slf.py(), &dump))
+    ///
+    /// The data is written into the returned `bytes` object directly, without intermediate buffer.
+    pub(crate) fn dump<'py>(&mut self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        let length = self.dump_len()?;
+        PyBytes::new_with(py, length, |buffer| {
+            self.dump_to(buffer);
+            Ok(())
+        })
+    }
+
+    /// Append remaining fragment data to `buffer`, return the number of bytes written
+    pub(crate) fn dump_into(&mut self, buffer: &Bound<PyByteArray>) -> PyResult<usize> {
+        let length = self.dump_len()?;
+        // Without the GIL, another thread could resize `buffer` between the resize and the write
+        with_critical_section(buffer.as_any(), || {
+            let start = buffer.len();
+            buffer.resize(start + length)?;
+            // SAFETY: No Python code is executed and no other thread can access `buffer` while its
+            // contents are borrowed
+            self.dump_to(unsafe { &mut buffer.as_bytes_mut()[start..] });
+            Ok(length)
+        })
     }
+
+    /// Dump remaining fragment data in segments, split before the data of every sync literal
+    ///
+    /// Every segment can be sent in a single write, a continuation request must be awaited
+    /// before sending the next one.
+    pub(crate) fn dump_segments<'py>(
+        &mut self,
+        py: Python<'py>,
+    ) -> PyResult<Vec<Bound<'py, PyBytes>>> {
+        self.dump_len()?;
+
+        let mut segments = Vec::new();
+        let mut segment = Vec::new();
+        for fragment in self.0.drain(..) {
+            let EncodedFragment::Fragment(fragment) = fragment else {
+                continue;
+            };
+            match fragment {
+                Fragment::Literal {
+                    data,
+                    mode: LiteralMode::Sync,
+                } => {
+                    segments.push(PyBytes::new(py, &segment));
+                    segment.clear();
+                    segment.extend_from_slice(&data);
+                }
+                Fragment::Line { data } | Fragment::Literal { data, .. } => {
+                    segment.extend_from_slice(&data);
+                }
+            }
+        }
+        if !segment.is_empty() {
+            segments.push(PyBytes::new(py, &segment));
+        }
+
+        Ok(segments)
+    }
+
+    /// Replace the empty literals of the remaining fragments by `literals`, in order
+    ///
+    /// The announcements of the literals are updated to the length and mode of the attached
+    /// literals. This allows building a message with placeholder literals and providing the data
+    /// from outside, e.g. from a file.
+    pub(crate) fn attach_literals(&mut self, literals: &Bound<PyAny>) -> PyResult<()> {
+        let literals = literals
+            .try_iter()?
+            .map(|literal| EncodedFragment::attached(&literal?))
+            .collect::<PyResult<Vec<_>>>()?;
+
+        // Find all empty literals and check their announcements before modifying anything
+        let mut placeholders = Vec::new();
+        for (index, fragment) in self.0.iter().enumerate() {
+            let EncodedFragment::Fragment(Fragment::Literal { data, .. }) = fragment else {
+                continue;
+            };
+            if !data.is_empty() {
+                continue;
+            }
+            let announcement = match index.checked_sub(1).map(|index| &self.0[index]) {
+                Some(EncodedFragment::Fragment(Fragment::Line { data })) => {
+                    empty_literal_announcement(data)
+                }
+                _ => None,
+            };
+            let Some(announcement) = announcement else {
+                return Err(PyValueError::new_err(
+                    "empty literal is not preceded by its announcement",
+                ));
+            };
+            placeholders.push((index, announcement));
+        }
+
+        if placeholders.len() != literals.len() {
+            return Err(PyValueError::new_err(format!(
+                "encoded message contains {} empty literals, but {} literals were given",
+                placeholders.len(),
+                literals.len()
+            )));
+        }
+
+        for ((index, announcement), (literal, length, mode)) in
+            placeholders.into_iter().zip(literals)
+        {
+            if let EncodedFragment::Fragment(Fragment::Line { data }) = &mut self.0[index - 1] {
+                let ending = if data.ends_with(b"\r\n") {
+                    "\r\n"
+                } else {
+                    "\n"
+                };
+                data.truncate(data.len() - announcement);
+                let non_sync = if mode == PyLiteralMode::NonSync {
+                    "+"
+                } else {
+                    ""
+                };
+                data.extend_from_slice(format!("{{{length}{non_sync}}}{ending}").as_bytes());
+            }
+            self.0[index] = literal;
+        }
+
+        Ok(())
+    }
+
+    /// End the lines of the remaining line fragments with `line_ending`
+    ///
+    /// Encoders always emit CRLF, LF is meant for testing peers with relaxed line endings. The
+    /// data of literals is not changed.
+    pub(crate) fn set_line_ending(&mut self, line_ending: PyLineEnding) {
+        for fragment in self.0.iter_mut() {
+            let EncodedFragment::Fragment(Fragment::Line { data }) = fragment else {
+                continue;
+            };
+            match line_ending {
+                PyLineEnding::Lf if data.ends_with(b"\r\n") => {
+                    data.truncate(data.len() - 2);
+                    data.push(b'\n');
+                }
+                PyLineEnding::CrLf if data.ends_with(b"\n") && !data.ends_with(b"\r\n") => {
+                    data.insert(data.len() - 1, b'\r');
+                }
+                _ => {}
+            }
+        }
+    }
+}
+
+/// Capacity a codec retains in its scratch buffer between calls by default
+pub(crate) const DEFAULT_RETAIN_CAPACITY: usize = 4096;
+
+/// Buffer reused by a codec instance for dumping encoded messages
+///
+/// After every use, the buffer is cleared but keeps its allocation, so that encoding a stream of
+/// small messages does not allocate an output buffer per message. Only a buffer that grew beyond
+/// `retain_capacity` (e.g. for a large literal) is shrunk, so that a single large message does
+/// not pin its allocation for the lifetime of the codec.
+///
+/// A codec instance may be used by multiple threads at once: a caller that finds the buffer in use
+/// falls back to a temporary buffer instead of waiting for it.
+#[derive(Debug)]
+pub(crate) struct ScratchBuffer {
+    buffer: Mutex<Vec<u8>>,
+    retain_capacity: usize,
+}
+
+impl ScratchBuffer {
+    pub(crate) fn new(retain_capacity: usize) -> Self {
+        Self {
+            buffer: Mutex::new(Vec::with_capacity(retain_capacity)),
+            retain_capacity,
+        }
+    }
+
+    pub(crate) fn retain_capacity(&self) -> usize {
+        self.retain_capacity
+    }
+
+    /// Return the current capacity of the buffer, or 0 while it is in use
+    pub(crate) fn capacity(&self) -> usize {
+        self.buffer.try_lock().map_or(0, |buffer| buffer.capacity())
+    }
+
+    /// Dump `encoded` into the buffer and pass the dumped bytes to `f`
+    pub(crate) fn dump<T>(&self, encoded: Encoded, f: impl FnOnce(&[u8]) -> T) -> T {
+        let mut guard = self.buffer.try_lock().ok();
+        let mut temporary = Vec::new();
+        let buffer = guard.as_deref_mut().unwrap_or(&mut temporary);
+
+        for fragment in encoded {
+            match fragment {
+                Fragment::Line { data } | Fragment::Literal { data, .. } => {
+                    buffer.extend_from_slice(&data)
+                }
+            }
+        }
+
+        let result = f(buffer.as_slice());
+        buffer.clear();
+        if buffer.capacity() > self.retain_capacity {
+            buffer.shrink_to(self.retain_capacity);
+        }
+        result
+    }
+}
+
+/// Append `data` to `buffer` with a single resize, return the number of bytes written
+pub(crate) fn extend_bytearray(buffer: &Bound<PyByteArray>, data: &[u8]) -> PyResult<usize> {
+    // Without the GIL, another thread could resize `buffer` between the resize and the write
+    with_critical_section(buffer.as_any(), || {
+        let start = buffer.len();
+        buffer.resize(start + data.len())?;
+        // SAFETY: No Python code is executed and no other thread can access `buffer` while its
+        // contents are borrowed
+        unsafe { buffer.as_bytes_mut()[start..].copy_from_slice(data) };
+        Ok(data.len())
+    })
 }
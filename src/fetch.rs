@@ -0,0 +1,314 @@
+use std::sync::OnceLock;
+
+use chrono::{DateTime, FixedOffset};
+use imap_codec::imap_types::{
+    fetch::MessageDataItem,
+    flag::FlagFetch,
+    response::{Data, Response},
+    IntoStatic,
+};
+use pyo3::{
+    buffer::{Element, PyBuffer},
+    exceptions::{PyRuntimeError, PyTypeError, PyValueError},
+    prelude::*,
+};
+
+use crate::PyResponse;
+
+/// Set of FETCH attributes to retain when decoding responses
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub(crate) struct FetchProjection(u16);
+
+impl FetchProjection {
+    const UID: u16 = 1 << 0;
+    const FLAGS: u16 = 1 << 1;
+    const RFC822_SIZE: u16 = 1 << 2;
+    const INTERNALDATE: u16 = 1 << 3;
+    const ENVELOPE: u16 = 1 << 4;
+    const BODYSTRUCTURE: u16 = 1 << 5;
+    const BODY: u16 = 1 << 6;
+    const BODY_SECTION: u16 = 1 << 7;
+    const RFC822: u16 = 1 << 8;
+    const RFC822_HEADER: u16 = 1 << 9;
+    const RFC822_TEXT: u16 = 1 << 10;
+    const BINARY: u16 = 1 << 11;
+    const BINARY_SIZE: u16 = 1 << 12;
+    const MODSEQ: u16 = 1 << 13;
+
+    /// Create projection from attribute names, e.g. `{"UID", "FLAGS"}`
+    ///
+    /// Any `BODY[<section>]`, `BINARY[<section>]`, and `BINARY.SIZE[<section>]` name selects all
+    /// items of this kind regardless of section.
+    pub(crate) fn from_names(names: &Bound<PyAny>) -> PyResult<Self> {
+        let mut bits = 0;
+        for name in names.try_iter()? {
+            let name = name?.extract::<String>()?.to_ascii_uppercase();
+            bits |= match name.as_str() {
+                "UID" => Self::UID,
+                "FLAGS" => Self::FLAGS,
+                "RFC822.SIZE" => Self::RFC822_SIZE,
+                "INTERNALDATE" => Self::INTERNALDATE,
+                "ENVELOPE" => Self::ENVELOPE,
+                "BODYSTRUCTURE" => Self::BODYSTRUCTURE,
+                "BODY" => Self::BODY,
+                "RFC822" => Self::RFC822,
+                "RFC822.HEADER" => Self::RFC822_HEADER,
+                "RFC822.TEXT" => Self::RFC822_TEXT,
+                "MODSEQ" => Self::MODSEQ,
+                name if name.starts_with("BODY[") => Self::BODY_SECTION,
+                name if name.starts_with("BINARY[") => Self::BINARY,
+                name if name.starts_with("BINARY.SIZE[") => Self::BINARY_SIZE,
+                name => {
+                    return Err(PyValueError::new_err(format!(
+                        "unknown FETCH attribute: {name:?}"
+                    )))
+                }
+            };
+        }
+        Ok(Self(bits))
+    }
+
+    fn contains(self, item: &MessageDataItem) -> bool {
+        #[allow(unreachable_patterns)]
+        let bit = match item {
+            MessageDataItem::Uid { .. } => Self::UID,
+            MessageDataItem::Flags { .. } => Self::FLAGS,
+            MessageDataItem::Rfc822Size { .. } => Self::RFC822_SIZE,
+            MessageDataItem::InternalDate { .. } => Self::INTERNALDATE,
+            MessageDataItem::Envelope { .. } => Self::ENVELOPE,
+            MessageDataItem::BodyStructure { .. } => Self::BODYSTRUCTURE,
+            MessageDataItem::Body { .. } => Self::BODY,
+            MessageDataItem::BodyExt { .. } => Self::BODY_SECTION,
+            MessageDataItem::Rfc822 { .. } => Self::RFC822,
+            MessageDataItem::Rfc822Header { .. } => Self::RFC822_HEADER,
+            MessageDataItem::Rfc822Text { .. } => Self::RFC822_TEXT,
+            MessageDataItem::Binary { .. } => Self::BINARY,
+            MessageDataItem::BinarySize { .. } => Self::BINARY_SIZE,
+            #[cfg(feature = "ext_condstore_qresync")]
+            MessageDataItem::ModSeq { .. } => Self::MODSEQ,
+            // Items of extensions without a name in `from_names` can not be selected
+            _ => return false,
+        };
+        self.0 & bit != 0
+    }
+
+    /// Drop all items of a FETCH response that are not part of the projection
+    ///
+    /// A FETCH response without any matching item is dropped as a whole (`None`), as a FETCH
+    /// response can not be empty. Other responses are returned unchanged. Applying the projection
+    /// before converting a borrowed response into an owned one avoids copying the dropped items.
+    pub(crate) fn apply(self, response: Response<'_>) -> Option<Response<'_>> {
+        match response {
+            Response::Data(Data::Fetch { seq, items }) => {
+                let all: &[MessageDataItem] = items.as_ref();
+                if all.iter().all(|item| self.contains(item)) {
+                    return Some(Response::Data(Data::Fetch { seq, items }));
+                }
+
+                let retained: Vec<MessageDataItem> = items
+                    .into_iter()
+                    .filter(|item| self.contains(item))
+                    .collect();
+                Some(Response::Data(Data::Fetch {
+                    seq,
+                    items: retained.try_into().ok()?,
+                }))
+            }
+            response => Some(response),
+        }
+    }
+}
+
+/// Apply `projection` (if any) to `response` and convert the result into an owned response
+///
+/// Returns `None` if the projection drops the response, see `FetchProjection::apply`.
+pub(crate) fn project(
+    projection: Option<FetchProjection>,
+    response: Response<'_>,
+) -> Option<Response<'static>> {
+    match projection {
+        Some(projection) => projection.apply(response).map(IntoStatic::into_static),
+        None => Some(response.into_static()),
+    }
+}
+
+/// Type codes of `array.array` for unsigned 32-bit integers, `"L"` where `"I"` has another size
+const U32: &[&str] = &["I", "L"];
+/// Type code of `array.array` for signed 64-bit integers
+const I64: &[&str] = &["q"];
+/// Type code of `array.array` for unsigned 64-bit integers
+const U64: &[&str] = &["Q"];
+
+/// Numeric column, exposed as `array.array` that is created on first access
+#[derive(Debug, Default)]
+struct Column<T> {
+    values: Vec<T>,
+    array: OnceLock<Py<PyAny>>,
+}
+
+impl<T: Element + Copy> Column<T> {
+    fn push(&mut self, value: T) {
+        self.values.push(value);
+        // Rows are only pushed while building the columns, before any array is created
+        self.array.take();
+    }
+
+    /// Return the column as `array.array` with the first of `typecodes` matching the size of `T`
+    ///
+    /// The array is created once, all later calls return the same object.
+    fn array<'py>(&self, py: Python<'py>, typecodes: &[&str]) -> PyResult<Bound<'py, PyAny>> {
+        if let Some(array) = self.array.get() {
+            return Ok(array.bind(py).clone());
+        }
+        let array = new_array(py, typecodes, &self.values)?;
+        // If another thread was faster, its array is returned instead
+        Ok(self.array.get_or_init(|| array.unbind()).bind(py).clone())
+    }
+}
+
+/// Python class holding FETCH response data in columnar form
+///
+/// Every FETCH response is one row. Numeric columns are exposed as `array.array` objects, which
+/// support the buffer protocol and can be wrapped without copying, e.g. by `numpy.frombuffer`.
+#[derive(Debug, Default)]
+#[pyclass(name = "FetchColumns")]
+pub(crate) struct PyFetchColumns {
+    seq: Column<u32>,
+    uid: Column<u32>,
+    size: Column<i64>,
+    internal_date: Column<i64>,
+    flags: Vec<Option<Vec<String>>>,
+    modseq: Column<u64>,
+}
+
+impl PyFetchColumns {
+    /// Append a FETCH response as new row, return `false` if `response` is no FETCH response
+    pub(crate) fn push(&mut self, response: &Response) -> bool {
+        let Response::Data(Data::Fetch { seq, items }) = response else {
+            return false;
+        };
+
+        let (mut uid, mut size, mut internal_date, mut flags) = (0, -1, i64::MIN, None);
+        let mut modseq = 0;
+        let items: &[MessageDataItem] = items.as_ref();
+        for item in items {
+            match item {
+                MessageDataItem::Uid(value) => uid = value.get(),
+                MessageDataItem::Rfc822Size(value) => size = i64::from(*value),
+                MessageDataItem::InternalDate(value) => {
+                    let value: &DateTime<FixedOffset> = value.as_ref();
+                    internal_date = value.timestamp();
+                }
+                MessageDataItem::Flags(value) => {
+                    flags = Some(value.iter().map(flag_fetch_to_string).collect())
+                }
+                #[cfg(feature = "ext_condstore_qresync")]
+                MessageDataItem::ModSeq(value) => modseq = value.get(),
+                _ => {}
+            }
+        }
+
+        self.seq.push(seq.get());
+        self.uid.push(uid);
+        self.size.push(size);
+        self.internal_date.push(internal_date);
+        self.flags.push(flags);
+        self.modseq.push(modseq);
+        true
+    }
+}
+
+fn flag_fetch_to_string(flag: &FlagFetch) -> String {
+    match flag {
+        FlagFetch::Flag(flag) => flag.to_string(),
+        FlagFetch::Recent => "\\Recent".to_string(),
+    }
+}
+
+/// Create an `array.array` holding `values`
+///
+/// The type code is the first of `typecodes` whose item size matches `T`, as the sizes of the C
+/// types behind type codes differ between platforms. The values are copied into the buffer of
+/// the array directly.
+fn new_array<'py, T: Element + Copy>(
+    py: Python<'py>,
+    typecodes: &[&str],
+    values: &[T],
+) -> PyResult<Bound<'py, PyAny>> {
+    let array_type = py.import("array")?.getattr("array")?;
+    for typecode in typecodes {
+        let item = array_type.call1((*typecode, (0,)))?;
+        if item.getattr("itemsize")?.extract::<usize>()? != std::mem::size_of::<T>() {
+            continue;
+        }
+        // Repeating a single item allocates the array at once
+        let array = item.call_method1("__mul__", (values.len(),))?;
+        if !values.is_empty() {
+            PyBuffer::<T>::get(&array)?.copy_from_slice(py, values)?;
+        }
+        return Ok(array);
+    }
+    Err(PyRuntimeError::new_err(format!(
+        "no array type code of {typecodes:?} has {} bytes",
+        std::mem::size_of::<T>()
+    )))
+}
+
+#[pymethods]
+impl PyFetchColumns {
+    /// Create columns from the FETCH responses in `responses`, skipping other responses
+    #[staticmethod]
+    fn from_responses(responses: &Bound<PyAny>) -> PyResult<Self> {
+        let mut columns = Self::default();
+        for response in responses.try_iter()? {
+            let response = response?;
+            let Ok(response) = response.cast::<PyResponse>() else {
+                return Err(PyTypeError::new_err("responses must be of type Response"));
+            };
+            columns.push(&response.get().0);
+        }
+        Ok(columns)
+    }
+
+    /// Retrieve the message sequence numbers as `array.array("I")` (or `"L"`, see `U32`)
+    #[getter]
+    fn seq<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
+        self.seq.array(py, U32)
+    }
+
+    /// Retrieve the UIDs as `array.array("I")` (or `"L"`, see `U32`), `0` denotes a missing UID
+    #[getter]
+    fn uid<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
+        self.uid.array(py, U32)
+    }
+
+    /// Retrieve the RFC822 sizes as `array.array("q")`, `-1` denotes a missing size
+    #[getter]
+    fn size<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
+        self.size.array(py, I64)
+    }
+
+    /// Retrieve the internal dates as Unix timestamps in `array.array("q")`,
+    /// `-2**63` denotes a missing date
+    #[getter]
+    fn internal_date<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
+        self.internal_date.array(py, I64)
+    }
+
+    /// Retrieve the flags of every row, `None` denotes missing flags
+    #[getter]
+    fn flags(&self) -> Vec<Option<Vec<String>>> {
+        self.flags.clone()
+    }
+
+    /// Retrieve the mod-sequences (CONDSTORE) as `array.array("Q")`, `0` denotes a missing
+    /// mod-sequence
+    #[getter]
+    fn modseq<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
+        self.modseq.array(py, U64)
+    }
+
+    fn __len__(&self) -> usize {
+        self.seq.values.len()
+    }
+}
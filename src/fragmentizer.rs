@@ -6,15 +6,24 @@ use imap_codec::{
 };
 use pyo3::{
     create_exception,
-    exceptions::{PyException, PyTypeError},
+    exceptions::{PyException, PyTypeError, PyValueError},
     prelude::*,
-    types::{PyBytes, PyString},
+    types::{PyBytes, PyDict, PyString},
 };
 use serde::Serialize;
 
 use crate::{
-    encoded::PyLiteralMode, map_authenticate_data_decode_error, map_command_decode_error,
-    map_greeting_decode_error, map_idle_done_decode_error, map_response_decode_error,
+    authenticate_data_decode_result, command_decode_result,
+    encoded::PyLiteralMode,
+    ensure_unprojected,
+    fetch::{project, FetchProjection, PyFetchColumns},
+    greeting_decode_result, idle_done_decode_result, map_authenticate_data_decode_error,
+    map_command_decode_error, map_greeting_decode_error, map_idle_done_decode_error,
+    map_response_decode_error,
+    peek::{self, PyMessagePeek},
+    response_decode_result,
+    result::{PyDecodeResult, PyDecodeStatus},
+    snapshot::Replay,
     PyAuthenticateData, PyCommand, PyGreeting, PyIdleDone, PyResponse,
 };
 
@@ -277,25 +286,189 @@ impl PyLiteralFragmentInfo {
     }
 }
 
+/// Record the offset of the LF of a line fragment that ends without CR
+///
+/// Offsets are relative to the current message, the first fragment of a message resets them.
+fn track_line_feed(line_feeds: &mut Vec<usize>, fragment_info: &FragmentInfo) {
+    if let FragmentInfo::Line {
+        start, end, ending, ..
+    } = fragment_info
+    {
+        if *start == 0 {
+            line_feeds.clear();
+        }
+        if matches!(ending, LineEnding::Lf) {
+            line_feeds.push(end - 1);
+        }
+    }
+}
+
+/// Copy `bytes` into a new `bytes` object, inserting a CR before the LF at every offset
+///
+/// `line_feeds` must be sorted. Offsets beyond `bytes` are ignored, e.g. for the lines of a
+/// message that exceeded the max message size.
+fn normalized_bytes<'py>(
+    py: Python<'py>,
+    bytes: &[u8],
+    line_feeds: &[usize],
+) -> PyResult<Bound<'py, PyBytes>> {
+    let count = line_feeds.partition_point(|offset| *offset < bytes.len());
+    let line_feeds = &line_feeds[..count];
+    PyBytes::new_with(py, bytes.len() + line_feeds.len(), |buffer| {
+        let (mut copied, mut written) = (0, 0);
+        for offset in line_feeds {
+            let chunk = &bytes[copied..*offset];
+            buffer[written..written + chunk.len()].copy_from_slice(chunk);
+            buffer[written + chunk.len()] = b'\r';
+            written += chunk.len() + 1;
+            copied = *offset;
+        }
+        buffer[written..].copy_from_slice(&bytes[copied..]);
+        Ok(())
+    })
+}
+
 /// Python class representing a fragmentizer
+///
+/// Mutating methods take `&mut self`, so PyO3's borrow checking rejects overlapping calls on the
+/// same instance with `RuntimeError`. This is the intended per-object locking: a fragmentizer belongs
+/// to a single connection, which is handled by one thread at a time.
+///
+/// If snapshots are enabled, the second field mirrors the input of the fragmentizer. The third
+/// field holds the offsets of the LF of every line of the current message that ends without CR.
+/// The fourth field is set while the current message is the failure returned by
+/// `decode_fetch_columns`.
 #[derive(Debug, Clone)]
 #[pyclass(name = "Fragmentizer")]
-pub(crate) struct PyFragmentizer(Fragmentizer);
+pub(crate) struct PyFragmentizer(Fragmentizer, Option<Replay>, Vec<usize>, bool);
+
+impl PyFragmentizer {
+    /// Create a fragmentizer without snapshots
+    pub(crate) fn without_snapshots(max_message_size: Option<u32>) -> Self {
+        Self::new(max_message_size, false)
+    }
+
+    /// Enqueue more bytes, keeping the mirror for snapshots up to date
+    pub(crate) fn enqueue_bytes_inner(&mut self, bytes: &[u8]) {
+        self.0.enqueue_bytes(bytes);
+        if let Some(replay) = &mut self.1 {
+            replay.enqueue_bytes(bytes);
+        }
+    }
+
+    /// Progress the fragmentizer, keeping the mirror for snapshots up to date
+    pub(crate) fn progress_inner(&mut self) -> Option<FragmentInfo> {
+        let message_complete = self.0.is_message_complete();
+        let fragment_info = self.0.progress();
+        self.3 = false;
+        if let Some(replay) = &mut self.1 {
+            replay.progress(message_complete, fragment_info.as_ref());
+        }
+        if let Some(fragment_info) = &fragment_info {
+            track_line_feed(&mut self.2, fragment_info);
+        }
+        fragment_info
+    }
+
+    /// Return the bytes of the current message
+    pub(crate) fn message_bytes_inner(&self) -> &[u8] {
+        self.0.message_bytes()
+    }
+
+    /// Copy the bytes of the current message if `keep_raw` is set
+    fn raw(&self, keep_raw: bool) -> Option<Vec<u8>> {
+        keep_raw.then(|| self.0.message_bytes().to_vec())
+    }
+
+    /// Create the result for a message decoded from the current message
+    fn decode_result(&self, message: Bound<PyAny>) -> PyResult<PyDecodeResult> {
+        Ok(PyDecodeResult::ok(self.0.message_bytes().len(), message))
+    }
+
+    /// Decode the current message as command without raising on decoding errors
+    pub(crate) fn try_decode_command_inner(
+        &self,
+        py: Python,
+        keep_raw: bool,
+    ) -> PyResult<PyDecodeResult> {
+        let codec = CommandCodec::default();
+        match self.0.decode_message(&codec) {
+            Ok(command) => {
+                let command = PyCommand(command.to_static(), self.raw(keep_raw));
+                self.decode_result(Bound::new(py, command)?.into_any())
+            }
+            Err(error) => decode_message_result(py, error, command_decode_result),
+        }
+    }
+
+    /// Decode the current message as response without raising on decoding errors
+    pub(crate) fn try_decode_response_inner(
+        &self,
+        py: Python,
+        projection: Option<FetchProjection>,
+        keep_raw: bool,
+    ) -> PyResult<PyDecodeResult> {
+        ensure_unprojected(projection, keep_raw)?;
+        let codec = ResponseCodec::default();
+        match self.0.decode_message(&codec) {
+            Ok(response) => {
+                let response = match project(projection, response) {
+                    Some(response) => {
+                        Bound::new(py, PyResponse(response, self.raw(keep_raw)))?.into_any()
+                    }
+                    None => py.None().into_bound(py),
+                };
+                self.decode_result(response)
+            }
+            Err(error) => decode_message_result(py, error, response_decode_result),
+        }
+    }
+}
 
 #[pymethods]
 impl PyFragmentizer {
     /// Create a new fragmentizer
+    ///
+    /// `snapshots` enables `snapshot`, which requires keeping a copy of the current message.
     #[new]
-    #[pyo3(signature = (*, max_message_size))]
-    fn new(max_message_size: Option<u32>) -> Self {
+    #[pyo3(signature = (*, max_message_size, snapshots=false))]
+    fn new(max_message_size: Option<u32>, snapshots: bool) -> Self {
         Self(
             max_message_size.map_or_else(Fragmentizer::without_max_message_size, Fragmentizer::new),
+            snapshots.then(|| Replay::new(max_message_size)),
+            Vec::new(),
+            false,
         )
     }
 
+    /// Serialize the state of the fragmentizer, e.g. to migrate a connection to another process
+    ///
+    /// The snapshot contains the max message size, the bytes of the current message, enqueued
+    /// but unprocessed bytes, and whether the current message was poisoned.
+    fn snapshot<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        let Some(replay) = &self.1 else {
+            return Err(PyValueError::new_err(
+                "snapshots are disabled, create the fragmentizer with `snapshots=True`",
+            ));
+        };
+        Ok(PyBytes::new(py, &replay.to_bytes()))
+    }
+
+    /// Create a fragmentizer from a snapshot created by `snapshot`
+    ///
+    /// Snapshots are enabled for the restored fragmentizer.
+    #[staticmethod]
+    fn restore(snapshot: Bound<PyBytes>) -> PyResult<Self> {
+        let replay = Replay::from_bytes(snapshot.as_bytes())?;
+        let mut line_feeds = Vec::new();
+        let fragmentizer =
+            replay.replay(|fragment_info| track_line_feed(&mut line_feeds, fragment_info));
+        Ok(Self(fragmentizer, Some(replay), line_feeds, false))
+    }
+
     /// Progress the fragmentizer and return the next detected fragment
     fn progress(&mut self, py: Python) -> PyResult<Option<Py<PyAny>>> {
-        let Some(fragment_info) = self.0.progress() else {
+        let Some(fragment_info) = self.progress_inner() else {
             return Ok(None);
         };
 
@@ -329,13 +502,17 @@ impl PyFragmentizer {
 
     /// Enqueue more bytes to the fragmentizer
     fn enqueue_bytes(&mut self, bytes: Bound<PyBytes>) {
-        self.0.enqueue_bytes(bytes.as_bytes())
+        self.enqueue_bytes_inner(bytes.as_bytes())
     }
 
     /// Retrieve the bytes for the given fragment
+    ///
+    /// If `normalize_crlf` is set, a line fragment ending with LF is returned with CRLF.
+    #[pyo3(signature = (fragment_info, *, normalize_crlf=false))]
     fn fragment_bytes<'a>(
         slf: PyRef<'a, Self>,
         fragment_info: &Bound<PyAny>,
+        normalize_crlf: bool,
     ) -> PyResult<Bound<'a, PyBytes>> {
         let py = slf.py();
         let fragment_info: FragmentInfo =
@@ -349,12 +526,23 @@ impl PyFragmentizer {
                 ));
             };
 
+        let ends_with_lf = matches!(
+            fragment_info,
+            FragmentInfo::Line {
+                ending: LineEnding::Lf,
+                ..
+            }
+        );
         let bytes = slf.0.fragment_bytes(fragment_info);
-        Ok(PyBytes::new(py, bytes))
+        if normalize_crlf && ends_with_lf && bytes.ends_with(b"\n") {
+            normalized_bytes(py, bytes, &[bytes.len() - 1])
+        } else {
+            Ok(PyBytes::new(py, bytes))
+        }
     }
 
     /// Return if the current message is completely processed
-    fn is_message_complete(&self) -> bool {
+    pub(crate) fn is_message_complete(&self) -> bool {
         self.0.is_message_complete()
     }
 
@@ -364,10 +552,18 @@ impl PyFragmentizer {
     }
 
     /// Retrive the bytes of the current message
-    fn message_bytes(slf: PyRef<Self>) -> Bound<PyBytes> {
+    ///
+    /// If `normalize_crlf` is set, the processed lines ending with LF are returned with CRLF. The
+    /// data of literals is returned unchanged.
+    #[pyo3(signature = (*, normalize_crlf=false))]
+    fn message_bytes(slf: PyRef<Self>, normalize_crlf: bool) -> PyResult<Bound<PyBytes>> {
         let py = slf.py();
         let bytes = slf.0.message_bytes();
-        PyBytes::new(py, bytes)
+        if normalize_crlf {
+            normalized_bytes(py, bytes, &slf.2)
+        } else {
+            Ok(PyBytes::new(py, bytes))
+        }
     }
 
     /// Return if the current message exceeded the max message size
@@ -377,12 +573,18 @@ impl PyFragmentizer {
 
     /// Skip the current message and start the next message immediately
     fn skip_message(&mut self) {
-        self.0.skip_message()
+        self.0.skip_message();
+        if let Some(replay) = &mut self.1 {
+            replay.skip_message();
+        }
     }
 
     /// Poisons the current message to prevent its decoding
     fn poison_message(&mut self) {
-        self.0.poison_message()
+        self.0.poison_message();
+        if let Some(replay) = &mut self.1 {
+            replay.poison_message();
+        }
     }
 
     // TODO izzit good to return string here?
@@ -393,12 +595,25 @@ impl PyFragmentizer {
         Some(PyString::new(py, tag.inner()))
     }
 
+    /// Classifies the current message as command by inspecting its first line without decoding
+    fn peek_command(&self) -> Option<PyMessagePeek> {
+        peek::peek_command(self.0.message_bytes(), self.0.is_message_complete())
+    }
+
+    /// Classifies the current message as response by inspecting its first line without decoding
+    fn peek_response(&self) -> Option<PyMessagePeek> {
+        peek::peek_response(self.0.message_bytes(), self.0.is_message_complete())
+    }
+
     /// Tries to decode the current message as greeting
-    fn decode_greeting(slf: PyRef<'_, Self>) -> PyResult<PyGreeting> {
+    ///
+    /// If `keep_raw` is set, the greeting retains the bytes of the current message.
+    #[pyo3(signature = (*, keep_raw=false))]
+    fn decode_greeting(slf: PyRef<'_, Self>, keep_raw: bool) -> PyResult<PyGreeting> {
         let py = slf.py();
         let codec = GreetingCodec::default();
         match slf.0.decode_message(&codec) {
-            Ok(greeting) => Ok(PyGreeting(greeting.to_static())),
+            Ok(greeting) => Ok(PyGreeting(greeting.to_static(), slf.raw(keep_raw))),
             Err(error) => Err(map_decode_message_error(py, error, |_, e| {
                 Ok(map_greeting_decode_error(e))
             })?),
@@ -406,11 +621,14 @@ impl PyFragmentizer {
     }
 
     /// Tries to decode the current message as command
-    fn decode_command(slf: PyRef<'_, Self>) -> PyResult<PyCommand> {
+    ///
+    /// If `keep_raw` is set, the command retains the bytes of the current message.
+    #[pyo3(signature = (*, keep_raw=false))]
+    fn decode_command(slf: PyRef<'_, Self>, keep_raw: bool) -> PyResult<PyCommand> {
         let py = slf.py();
         let codec = CommandCodec::default();
         match slf.0.decode_message(&codec) {
-            Ok(command) => Ok(PyCommand(command.to_static())),
+            Ok(command) => Ok(PyCommand(command.to_static(), slf.raw(keep_raw))),
             Err(error) => Err(map_decode_message_error(py, error, |py, e| {
                 map_command_decode_error(py, e)
             })?),
@@ -418,11 +636,20 @@ impl PyFragmentizer {
     }
 
     /// Tries to decode the current message as authenticate data
-    fn decode_authenticate_data(slf: PyRef<'_, Self>) -> PyResult<PyAuthenticateData> {
+    ///
+    /// If `keep_raw` is set, the authenticate data retains the bytes of the current message.
+    #[pyo3(signature = (*, keep_raw=false))]
+    fn decode_authenticate_data(
+        slf: PyRef<'_, Self>,
+        keep_raw: bool,
+    ) -> PyResult<PyAuthenticateData> {
         let py = slf.py();
         let codec = AuthenticateDataCodec::default();
         match slf.0.decode_message(&codec) {
-            Ok(authenticate_data) => Ok(PyAuthenticateData(authenticate_data.to_static())),
+            Ok(authenticate_data) => Ok(PyAuthenticateData(
+                authenticate_data.to_static(),
+                slf.raw(keep_raw),
+            )),
             Err(error) => Err(map_decode_message_error(py, error, |_, e| {
                 Ok(map_authenticate_data_decode_error(e))
             })?),
@@ -430,17 +657,138 @@ impl PyFragmentizer {
     }
 
     /// Tries to decode the current message as response
-    fn decode_response(slf: PyRef<'_, Self>) -> PyResult<PyResponse> {
+    ///
+    /// If `fields` is given, FETCH responses only retain the listed attributes, and FETCH
+    /// responses without any of them are skipped (`None`). If `keep_raw` is set, the response
+    /// retains the bytes of the current message.
+    #[pyo3(signature = (*, fields=None, keep_raw=false))]
+    fn decode_response(
+        slf: PyRef<'_, Self>,
+        fields: Option<&Bound<PyAny>>,
+        keep_raw: bool,
+    ) -> PyResult<Option<PyResponse>> {
         let py = slf.py();
+        let projection = fields.map(FetchProjection::from_names).transpose()?;
+        ensure_unprojected(projection, keep_raw)?;
         let codec = ResponseCodec::default();
         match slf.0.decode_message(&codec) {
-            Ok(response) => Ok(PyResponse(response.to_static())),
+            Ok(response) => Ok(project(projection, response)
+                .map(|response| PyResponse(response, slf.raw(keep_raw)))),
             Err(error) => Err(map_decode_message_error(py, error, |py, e| {
                 map_response_decode_error(py, e)
             })?),
         }
     }
 
+    /// Tries to decode the current message as greeting without raising on decoding errors
+    #[pyo3(signature = (*, keep_raw=false))]
+    fn try_decode_greeting(slf: PyRef<'_, Self>, keep_raw: bool) -> PyResult<PyDecodeResult> {
+        let py = slf.py();
+        let codec = GreetingCodec::default();
+        match slf.0.decode_message(&codec) {
+            Ok(greeting) => {
+                let greeting = PyGreeting(greeting.to_static(), slf.raw(keep_raw));
+                slf.decode_result(Bound::new(py, greeting)?.into_any())
+            }
+            Err(error) => decode_message_result(py, error, |_, e| Ok(greeting_decode_result(e))),
+        }
+    }
+
+    /// Tries to decode the current message as command without raising on decoding errors
+    #[pyo3(signature = (*, keep_raw=false))]
+    fn try_decode_command(&self, py: Python, keep_raw: bool) -> PyResult<PyDecodeResult> {
+        self.try_decode_command_inner(py, keep_raw)
+    }
+
+    /// Tries to decode the current message as authenticate data without raising on decoding
+    /// errors
+    #[pyo3(signature = (*, keep_raw=false))]
+    fn try_decode_authenticate_data(
+        slf: PyRef<'_, Self>,
+        keep_raw: bool,
+    ) -> PyResult<PyDecodeResult> {
+        let py = slf.py();
+        let codec = AuthenticateDataCodec::default();
+        match slf.0.decode_message(&codec) {
+            Ok(authenticate_data) => {
+                let authenticate_data =
+                    PyAuthenticateData(authenticate_data.to_static(), slf.raw(keep_raw));
+                slf.decode_result(Bound::new(py, authenticate_data)?.into_any())
+            }
+            Err(error) => {
+                decode_message_result(py, error, |_, e| Ok(authenticate_data_decode_result(e)))
+            }
+        }
+    }
+
+    /// Tries to decode the current message as response without raising on decoding errors
+    ///
+    /// `fields` and `keep_raw` are handled like in `decode_response`.
+    #[pyo3(signature = (*, fields=None, keep_raw=false))]
+    fn try_decode_response(
+        &self,
+        py: Python,
+        fields: Option<&Bound<PyAny>>,
+        keep_raw: bool,
+    ) -> PyResult<PyDecodeResult> {
+        let projection = fields.map(FetchProjection::from_names).transpose()?;
+        self.try_decode_response_inner(py, projection, keep_raw)
+    }
+
+    /// Tries to decode the current message as idle done without raising on decoding errors
+    fn try_decode_idle_done(slf: PyRef<'_, Self>) -> PyResult<PyDecodeResult> {
+        let py = slf.py();
+        let codec = IdleDoneCodec::default();
+        match slf.0.decode_message(&codec) {
+            Ok(idle_done) => {
+                let idle_done = PyIdleDone(idle_done.to_static());
+                slf.decode_result(Bound::new(py, idle_done)?.into_any())
+            }
+            Err(error) => decode_message_result(py, error, |_, e| Ok(idle_done_decode_result(e))),
+        }
+    }
+
+    /// Decodes all complete messages as responses, collecting FETCH responses into columns
+    ///
+    /// Returns the columns, all other responses, and the result of a message that could not be
+    /// decoded. Decoding stops at such a message, which stays the current message, e.g., to
+    /// inspect its bytes. The next call continues after it. An incomplete message at the end of
+    /// the enqueued bytes is left for the next call.
+    ///
+    /// A complete current message is decoded first, e.g., after `progress` returned its last
+    /// fragment, unless it is the failure returned by the previous call.
+    fn decode_fetch_columns(
+        &mut self,
+        py: Python,
+    ) -> PyResult<(PyFetchColumns, Vec<PyResponse>, Option<PyDecodeResult>)> {
+        let codec = ResponseCodec::default();
+        let mut columns = PyFetchColumns::default();
+        let mut responses = Vec::new();
+
+        let mut current = self.0.is_message_complete() && !self.3;
+        while std::mem::take(&mut current) || self.progress_inner().is_some() {
+            if !self.0.is_message_complete() {
+                continue;
+            }
+
+            match self.0.decode_message(&codec) {
+                Ok(response) => {
+                    if !columns.push(&response) {
+                        responses.push(PyResponse(response.to_static(), None));
+                    }
+                }
+                Err(_) => {
+                    // Keep what was decoded so far, the bytes of these messages are consumed
+                    let failure = self.try_decode_response_inner(py, None, false)?;
+                    self.3 = true;
+                    return Ok((columns, responses, Some(failure)));
+                }
+            }
+        }
+
+        Ok((columns, responses, None))
+    }
+
     /// Tries to decode the current message as idle done
     fn decode_idle_done(slf: PyRef<'_, Self>) -> PyResult<PyIdleDone> {
         let py = slf.py();
@@ -463,29 +811,64 @@ where
     C: Decoder,
     C::Message<'a>: Serialize,
 {
-    match decode_message_error {
-        fragmentizer::DecodeMessageError::DecodingFailure(error) => Err(map_failure(py, error)?),
+    match decode_message_error_details(py, decode_message_error)? {
+        Err(error) => Err(map_failure(py, error)?),
+        Ok((PyDecodeStatus::DecodingRemainder, dict)) => {
+            Ok(FragmentizerDecodingRemainderError::new_err(dict.unbind()))
+        }
+        Ok((PyDecodeStatus::MessageTooLong, dict)) => {
+            Ok(FragmentizerMessageTooLongError::new_err(dict.unbind()))
+        }
+        Ok((_, dict)) => Ok(FragmentizerMessagePoisonedError::new_err(dict.unbind())),
+    }
+}
+
+fn decode_message_result<'a, C>(
+    py: Python<'a>,
+    decode_message_error: fragmentizer::DecodeMessageError<'a, C>,
+    map_failure: impl FnOnce(Python<'a>, C::Error<'a>) -> PyResult<PyDecodeResult>,
+) -> PyResult<PyDecodeResult>
+where
+    C: Decoder,
+    C::Message<'a>: Serialize,
+{
+    match decode_message_error_details(py, decode_message_error)? {
+        Err(error) => map_failure(py, error),
+        Ok((status, dict)) => Ok(PyDecodeResult::error(status, Some(dict))),
+    }
+}
+
+/// Return the status and details of fragmentizer specific errors, or the decoding failure
+fn decode_message_error_details<'a, C>(
+    py: Python<'a>,
+    decode_message_error: fragmentizer::DecodeMessageError<'a, C>,
+) -> PyResult<Result<(PyDecodeStatus, Bound<'a, PyDict>), C::Error<'a>>>
+where
+    C: Decoder,
+    C::Message<'a>: Serialize,
+{
+    let dict = PyDict::new(py);
+    let status = match decode_message_error {
+        fragmentizer::DecodeMessageError::DecodingFailure(error) => return Ok(Err(error)),
         fragmentizer::DecodeMessageError::DecodingRemainder { message, remainder } => {
-            let dict = pyo3::types::PyDict::new(py);
             dict.set_item("message", serde_pyobject::to_pyobject(py, &message)?)?;
             // TODO izzit good to declassify here?
             // TODO izzit good to use bytes here?
             dict.set_item("remainder", PyBytes::new(py, remainder.declassify()))?;
-            Ok(FragmentizerDecodingRemainderError::new_err(dict.unbind()))
+            PyDecodeStatus::DecodingRemainder
         }
         fragmentizer::DecodeMessageError::MessageTooLong { initial } => {
-            let dict = pyo3::types::PyDict::new(py);
             // TODO izzit good to declassify here?
             // TODO izzit good to use bytes here?
             dict.set_item("initial", PyBytes::new(py, initial.declassify()))?;
-            Ok(FragmentizerMessageTooLongError::new_err(dict.unbind()))
+            PyDecodeStatus::MessageTooLong
         }
         fragmentizer::DecodeMessageError::MessagePoisoned { discarded } => {
-            let dict = pyo3::types::PyDict::new(py);
             // TODO izzit good to declassify here?
             // TODO izzit good to use bytes here?
             dict.set_item("discarded", PyBytes::new(py, discarded.declassify()))?;
-            Ok(FragmentizerMessagePoisonedError::new_err(dict.unbind()))
+            PyDecodeStatus::MessagePoisoned
         }
-    }
+    };
+    Ok(Ok((status, dict)))
 }
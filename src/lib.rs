@@ -1,8 +1,19 @@
+mod body;
+mod capability;
 mod encoded;
+mod fetch;
 mod fragmentizer;
 mod messages;
+mod peek;
+mod pool;
+mod result;
+mod sequence;
+mod size;
+mod snapshot;
+mod tags;
 
-use encoded::PyEncoded;
+use encoded::{extend_bytearray, PyEncoded, ScratchBuffer, DEFAULT_RETAIN_CAPACITY};
+use fetch::{project, FetchProjection};
 use fragmentizer::{
     FragmentizerDecodeError, FragmentizerDecodingRemainderError, FragmentizerMessagePoisonedError,
     FragmentizerMessageTooLongError,
@@ -10,11 +21,23 @@ use fragmentizer::{
 use imap_codec::{
     decode::{self, Decoder},
     encode::Encoder,
-    imap_types::IntoStatic,
+    imap_types::{
+        core::{LiteralMode, Tag},
+        IntoStatic,
+    },
     AuthenticateDataCodec, CommandCodec, GreetingCodec, IdleDoneCodec, ResponseCodec,
 };
-use messages::{PyAuthenticateData, PyCommand, PyGreeting, PyIdleDone, PyResponse};
-use pyo3::{create_exception, exceptions::PyException, prelude::*, types::PyBytes};
+use messages::{
+    PyAuthenticateData, PyCommand, PyCompactResponse, PyGreeting, PyIdleDone, PyResponse,
+};
+use pyo3::{
+    create_exception,
+    exceptions::{PyAttributeError, PyException, PyValueError},
+    prelude::*,
+    types::{PyByteArray, PyBytes, PyDict, PyType},
+    PyTypeInfo,
+};
+use result::{PyDecodeResult, PyDecodeStatus};
 
 // Create exception types for decode errors
 create_exception!(imap_codec, DecodeError, PyException);
@@ -22,31 +45,139 @@ create_exception!(imap_codec, DecodeFailed, DecodeError);
 create_exception!(imap_codec, DecodeIncomplete, DecodeError);
 create_exception!(imap_codec, DecodeLiteralFound, DecodeError);
 
+/// Return the bytes consumed by a decoder, i.e., `bytes` without the `remaining` bytes
+fn consumed(bytes: &[u8], remaining: &[u8]) -> Vec<u8> {
+    bytes[..bytes.len() - remaining.len()].to_vec()
+}
+
+/// Reject retaining the original bytes of a response that is modified by a projection
+fn ensure_unprojected(projection: Option<FetchProjection>, keep_raw: bool) -> PyResult<()> {
+    if keep_raw && projection.is_some() {
+        return Err(PyValueError::new_err(
+            "`keep_raw` can not be combined with `fields`",
+        ));
+    }
+    Ok(())
+}
+
 /// Python class for using `GreetingCodec`
-#[derive(Debug, Clone, PartialEq)]
-#[pyclass(name = "GreetingCodec")]
-struct PyGreetingCodec;
+///
+/// Instances own a scratch buffer that is reused by `encode_into` and `dump`.
+#[derive(Debug)]
+#[pyclass(name = "GreetingCodec", frozen)]
+struct PyGreetingCodec {
+    codec: GreetingCodec,
+    scratch: ScratchBuffer,
+}
 
 #[pymethods]
 impl PyGreetingCodec {
+    /// Create a codec instance retaining up to `retain_capacity` bytes between calls
+    #[new]
+    #[pyo3(signature = (*, retain_capacity=DEFAULT_RETAIN_CAPACITY))]
+    fn new(retain_capacity: usize) -> Self {
+        Self {
+            codec: GreetingCodec::default(),
+            scratch: ScratchBuffer::new(retain_capacity),
+        }
+    }
+
+    /// Retrieve the capacity retained in the scratch buffer between calls
+    #[getter]
+    fn retain_capacity(&self) -> usize {
+        self.scratch.retain_capacity()
+    }
+
+    /// Retrieve the current capacity of the scratch buffer
+    #[getter]
+    fn scratch_capacity(&self) -> usize {
+        self.scratch.capacity()
+    }
+
     /// Decode greeting from given bytes
+    ///
+    /// If `keep_raw` is set, the greeting retains its original bytes.
     #[staticmethod]
-    fn decode(bytes: Bound<PyBytes>) -> PyResult<(Bound<PyBytes>, PyGreeting)> {
+    #[pyo3(signature = (bytes, *, keep_raw=false))]
+    fn decode(bytes: Bound<PyBytes>, keep_raw: bool) -> PyResult<(Bound<PyBytes>, PyGreeting)> {
         let py = bytes.py();
         let (remaining, greeting) = GreetingCodec::default()
             .decode(bytes.as_bytes())
             .map_err(map_greeting_decode_error)?;
+        let raw = keep_raw.then(|| consumed(bytes.as_bytes(), remaining));
         Ok((
             PyBytes::new(py, remaining),
-            PyGreeting(greeting.into_static()),
+            PyGreeting(greeting.into_static(), raw),
         ))
     }
 
+    /// Decode greeting from given bytes without raising on decoding errors
+    #[staticmethod]
+    #[pyo3(signature = (bytes, *, keep_raw=false))]
+    fn try_decode(bytes: Bound<PyBytes>, keep_raw: bool) -> PyResult<PyDecodeResult> {
+        let py = bytes.py();
+        match GreetingCodec::default().decode(bytes.as_bytes()) {
+            Ok((remaining, greeting)) => {
+                let raw = keep_raw.then(|| consumed(bytes.as_bytes(), remaining));
+                let greeting = Bound::new(py, PyGreeting(greeting.into_static(), raw))?;
+                Ok(PyDecodeResult::ok(
+                    bytes.as_bytes().len() - remaining.len(),
+                    greeting.into_any(),
+                ))
+            }
+            Err(error) => Ok(greeting_decode_result(error)),
+        }
+    }
+
     /// Encode greeting into fragments
+    ///
+    /// If `passthrough` is set, the original bytes of a greeting are used instead (if retained).
     #[staticmethod]
-    fn encode(greeting: &PyGreeting) -> PyEncoded {
-        let encoded = GreetingCodec::default().encode(&greeting.0);
-        PyEncoded(Some(encoded))
+    #[pyo3(signature = (greeting, *, passthrough=false))]
+    fn encode(greeting: &PyGreeting, passthrough: bool) -> PyEncoded {
+        match greeting.1.as_deref().filter(|_| passthrough) {
+            Some(raw) => PyEncoded::from_raw(raw),
+            None => GreetingCodec::default().encode(&greeting.0).into(),
+        }
+    }
+
+    /// Encode greeting and append the bytes to `buffer`, return the number of bytes written
+    ///
+    /// If `passthrough` is set, the original bytes of a greeting are used instead (if retained).
+    #[pyo3(signature = (greeting, buffer, *, passthrough=false))]
+    fn encode_into(
+        &self,
+        greeting: &PyGreeting,
+        buffer: &Bound<PyByteArray>,
+        passthrough: bool,
+    ) -> PyResult<usize> {
+        match greeting.1.as_deref().filter(|_| passthrough) {
+            Some(raw) => extend_bytearray(buffer, raw),
+            None => {
+                let encoded = self.codec.encode(&greeting.0);
+                self.scratch
+                    .dump(encoded, |data| extend_bytearray(buffer, data))
+            }
+        }
+    }
+
+    /// Encode greeting into `bytes` without being guided by fragments
+    ///
+    /// If `passthrough` is set, the original bytes of a greeting are used instead (if retained).
+    #[pyo3(signature = (greeting, *, passthrough=false))]
+    fn dump<'py>(
+        &self,
+        py: Python<'py>,
+        greeting: &PyGreeting,
+        passthrough: bool,
+    ) -> PyResult<Bound<'py, PyBytes>> {
+        match greeting.1.as_deref().filter(|_| passthrough) {
+            Some(raw) => Ok(PyBytes::new(py, raw)),
+            None => {
+                let encoded = self.codec.encode(&greeting.0);
+                Ok(self.scratch.dump(encoded, |data| PyBytes::new(py, data)))
+            }
+        }
     }
 }
 
@@ -57,31 +188,135 @@ fn map_greeting_decode_error(error: decode::GreetingDecodeError) -> PyErr {
     }
 }
 
+fn greeting_decode_result(error: decode::GreetingDecodeError) -> PyDecodeResult {
+    match error {
+        decode::GreetingDecodeError::Incomplete => {
+            PyDecodeResult::error(PyDecodeStatus::Incomplete, None)
+        }
+        decode::GreetingDecodeError::Failed => PyDecodeResult::error(PyDecodeStatus::Failed, None),
+    }
+}
+
 /// Python class for using `CommandCodec`
-#[derive(Debug, Clone, PartialEq)]
-#[pyclass(name = "CommandCodec")]
-struct PyCommandCodec;
+///
+/// Instances own a scratch buffer that is reused by `encode_into` and `dump`.
+#[derive(Debug)]
+#[pyclass(name = "CommandCodec", frozen)]
+struct PyCommandCodec {
+    codec: CommandCodec,
+    scratch: ScratchBuffer,
+}
 
 #[pymethods]
 impl PyCommandCodec {
+    /// Create a codec instance retaining up to `retain_capacity` bytes between calls
+    #[new]
+    #[pyo3(signature = (*, retain_capacity=DEFAULT_RETAIN_CAPACITY))]
+    fn new(retain_capacity: usize) -> Self {
+        Self {
+            codec: CommandCodec::default(),
+            scratch: ScratchBuffer::new(retain_capacity),
+        }
+    }
+
+    /// Retrieve the capacity retained in the scratch buffer between calls
+    #[getter]
+    fn retain_capacity(&self) -> usize {
+        self.scratch.retain_capacity()
+    }
+
+    /// Retrieve the current capacity of the scratch buffer
+    #[getter]
+    fn scratch_capacity(&self) -> usize {
+        self.scratch.capacity()
+    }
+
     /// Decode command from given bytes
+    ///
+    /// If `keep_raw` is set, the command retains its original bytes.
     #[staticmethod]
-    fn decode(bytes: Bound<PyBytes>) -> PyResult<(Bound<PyBytes>, PyCommand)> {
+    #[pyo3(signature = (bytes, *, keep_raw=false))]
+    fn decode(bytes: Bound<PyBytes>, keep_raw: bool) -> PyResult<(Bound<PyBytes>, PyCommand)> {
         let py = bytes.py();
         match CommandCodec::default().decode(bytes.as_bytes()) {
-            Ok((remaining, command)) => Ok((
-                PyBytes::new(py, remaining),
-                PyCommand(command.into_static()),
-            )),
+            Ok((remaining, command)) => {
+                let raw = keep_raw.then(|| consumed(bytes.as_bytes(), remaining));
+                Ok((
+                    PyBytes::new(py, remaining),
+                    PyCommand(command.into_static(), raw),
+                ))
+            }
             Err(error) => Err(map_command_decode_error(py, error)?),
         }
     }
 
+    /// Decode command from given bytes without raising on decoding errors
+    #[staticmethod]
+    #[pyo3(signature = (bytes, *, keep_raw=false))]
+    fn try_decode(bytes: Bound<PyBytes>, keep_raw: bool) -> PyResult<PyDecodeResult> {
+        let py = bytes.py();
+        match CommandCodec::default().decode(bytes.as_bytes()) {
+            Ok((remaining, command)) => {
+                let raw = keep_raw.then(|| consumed(bytes.as_bytes(), remaining));
+                let command = Bound::new(py, PyCommand(command.into_static(), raw))?;
+                Ok(PyDecodeResult::ok(
+                    bytes.as_bytes().len() - remaining.len(),
+                    command.into_any(),
+                ))
+            }
+            Err(error) => command_decode_result(py, error),
+        }
+    }
+
     /// Encode command into fragments
+    ///
+    /// If `passthrough` is set, the original bytes of a command are used instead (if retained).
     #[staticmethod]
-    fn encode(command: &PyCommand) -> PyEncoded {
-        let encoded = CommandCodec::default().encode(&command.0);
-        PyEncoded(Some(encoded))
+    #[pyo3(signature = (command, *, passthrough=false))]
+    fn encode(command: &PyCommand, passthrough: bool) -> PyEncoded {
+        match command.1.as_deref().filter(|_| passthrough) {
+            Some(raw) => PyEncoded::from_raw(raw),
+            None => CommandCodec::default().encode(&command.0).into(),
+        }
+    }
+
+    /// Encode command and append the bytes to `buffer`, return the number of bytes written
+    ///
+    /// If `passthrough` is set, the original bytes of a command are used instead (if retained).
+    #[pyo3(signature = (command, buffer, *, passthrough=false))]
+    fn encode_into(
+        &self,
+        command: &PyCommand,
+        buffer: &Bound<PyByteArray>,
+        passthrough: bool,
+    ) -> PyResult<usize> {
+        match command.1.as_deref().filter(|_| passthrough) {
+            Some(raw) => extend_bytearray(buffer, raw),
+            None => {
+                let encoded = self.codec.encode(&command.0);
+                self.scratch
+                    .dump(encoded, |data| extend_bytearray(buffer, data))
+            }
+        }
+    }
+
+    /// Encode command into `bytes` without being guided by fragments
+    ///
+    /// If `passthrough` is set, the original bytes of a command are used instead (if retained).
+    #[pyo3(signature = (command, *, passthrough=false))]
+    fn dump<'py>(
+        &self,
+        py: Python<'py>,
+        command: &PyCommand,
+        passthrough: bool,
+    ) -> PyResult<Bound<'py, PyBytes>> {
+        match command.1.as_deref().filter(|_| passthrough) {
+            Some(raw) => Ok(PyBytes::new(py, raw)),
+            None => {
+                let encoded = self.codec.encode(&command.0);
+                Ok(self.scratch.dump(encoded, |data| PyBytes::new(py, data)))
+            }
+        }
     }
 }
 
@@ -89,41 +324,167 @@ fn map_command_decode_error(py: Python, error: decode::CommandDecodeError) -> Py
     match error {
         decode::CommandDecodeError::Incomplete => Ok(DecodeIncomplete::new_err(())),
         decode::CommandDecodeError::LiteralFound { tag, length, mode } => {
-            let dict = pyo3::types::PyDict::new(py);
-            dict.set_item("tag", serde_pyobject::to_pyobject(py, &tag)?)?;
-            dict.set_item("length", length)?;
-            dict.set_item("mode", serde_pyobject::to_pyobject(py, &mode)?)?;
+            let dict = command_literal_found_details(py, &tag, length, mode)?;
             Ok(DecodeLiteralFound::new_err(dict.unbind()))
         }
         decode::CommandDecodeError::Failed => Ok(DecodeFailed::new_err(())),
     }
 }
 
+fn command_decode_result(
+    py: Python,
+    error: decode::CommandDecodeError,
+) -> PyResult<PyDecodeResult> {
+    Ok(match error {
+        decode::CommandDecodeError::Incomplete => {
+            PyDecodeResult::error(PyDecodeStatus::Incomplete, None)
+        }
+        decode::CommandDecodeError::LiteralFound { tag, length, mode } => {
+            let dict = command_literal_found_details(py, &tag, length, mode)?;
+            PyDecodeResult::error(PyDecodeStatus::LiteralFound, Some(dict))
+        }
+        decode::CommandDecodeError::Failed => PyDecodeResult::error(PyDecodeStatus::Failed, None),
+    })
+}
+
+fn command_literal_found_details<'py>(
+    py: Python<'py>,
+    tag: &Tag,
+    length: u32,
+    mode: LiteralMode,
+) -> PyResult<Bound<'py, PyDict>> {
+    let dict = PyDict::new(py);
+    dict.set_item("tag", serde_pyobject::to_pyobject(py, tag)?)?;
+    dict.set_item("length", length)?;
+    dict.set_item("mode", serde_pyobject::to_pyobject(py, &mode)?)?;
+    Ok(dict)
+}
+
 /// Python class for using `AuthenticateDataCodec`
-#[derive(Debug, Clone, PartialEq)]
-#[pyclass(name = "AuthenticateDataCodec")]
-struct PyAuthenticateDataCodec;
+///
+/// Instances own a scratch buffer that is reused by `encode_into` and `dump`.
+#[derive(Debug)]
+#[pyclass(name = "AuthenticateDataCodec", frozen)]
+struct PyAuthenticateDataCodec {
+    codec: AuthenticateDataCodec,
+    scratch: ScratchBuffer,
+}
 
 #[pymethods]
 impl PyAuthenticateDataCodec {
+    /// Create a codec instance retaining up to `retain_capacity` bytes between calls
+    #[new]
+    #[pyo3(signature = (*, retain_capacity=DEFAULT_RETAIN_CAPACITY))]
+    fn new(retain_capacity: usize) -> Self {
+        Self {
+            codec: AuthenticateDataCodec::default(),
+            scratch: ScratchBuffer::new(retain_capacity),
+        }
+    }
+
+    /// Retrieve the capacity retained in the scratch buffer between calls
+    #[getter]
+    fn retain_capacity(&self) -> usize {
+        self.scratch.retain_capacity()
+    }
+
+    /// Retrieve the current capacity of the scratch buffer
+    #[getter]
+    fn scratch_capacity(&self) -> usize {
+        self.scratch.capacity()
+    }
+
     /// Decode authenticate data line from given bytes
+    ///
+    /// If `keep_raw` is set, the authenticate data line retains its original bytes.
     #[staticmethod]
-    fn decode(bytes: Bound<PyBytes>) -> PyResult<(Bound<PyBytes>, PyAuthenticateData)> {
+    #[pyo3(signature = (bytes, *, keep_raw=false))]
+    fn decode(
+        bytes: Bound<PyBytes>,
+        keep_raw: bool,
+    ) -> PyResult<(Bound<PyBytes>, PyAuthenticateData)> {
         let py = bytes.py();
         let (remaining, authenticate_data) = AuthenticateDataCodec::default()
             .decode(bytes.as_bytes())
             .map_err(map_authenticate_data_decode_error)?;
+        let raw = keep_raw.then(|| consumed(bytes.as_bytes(), remaining));
         Ok((
             PyBytes::new(py, remaining),
-            PyAuthenticateData(authenticate_data.into_static()),
+            PyAuthenticateData(authenticate_data.into_static(), raw),
         ))
     }
 
+    /// Decode authenticate data line from given bytes without raising on decoding errors
+    #[staticmethod]
+    #[pyo3(signature = (bytes, *, keep_raw=false))]
+    fn try_decode(bytes: Bound<PyBytes>, keep_raw: bool) -> PyResult<PyDecodeResult> {
+        let py = bytes.py();
+        match AuthenticateDataCodec::default().decode(bytes.as_bytes()) {
+            Ok((remaining, authenticate_data)) => {
+                let raw = keep_raw.then(|| consumed(bytes.as_bytes(), remaining));
+                let authenticate_data =
+                    Bound::new(py, PyAuthenticateData(authenticate_data.into_static(), raw))?;
+                Ok(PyDecodeResult::ok(
+                    bytes.as_bytes().len() - remaining.len(),
+                    authenticate_data.into_any(),
+                ))
+            }
+            Err(error) => Ok(authenticate_data_decode_result(error)),
+        }
+    }
+
     /// Encode authenticate data line into fragments
+    ///
+    /// If `passthrough` is set, the original bytes of an authenticate data line are used instead
+    /// (if retained).
     #[staticmethod]
-    fn encode(authenticate_data: &PyAuthenticateData) -> PyEncoded {
-        let encoded = AuthenticateDataCodec::default().encode(&authenticate_data.0);
-        PyEncoded(Some(encoded))
+    #[pyo3(signature = (authenticate_data, *, passthrough=false))]
+    fn encode(authenticate_data: &PyAuthenticateData, passthrough: bool) -> PyEncoded {
+        match authenticate_data.1.as_deref().filter(|_| passthrough) {
+            Some(raw) => PyEncoded::from_raw(raw),
+            None => AuthenticateDataCodec::default()
+                .encode(&authenticate_data.0)
+                .into(),
+        }
+    }
+
+    /// Encode authenticate data line and append the bytes to `buffer`, return the number of bytes written
+    ///
+    /// If `passthrough` is set, the original bytes of an authenticate data line are used instead (if retained).
+    #[pyo3(signature = (authenticate_data, buffer, *, passthrough=false))]
+    fn encode_into(
+        &self,
+        authenticate_data: &PyAuthenticateData,
+        buffer: &Bound<PyByteArray>,
+        passthrough: bool,
+    ) -> PyResult<usize> {
+        match authenticate_data.1.as_deref().filter(|_| passthrough) {
+            Some(raw) => extend_bytearray(buffer, raw),
+            None => {
+                let encoded = self.codec.encode(&authenticate_data.0);
+                self.scratch
+                    .dump(encoded, |data| extend_bytearray(buffer, data))
+            }
+        }
+    }
+
+    /// Encode authenticate data line into `bytes` without being guided by fragments
+    ///
+    /// If `passthrough` is set, the original bytes of an authenticate data line are used instead (if retained).
+    #[pyo3(signature = (authenticate_data, *, passthrough=false))]
+    fn dump<'py>(
+        &self,
+        py: Python<'py>,
+        authenticate_data: &PyAuthenticateData,
+        passthrough: bool,
+    ) -> PyResult<Bound<'py, PyBytes>> {
+        match authenticate_data.1.as_deref().filter(|_| passthrough) {
+            Some(raw) => Ok(PyBytes::new(py, raw)),
+            None => {
+                let encoded = self.codec.encode(&authenticate_data.0);
+                Ok(self.scratch.dump(encoded, |data| PyBytes::new(py, data)))
+            }
+        }
     }
 }
 
@@ -134,31 +495,155 @@ fn map_authenticate_data_decode_error(error: decode::AuthenticateDataDecodeError
     }
 }
 
+fn authenticate_data_decode_result(error: decode::AuthenticateDataDecodeError) -> PyDecodeResult {
+    match error {
+        decode::AuthenticateDataDecodeError::Incomplete => {
+            PyDecodeResult::error(PyDecodeStatus::Incomplete, None)
+        }
+        decode::AuthenticateDataDecodeError::Failed => {
+            PyDecodeResult::error(PyDecodeStatus::Failed, None)
+        }
+    }
+}
+
 /// Python class for using `ResponseCodec`
-#[derive(Debug, Clone, PartialEq)]
-#[pyclass(name = "ResponseCodec")]
-struct PyResponseCodec;
+///
+/// Instances own a scratch buffer that is reused by `encode_into` and `dump`.
+#[derive(Debug)]
+#[pyclass(name = "ResponseCodec", frozen)]
+struct PyResponseCodec {
+    codec: ResponseCodec,
+    scratch: ScratchBuffer,
+}
 
 #[pymethods]
 impl PyResponseCodec {
+    /// Create a codec instance retaining up to `retain_capacity` bytes between calls
+    #[new]
+    #[pyo3(signature = (*, retain_capacity=DEFAULT_RETAIN_CAPACITY))]
+    fn new(retain_capacity: usize) -> Self {
+        Self {
+            codec: ResponseCodec::default(),
+            scratch: ScratchBuffer::new(retain_capacity),
+        }
+    }
+
+    /// Retrieve the capacity retained in the scratch buffer between calls
+    #[getter]
+    fn retain_capacity(&self) -> usize {
+        self.scratch.retain_capacity()
+    }
+
+    /// Retrieve the current capacity of the scratch buffer
+    #[getter]
+    fn scratch_capacity(&self) -> usize {
+        self.scratch.capacity()
+    }
+
     /// Decode response from given bytes
+    ///
+    /// If `fields` is given, FETCH responses only retain the listed attributes, and FETCH
+    /// responses without any of them are skipped (`None`). If `keep_raw` is set, the response
+    /// retains its original bytes.
     #[staticmethod]
-    fn decode(bytes: Bound<PyBytes>) -> PyResult<(Bound<PyBytes>, PyResponse)> {
+    #[pyo3(signature = (bytes, *, fields=None, keep_raw=false))]
+    fn decode<'py>(
+        bytes: Bound<'py, PyBytes>,
+        fields: Option<&Bound<'py, PyAny>>,
+        keep_raw: bool,
+    ) -> PyResult<(Bound<'py, PyBytes>, Option<PyResponse>)> {
         let py = bytes.py();
+        let projection = fields.map(FetchProjection::from_names).transpose()?;
+        ensure_unprojected(projection, keep_raw)?;
         match ResponseCodec::default().decode(bytes.as_bytes()) {
-            Ok((remaining, response)) => Ok((
-                PyBytes::new(py, remaining),
-                PyResponse(response.into_static()),
-            )),
+            Ok((remaining, response)) => {
+                let raw = keep_raw.then(|| consumed(bytes.as_bytes(), remaining));
+                let response =
+                    project(projection, response).map(|response| PyResponse(response, raw));
+                Ok((PyBytes::new(py, remaining), response))
+            }
             Err(error) => Err(map_response_decode_error(py, error)?),
         }
     }
 
+    /// Decode response from given bytes without raising on decoding errors
+    ///
+    /// `fields` and `keep_raw` are handled like in `decode`.
+    #[staticmethod]
+    #[pyo3(signature = (bytes, *, fields=None, keep_raw=false))]
+    fn try_decode<'py>(
+        bytes: Bound<'py, PyBytes>,
+        fields: Option<&Bound<'py, PyAny>>,
+        keep_raw: bool,
+    ) -> PyResult<PyDecodeResult> {
+        let py = bytes.py();
+        let projection = fields.map(FetchProjection::from_names).transpose()?;
+        ensure_unprojected(projection, keep_raw)?;
+        match ResponseCodec::default().decode(bytes.as_bytes()) {
+            Ok((remaining, response)) => {
+                let raw = keep_raw.then(|| consumed(bytes.as_bytes(), remaining));
+                let response = match project(projection, response) {
+                    Some(response) => Bound::new(py, PyResponse(response, raw))?.into_any(),
+                    None => py.None().into_bound(py),
+                };
+                Ok(PyDecodeResult::ok(
+                    bytes.as_bytes().len() - remaining.len(),
+                    response,
+                ))
+            }
+            Err(error) => response_decode_result(py, error),
+        }
+    }
+
     /// Encode response into fragments
+    ///
+    /// If `passthrough` is set, the original bytes of a response are used instead (if retained).
     #[staticmethod]
-    fn encode(response: &PyResponse) -> PyEncoded {
-        let encoded = ResponseCodec::default().encode(&response.0);
-        PyEncoded(Some(encoded))
+    #[pyo3(signature = (response, *, passthrough=false))]
+    fn encode(response: &PyResponse, passthrough: bool) -> PyEncoded {
+        match response.1.as_deref().filter(|_| passthrough) {
+            Some(raw) => PyEncoded::from_raw(raw),
+            None => ResponseCodec::default().encode(&response.0).into(),
+        }
+    }
+
+    /// Encode response and append the bytes to `buffer`, return the number of bytes written
+    ///
+    /// If `passthrough` is set, the original bytes of a response are used instead (if retained).
+    #[pyo3(signature = (response, buffer, *, passthrough=false))]
+    fn encode_into(
+        &self,
+        response: &PyResponse,
+        buffer: &Bound<PyByteArray>,
+        passthrough: bool,
+    ) -> PyResult<usize> {
+        match response.1.as_deref().filter(|_| passthrough) {
+            Some(raw) => extend_bytearray(buffer, raw),
+            None => {
+                let encoded = self.codec.encode(&response.0);
+                self.scratch
+                    .dump(encoded, |data| extend_bytearray(buffer, data))
+            }
+        }
+    }
+
+    /// Encode response into `bytes` without being guided by fragments
+    ///
+    /// If `passthrough` is set, the original bytes of a response are used instead (if retained).
+    #[pyo3(signature = (response, *, passthrough=false))]
+    fn dump<'py>(
+        &self,
+        py: Python<'py>,
+        response: &PyResponse,
+        passthrough: bool,
+    ) -> PyResult<Bound<'py, PyBytes>> {
+        match response.1.as_deref().filter(|_| passthrough) {
+            Some(raw) => Ok(PyBytes::new(py, raw)),
+            None => {
+                let encoded = self.codec.encode(&response.0);
+                Ok(self.scratch.dump(encoded, |data| PyBytes::new(py, data)))
+            }
+        }
     }
 }
 
@@ -166,21 +651,69 @@ fn map_response_decode_error(py: Python, error: decode::ResponseDecodeError) ->
     match error {
         decode::ResponseDecodeError::Incomplete => Ok(DecodeIncomplete::new_err(())),
         decode::ResponseDecodeError::LiteralFound { length } => {
-            let dict = pyo3::types::PyDict::new(py);
-            dict.set_item("length", length)?;
+            let dict = response_literal_found_details(py, length)?;
             Ok(DecodeLiteralFound::new_err(dict.unbind()))
         }
         decode::ResponseDecodeError::Failed => Ok(DecodeFailed::new_err(())),
     }
 }
 
+fn response_decode_result(
+    py: Python,
+    error: decode::ResponseDecodeError,
+) -> PyResult<PyDecodeResult> {
+    Ok(match error {
+        decode::ResponseDecodeError::Incomplete => {
+            PyDecodeResult::error(PyDecodeStatus::Incomplete, None)
+        }
+        decode::ResponseDecodeError::LiteralFound { length } => {
+            let dict = response_literal_found_details(py, length)?;
+            PyDecodeResult::error(PyDecodeStatus::LiteralFound, Some(dict))
+        }
+        decode::ResponseDecodeError::Failed => PyDecodeResult::error(PyDecodeStatus::Failed, None),
+    })
+}
+
+fn response_literal_found_details(py: Python, length: u32) -> PyResult<Bound<PyDict>> {
+    let dict = PyDict::new(py);
+    dict.set_item("length", length)?;
+    Ok(dict)
+}
+
 /// Python class for using `IdleDoneCodec`
-#[derive(Debug, Clone, PartialEq)]
-#[pyclass(name = "IdleDoneCodec")]
-struct PyIdleDoneCodec;
+///
+/// Instances own a scratch buffer that is reused by `encode_into` and `dump`.
+#[derive(Debug)]
+#[pyclass(name = "IdleDoneCodec", frozen)]
+struct PyIdleDoneCodec {
+    codec: IdleDoneCodec,
+    scratch: ScratchBuffer,
+}
 
 #[pymethods]
 impl PyIdleDoneCodec {
+    /// Create a codec instance retaining up to `retain_capacity` bytes between calls
+    #[new]
+    #[pyo3(signature = (*, retain_capacity=DEFAULT_RETAIN_CAPACITY))]
+    fn new(retain_capacity: usize) -> Self {
+        Self {
+            codec: IdleDoneCodec::default(),
+            scratch: ScratchBuffer::new(retain_capacity),
+        }
+    }
+
+    /// Retrieve the capacity retained in the scratch buffer between calls
+    #[getter]
+    fn retain_capacity(&self) -> usize {
+        self.scratch.retain_capacity()
+    }
+
+    /// Retrieve the current capacity of the scratch buffer
+    #[getter]
+    fn scratch_capacity(&self) -> usize {
+        self.scratch.capacity()
+    }
+
     /// Decode idle done from given bytes
     #[staticmethod]
     fn decode(bytes: Bound<PyBytes>) -> PyResult<(Bound<PyBytes>, PyIdleDone)> {
@@ -194,11 +727,39 @@ impl PyIdleDoneCodec {
         ))
     }
 
+    /// Decode idle done from given bytes without raising on decoding errors
+    #[staticmethod]
+    fn try_decode(bytes: Bound<PyBytes>) -> PyResult<PyDecodeResult> {
+        let py = bytes.py();
+        match IdleDoneCodec::default().decode(bytes.as_bytes()) {
+            Ok((remaining, idle_done)) => {
+                let idle_done = Bound::new(py, PyIdleDone(idle_done.into_static()))?;
+                Ok(PyDecodeResult::ok(
+                    bytes.as_bytes().len() - remaining.len(),
+                    idle_done.into_any(),
+                ))
+            }
+            Err(error) => Ok(idle_done_decode_result(error)),
+        }
+    }
+
     /// Encode idle done into fragments
     #[staticmethod]
     fn encode(idle_done: &PyIdleDone) -> PyEncoded {
-        let encoded = IdleDoneCodec::default().encode(&idle_done.0);
-        PyEncoded(Some(encoded))
+        IdleDoneCodec::default().encode(&idle_done.0).into()
+    }
+
+    /// Encode idle done and append the bytes to `buffer`, return the number of bytes written
+    fn encode_into(&self, idle_done: &PyIdleDone, buffer: &Bound<PyByteArray>) -> PyResult<usize> {
+        let encoded = self.codec.encode(&idle_done.0);
+        self.scratch
+            .dump(encoded, |data| extend_bytearray(buffer, data))
+    }
+
+    /// Encode idle done into `bytes` without being guided by fragments
+    fn dump<'py>(&self, py: Python<'py>, idle_done: &PyIdleDone) -> PyResult<Bound<'py, PyBytes>> {
+        let encoded = self.codec.encode(&idle_done.0);
+        Ok(self.scratch.dump(encoded, |data| PyBytes::new(py, data)))
     }
 }
 
@@ -209,7 +770,102 @@ fn map_idle_done_decode_error(error: decode::IdleDoneDecodeError) -> PyErr {
     }
 }
 
-#[pymodule]
+fn idle_done_decode_result(error: decode::IdleDoneDecodeError) -> PyDecodeResult {
+    match error {
+        decode::IdleDoneDecodeError::Incomplete => {
+            PyDecodeResult::error(PyDecodeStatus::Incomplete, None)
+        }
+        decode::IdleDoneDecodeError::Failed => PyDecodeResult::error(PyDecodeStatus::Failed, None),
+    }
+}
+
+/// Return the type object of `T`, creating it on first use
+fn class<T: PyTypeInfo>(py: Python<'_>) -> Bound<'_, PyType> {
+    py.get_type::<T>()
+}
+
+type ClassFn = for<'py> fn(Python<'py>) -> Bound<'py, PyType>;
+
+/// Classes of the module, which are registered on first access by the module's `__getattr__`
+///
+/// Creating all type objects when importing the module takes a noticeable part of the import time,
+/// although most programs only use a few of them.
+const CLASSES: &[(&str, ClassFn)] = &[
+    ("LiteralMode", class::<encoded::PyLiteralMode>),
+    ("LineFragment", class::<encoded::PyLineFragment>),
+    ("LiteralFragment", class::<encoded::PyLiteralFragment>),
+    ("FileLiteral", class::<encoded::PyFileLiteral>),
+    ("StreamLiteral", class::<encoded::PyStreamLiteral>),
+    ("LineEnding", class::<fragmentizer::PyLineEnding>),
+    (
+        "LiteralAnnouncement",
+        class::<fragmentizer::PyLiteralAnnouncement>,
+    ),
+    (
+        "LineFragmentInfo",
+        class::<fragmentizer::PyLineFragmentInfo>,
+    ),
+    (
+        "LiteralFragmentInfo",
+        class::<fragmentizer::PyLiteralFragmentInfo>,
+    ),
+    ("Fragmentizer", class::<fragmentizer::PyFragmentizer>),
+    ("MessageKind", class::<peek::PyMessageKind>),
+    ("MessagePeek", class::<peek::PyMessagePeek>),
+    ("FragmentizerPool", class::<pool::PyFragmentizerPool>),
+    ("TagTracker", class::<tags::PyTagTracker>),
+    ("DecodeStatus", class::<result::PyDecodeStatus>),
+    ("DecodeResult", class::<result::PyDecodeResult>),
+    ("Encoded", class::<PyEncoded>),
+    ("FetchColumns", class::<fetch::PyFetchColumns>),
+    ("BodyStructure", class::<body::PyBodyStructure>),
+    ("CapabilitySet", class::<capability::PyCapabilitySet>),
+    ("DecodeCache", class::<capability::PyDecodeCache>),
+    ("Greeting", class::<PyGreeting>),
+    ("GreetingCodec", class::<PyGreetingCodec>),
+    ("Command", class::<PyCommand>),
+    ("CommandCodec", class::<PyCommandCodec>),
+    ("AuthenticateData", class::<PyAuthenticateData>),
+    ("AuthenticateDataCodec", class::<PyAuthenticateDataCodec>),
+    ("Response", class::<PyResponse>),
+    ("ResponseCodec", class::<PyResponseCodec>),
+    ("CompactResponse", class::<PyCompactResponse>),
+    ("IdleDone", class::<PyIdleDone>),
+    ("IdleDoneCodec", class::<PyIdleDoneCodec>),
+    ("SequenceSet", class::<sequence::PySequenceSet>),
+    (
+        "SequenceSetIterator",
+        class::<sequence::PySequenceSetIterator>,
+    ),
+];
+
+/// Create and register a class of `CLASSES` on first access (see PEP 562)
+#[pyfunction]
+#[pyo3(pass_module, name = "__getattr__")]
+fn module_getattr<'py>(module: &Bound<'py, PyModule>, name: &str) -> PyResult<Bound<'py, PyType>> {
+    let Some((_, class)) = CLASSES.iter().find(|(class_name, _)| *class_name == name) else {
+        return Err(PyAttributeError::new_err(format!(
+            "module 'imap_codec' has no attribute '{name}'"
+        )));
+    };
+    let class = class(module.py());
+    // Later accesses find the class in the module's namespace and skip `__getattr__`
+    module.setattr(name, &class)?;
+    Ok(class)
+}
+
+/// List the attributes of the module, including the classes that are not registered yet
+#[pyfunction]
+#[pyo3(pass_module, name = "__dir__")]
+fn module_dir(module: &Bound<'_, PyModule>) -> PyResult<Vec<String>> {
+    let mut names = module.dict().keys().extract::<Vec<String>>()?;
+    names.extend(CLASSES.iter().map(|(name, _)| name.to_string()));
+    names.sort();
+    names.dedup();
+    Ok(names)
+}
+
+#[pymodule(gil_used = false)]
 #[pyo3(name = "imap_codec")]
 fn imap_codec_python(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add("DecodeError", m.py().get_type::<DecodeError>())?;
@@ -235,25 +891,15 @@ fn imap_codec_python(m: &Bound<'_, PyModule>) -> PyResult<()> {
         "FragmentizerMessagePoisonedError",
         m.py().get_type::<FragmentizerMessagePoisonedError>(),
     )?;
-    m.add_class::<encoded::PyLiteralMode>()?;
-    m.add_class::<encoded::PyLineFragment>()?;
-    m.add_class::<encoded::PyLiteralFragment>()?;
-    m.add_class::<fragmentizer::PyLineEnding>()?;
-    m.add_class::<fragmentizer::PyLiteralAnnouncement>()?;
-    m.add_class::<fragmentizer::PyLineFragmentInfo>()?;
-    m.add_class::<fragmentizer::PyLiteralFragmentInfo>()?;
-    m.add_class::<fragmentizer::PyFragmentizer>()?;
-    m.add_class::<PyEncoded>()?;
-    m.add_class::<PyGreeting>()?;
-    m.add_class::<PyGreetingCodec>()?;
-    m.add_class::<PyCommand>()?;
-    m.add_class::<PyCommandCodec>()?;
-    m.add_class::<PyAuthenticateData>()?;
-    m.add_class::<PyAuthenticateDataCodec>()?;
-    m.add_class::<PyResponse>()?;
-    m.add_class::<PyResponseCodec>()?;
-    m.add_class::<PyIdleDone>()?;
-    m.add_class::<PyIdleDoneCodec>()?;
+    // Not added via `add_function`, which would list them in `__all__`
+    m.setattr("__getattr__", wrap_pyfunction!(module_getattr, m)?)?;
+    m.setattr("__dir__", wrap_pyfunction!(module_dir, m)?)?;
+
+    // `from imap_codec import *` includes the classes, which registers them
+    let all = m.index()?;
+    for (name, _) in CLASSES {
+        all.append(name)?;
+    }
 
     Ok(())
 }
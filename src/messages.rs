@@ -1,25 +1,47 @@
-use imap_codec::imap_types::{
-    auth::AuthenticateData,
-    command::Command,
-    extensions::idle::IdleDone,
-    response::{Greeting, Response},
+use imap_codec::{
+    decode::Decoder,
+    encode::Encoder,
+    imap_types::{
+        auth::AuthenticateData,
+        command::{Command, CommandBody},
+        extensions::idle::IdleDone,
+        response::{Greeting, Response},
+        IntoStatic,
+    },
+    ResponseCodec,
 };
 use pyo3::{
+    exceptions::PyValueError,
     prelude::*,
-    types::{PyDict, PyString},
+    types::{PyBytes, PyDict, PyList, PyString},
+};
+use serde::{Deserialize, Serialize};
+
+use crate::{
+    sequence::{self, PySequenceSet},
+    size::{heap_size, object_size},
 };
 
 /// Python wrapper class around `Greeting`
-#[derive(Debug, Clone, PartialEq)]
-#[pyclass(name = "Greeting", eq)]
-pub(crate) struct PyGreeting(pub(crate) Greeting<'static>);
+///
+/// The second field holds the original bytes of a decoded greeting if requested by `keep_raw`.
+#[derive(Debug, Clone)]
+#[pyclass(name = "Greeting", eq, frozen)]
+pub(crate) struct PyGreeting(pub(crate) Greeting<'static>, pub(crate) Option<Vec<u8>>);
+
+/// Original bytes are not taken into account
+impl PartialEq for PyGreeting {
+    fn eq(&self, other: &Self) -> bool {
+        self.0 == other.0
+    }
+}
 
 #[pymethods]
 impl PyGreeting {
     /// Deserialize greeting from dictionary
     #[staticmethod]
     pub(crate) fn from_dict(greeting: Bound<PyDict>) -> PyResult<Self> {
-        Ok(Self(serde_pyobject::from_pyobject(greeting)?))
+        Ok(Self(serde_pyobject::from_pyobject(greeting)?, None))
     }
 
     /// Serialize greeting into dictionary
@@ -27,22 +49,66 @@ impl PyGreeting {
         Ok(serde_pyobject::to_pyobject(py, &self.0)?.cast_into()?)
     }
 
+    /// Deserialize greeting from JSON
+    #[staticmethod]
+    pub(crate) fn from_json(json: &[u8]) -> PyResult<Self> {
+        Ok(Self(from_json::<Greeting>(json)?.into_static(), None))
+    }
+
+    /// Serialize greeting into JSON without creating intermediate Python objects
+    pub(crate) fn to_json<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        Ok(PyBytes::new(py, &to_json(&self.0)?))
+    }
+
+    /// Deserialize greeting from MessagePack
+    #[staticmethod]
+    pub(crate) fn from_msgpack(msgpack: &[u8]) -> PyResult<Self> {
+        Ok(Self(from_msgpack::<Greeting>(msgpack)?.into_static(), None))
+    }
+
+    /// Serialize greeting into MessagePack without creating intermediate Python objects
+    pub(crate) fn to_msgpack<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        Ok(PyBytes::new(py, &to_msgpack(&self.0)?))
+    }
+
+    /// Retrieve the original bytes of the greeting, if it was decoded with `keep_raw`
+    #[getter]
+    pub(crate) fn raw<'py>(&self, py: Python<'py>) -> Option<Bound<'py, PyBytes>> {
+        self.1.as_deref().map(|raw| PyBytes::new(py, raw))
+    }
+
+    /// Estimate the memory held by the greeting, including its original bytes
+    pub(crate) fn __sizeof__(slf: &Bound<Self>) -> PyResult<usize> {
+        message_size(slf.as_any(), &slf.get().0, &slf.get().1)
+    }
+
     pub(crate) fn __repr__(&self, py: Python) -> PyResult<String> {
         Ok(format!("Greeting({})", self.as_dict(py)?))
     }
 }
 
 /// Python wrapper class around `Command`
-#[derive(Debug, Clone, PartialEq)]
-#[pyclass(name = "Command", eq)]
-pub(crate) struct PyCommand(pub(crate) Command<'static>);
+///
+/// The second field holds the original bytes of a decoded command if requested by `keep_raw`.
+#[derive(Debug, Clone)]
+#[pyclass(name = "Command", eq, frozen)]
+pub(crate) struct PyCommand(pub(crate) Command<'static>, pub(crate) Option<Vec<u8>>);
+
+/// Original bytes are not taken into account
+impl PartialEq for PyCommand {
+    fn eq(&self, other: &Self) -> bool {
+        self.0 == other.0
+    }
+}
 
 #[pymethods]
 impl PyCommand {
     /// Deserialize command from dictionary
+    ///
+    /// Nested `SequenceSet` objects are accepted in place of their dictionary representation.
     #[staticmethod]
     pub(crate) fn from_dict(command: Bound<PyDict>) -> PyResult<Self> {
-        Ok(Self(serde_pyobject::from_pyobject(command)?))
+        Ok(Self(sequence::from_pyobject(command.into_any())?, None))
     }
 
     /// Serialize command into dictionary
@@ -50,22 +116,116 @@ impl PyCommand {
         Ok(serde_pyobject::to_pyobject(py, &self.0)?.cast_into()?)
     }
 
+    /// Deserialize commands from an iterable of dictionaries
+    #[staticmethod]
+    pub(crate) fn from_dicts(commands: &Bound<PyAny>) -> PyResult<Vec<Self>> {
+        commands
+            .try_iter()?
+            .map(|command| Self::from_dict(command?.cast_into()?))
+            .collect()
+    }
+
+    /// Serialize commands into a list of dictionaries in one pass
+    #[staticmethod]
+    pub(crate) fn as_dicts<'py>(
+        py: Python<'py>,
+        commands: Vec<Bound<'py, Self>>,
+    ) -> PyResult<Bound<'py, PyList>> {
+        let commands: Vec<&Command> = commands.iter().map(|command| &command.get().0).collect();
+        Ok(serde_pyobject::to_pyobject(py, &commands)?.cast_into()?)
+    }
+
+    /// Serialize commands into JSON Lines, i.e., one JSON object per line
+    #[staticmethod]
+    pub(crate) fn to_json_lines<'py>(
+        py: Python<'py>,
+        commands: Vec<Bound<'py, Self>>,
+    ) -> PyResult<Bound<'py, PyBytes>> {
+        let json_lines = json_lines(commands.iter().map(|command| &command.get().0))?;
+        Ok(PyBytes::new(py, &json_lines))
+    }
+
+    /// Retrieve the sequence set (or UID set) of a FETCH, STORE, COPY, MOVE, or UID EXPUNGE
+    /// command
+    ///
+    /// The search keys of a SEARCH command may contain any number of sequence sets, they are not
+    /// taken into account.
+    #[getter]
+    pub(crate) fn sequence_set(&self) -> Option<PySequenceSet> {
+        match &self.0.body {
+            CommandBody::Fetch { sequence_set, .. }
+            | CommandBody::Store { sequence_set, .. }
+            | CommandBody::Copy { sequence_set, .. }
+            | CommandBody::Move { sequence_set, .. }
+            | CommandBody::ExpungeUid { sequence_set } => Some(PySequenceSet::from(sequence_set)),
+            _ => None,
+        }
+    }
+
+    /// Deserialize command from JSON
+    #[staticmethod]
+    pub(crate) fn from_json(json: &[u8]) -> PyResult<Self> {
+        Ok(Self(from_json::<Command>(json)?.into_static(), None))
+    }
+
+    /// Serialize command into JSON without creating intermediate Python objects
+    pub(crate) fn to_json<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        Ok(PyBytes::new(py, &to_json(&self.0)?))
+    }
+
+    /// Deserialize command from MessagePack
+    #[staticmethod]
+    pub(crate) fn from_msgpack(msgpack: &[u8]) -> PyResult<Self> {
+        Ok(Self(from_msgpack::<Command>(msgpack)?.into_static(), None))
+    }
+
+    /// Serialize command into MessagePack without creating intermediate Python objects
+    pub(crate) fn to_msgpack<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        Ok(PyBytes::new(py, &to_msgpack(&self.0)?))
+    }
+
+    /// Retrieve the original bytes of the command, if it was decoded with `keep_raw`
+    #[getter]
+    pub(crate) fn raw<'py>(&self, py: Python<'py>) -> Option<Bound<'py, PyBytes>> {
+        self.1.as_deref().map(|raw| PyBytes::new(py, raw))
+    }
+
+    /// Estimate the memory held by the command, including its original bytes
+    pub(crate) fn __sizeof__(slf: &Bound<Self>) -> PyResult<usize> {
+        message_size(slf.as_any(), &slf.get().0, &slf.get().1)
+    }
+
     pub(crate) fn __repr__(&self, py: Python) -> PyResult<String> {
         Ok(format!("Command({:?})", self.as_dict(py)?))
     }
 }
 
 /// Python wrapper class around `AuthenticateData`
-#[derive(Debug, Clone, PartialEq)]
-#[pyclass(name = "AuthenticateData", eq)]
-pub(crate) struct PyAuthenticateData(pub(crate) AuthenticateData<'static>);
+///
+/// The second field holds the original bytes of a decoded authenticate data line if requested by `keep_raw`.
+#[derive(Debug, Clone)]
+#[pyclass(name = "AuthenticateData", eq, frozen)]
+pub(crate) struct PyAuthenticateData(
+    pub(crate) AuthenticateData<'static>,
+    pub(crate) Option<Vec<u8>>,
+);
+
+/// Original bytes are not taken into account
+impl PartialEq for PyAuthenticateData {
+    fn eq(&self, other: &Self) -> bool {
+        self.0 == other.0
+    }
+}
 
 #[pymethods]
 impl PyAuthenticateData {
     /// Deserialize authenticate data line from dictionary
     #[staticmethod]
     pub(crate) fn from_dict(authenticate_data: Bound<PyDict>) -> PyResult<Self> {
-        Ok(Self(serde_pyobject::from_pyobject(authenticate_data)?))
+        Ok(Self(
+            serde_pyobject::from_pyobject(authenticate_data)?,
+            None,
+        ))
     }
 
     /// Serialize authenticate data line into dictionary
@@ -82,22 +242,72 @@ impl PyAuthenticateData {
         })
     }
 
+    /// Deserialize authenticate data line from JSON
+    #[staticmethod]
+    pub(crate) fn from_json(json: &[u8]) -> PyResult<Self> {
+        Ok(Self(
+            from_json::<AuthenticateData>(json)?.into_static(),
+            None,
+        ))
+    }
+
+    /// Serialize authenticate data line into JSON without creating intermediate Python objects
+    pub(crate) fn to_json<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        Ok(PyBytes::new(py, &to_json(&self.0)?))
+    }
+
+    /// Deserialize authenticate data line from MessagePack
+    #[staticmethod]
+    pub(crate) fn from_msgpack(msgpack: &[u8]) -> PyResult<Self> {
+        Ok(Self(
+            from_msgpack::<AuthenticateData>(msgpack)?.into_static(),
+            None,
+        ))
+    }
+
+    /// Serialize authenticate data line into MessagePack without creating intermediate Python objects
+    pub(crate) fn to_msgpack<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        Ok(PyBytes::new(py, &to_msgpack(&self.0)?))
+    }
+
+    /// Retrieve the original bytes of the authenticate data line, if it was decoded with `keep_raw`
+    #[getter]
+    pub(crate) fn raw<'py>(&self, py: Python<'py>) -> Option<Bound<'py, PyBytes>> {
+        self.1.as_deref().map(|raw| PyBytes::new(py, raw))
+    }
+
+    /// Estimate the memory held by the authenticate data line, including its original bytes
+    pub(crate) fn __sizeof__(slf: &Bound<Self>) -> PyResult<usize> {
+        message_size(slf.as_any(), &slf.get().0, &slf.get().1)
+    }
+
     pub(crate) fn __repr__(&self, py: Python) -> PyResult<String> {
         Ok(format!("AuthenticateData({:?})", self.as_dict(py)?))
     }
 }
 
 /// Python wrapper class around `Response`
-#[derive(Debug, Clone, PartialEq)]
-#[pyclass(name = "Response", eq)]
-pub(crate) struct PyResponse(pub(crate) Response<'static>);
+///
+/// The second field holds the original bytes of a decoded response if requested by `keep_raw`.
+#[derive(Debug, Clone)]
+#[pyclass(name = "Response", eq, frozen)]
+pub(crate) struct PyResponse(pub(crate) Response<'static>, pub(crate) Option<Vec<u8>>);
+
+/// Original bytes are not taken into account
+impl PartialEq for PyResponse {
+    fn eq(&self, other: &Self) -> bool {
+        self.0 == other.0
+    }
+}
 
 #[pymethods]
 impl PyResponse {
     /// Deserialize response from dictionary
+    ///
+    /// Nested `SequenceSet` objects are accepted in place of their dictionary representation.
     #[staticmethod]
     pub(crate) fn from_dict(response: Bound<PyDict>) -> PyResult<Self> {
-        Ok(Self(serde_pyobject::from_pyobject(response)?))
+        Ok(Self(sequence::from_pyobject(response.into_any())?, None))
     }
 
     /// Serialize response into dictionary
@@ -105,14 +315,129 @@ impl PyResponse {
         Ok(serde_pyobject::to_pyobject(py, &self.0)?.cast_into()?)
     }
 
+    /// Deserialize responses from an iterable of dictionaries
+    #[staticmethod]
+    pub(crate) fn from_dicts(responses: &Bound<PyAny>) -> PyResult<Vec<Self>> {
+        responses
+            .try_iter()?
+            .map(|response| Self::from_dict(response?.cast_into()?))
+            .collect()
+    }
+
+    /// Serialize responses into a list of dictionaries in one pass
+    #[staticmethod]
+    pub(crate) fn as_dicts<'py>(
+        py: Python<'py>,
+        responses: Vec<Bound<'py, Self>>,
+    ) -> PyResult<Bound<'py, PyList>> {
+        let responses: Vec<&Response> =
+            responses.iter().map(|response| &response.get().0).collect();
+        Ok(serde_pyobject::to_pyobject(py, &responses)?.cast_into()?)
+    }
+
+    /// Serialize responses into JSON Lines, i.e., one JSON object per line
+    #[staticmethod]
+    pub(crate) fn to_json_lines<'py>(
+        py: Python<'py>,
+        responses: Vec<Bound<'py, Self>>,
+    ) -> PyResult<Bound<'py, PyBytes>> {
+        let json_lines = json_lines(responses.iter().map(|response| &response.get().0))?;
+        Ok(PyBytes::new(py, &json_lines))
+    }
+
+    /// Deserialize response from JSON
+    #[staticmethod]
+    pub(crate) fn from_json(json: &[u8]) -> PyResult<Self> {
+        Ok(Self(from_json::<Response>(json)?.into_static(), None))
+    }
+
+    /// Serialize response into JSON without creating intermediate Python objects
+    pub(crate) fn to_json<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        Ok(PyBytes::new(py, &to_json(&self.0)?))
+    }
+
+    /// Deserialize response from MessagePack
+    #[staticmethod]
+    pub(crate) fn from_msgpack(msgpack: &[u8]) -> PyResult<Self> {
+        Ok(Self(from_msgpack::<Response>(msgpack)?.into_static(), None))
+    }
+
+    /// Serialize response into MessagePack without creating intermediate Python objects
+    pub(crate) fn to_msgpack<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        Ok(PyBytes::new(py, &to_msgpack(&self.0)?))
+    }
+
+    /// Retrieve the original bytes of the response, if it was decoded with `keep_raw`
+    #[getter]
+    pub(crate) fn raw<'py>(&self, py: Python<'py>) -> Option<Bound<'py, PyBytes>> {
+        self.1.as_deref().map(|raw| PyBytes::new(py, raw))
+    }
+
+    /// Convert response into its compact representation, i.e., its encoded bytes
+    ///
+    /// The original bytes are used if retained.
+    pub(crate) fn compact(&self) -> PyCompactResponse {
+        let data = match &self.1 {
+            Some(raw) => raw.clone(),
+            None => ResponseCodec::default().encode(&self.0).dump(),
+        };
+        PyCompactResponse(data.into_boxed_slice())
+    }
+
+    /// Estimate the memory held by the response, including its original bytes
+    pub(crate) fn __sizeof__(slf: &Bound<Self>) -> PyResult<usize> {
+        message_size(slf.as_any(), &slf.get().0, &slf.get().1)
+    }
+
     pub(crate) fn __repr__(&self, py: Python) -> PyResult<String> {
         Ok(format!("Response({:?})", self.as_dict(py)?))
     }
 }
 
+/// Python class holding a response in compact form, i.e., as a single buffer of encoded bytes
+///
+/// A decoded `Response` owns a separate allocation for most nested fields. Keeping the encoded
+/// bytes instead and decoding on access trades CPU for memory, e.g. in caches.
+#[derive(Debug, Clone, PartialEq)]
+#[pyclass(name = "CompactResponse", eq, frozen)]
+pub(crate) struct PyCompactResponse(pub(crate) Box<[u8]>);
+
+#[pymethods]
+impl PyCompactResponse {
+    /// Decode the response
+    pub(crate) fn expand(&self) -> PyResult<PyResponse> {
+        match ResponseCodec::default().decode(&self.0) {
+            Ok((remaining, response)) if remaining.is_empty() => {
+                Ok(PyResponse(response.into_static(), None))
+            }
+            _ => Err(PyValueError::new_err(
+                "compact response could not be decoded",
+            )),
+        }
+    }
+
+    /// Retrieve the encoded bytes of the response
+    #[getter]
+    pub(crate) fn data<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        PyBytes::new(py, &self.0)
+    }
+
+    pub(crate) fn __sizeof__(slf: &Bound<Self>) -> PyResult<usize> {
+        Ok(object_size(slf.as_any())? + slf.get().0.len())
+    }
+
+    pub(crate) fn __len__(&self) -> usize {
+        self.0.len()
+    }
+
+    pub(crate) fn __repr__(&self) -> String {
+        format!("CompactResponse({} bytes)", self.0.len())
+    }
+}
+
 /// Python wrapper class around `IdleDone`
 #[derive(Debug, Clone, PartialEq)]
-#[pyclass(name = "IdleDone", eq)]
+#[pyclass(name = "IdleDone", eq, frozen)]
 pub(crate) struct PyIdleDone(pub(crate) IdleDone);
 
 #[pymethods]
@@ -126,3 +451,44 @@ impl PyIdleDone {
         "IdleDone"
     }
 }
+
+/// Size of the Python object holding `message` and its original bytes `raw`
+fn message_size<T: Serialize>(
+    object: &Bound<PyAny>,
+    message: &T,
+    raw: &Option<Vec<u8>>,
+) -> PyResult<usize> {
+    Ok(object_size(object)? + heap_size(message)? + raw.as_ref().map_or(0, Vec::capacity))
+}
+
+fn map_json_error(error: serde_json::Error) -> PyErr {
+    PyValueError::new_err(error.to_string())
+}
+
+fn to_json<T: Serialize>(message: &T) -> PyResult<Vec<u8>> {
+    serde_json::to_vec(message).map_err(map_json_error)
+}
+
+fn from_json<'a, T: Deserialize<'a>>(json: &'a [u8]) -> PyResult<T> {
+    serde_json::from_slice(json).map_err(map_json_error)
+}
+
+/// Serialize `messages` into JSON Lines
+fn json_lines<'a, T: Serialize + 'a>(messages: impl Iterator<Item = &'a T>) -> PyResult<Vec<u8>> {
+    let mut json_lines = Vec::new();
+    for message in messages {
+        serde_json::to_writer(&mut json_lines, message).map_err(map_json_error)?;
+        json_lines.push(b'\n');
+    }
+    Ok(json_lines)
+}
+
+/// Serialize `message` into MessagePack, structs are encoded as maps to match the dictionary and
+/// JSON representation
+fn to_msgpack<T: Serialize>(message: &T) -> PyResult<Vec<u8>> {
+    rmp_serde::to_vec_named(message).map_err(|error| PyValueError::new_err(error.to_string()))
+}
+
+fn from_msgpack<'a, T: Deserialize<'a>>(msgpack: &'a [u8]) -> PyResult<T> {
+    rmp_serde::from_slice(msgpack).map_err(|error| PyValueError::new_err(error.to_string()))
+}
@@ -0,0 +1,213 @@
+use pyo3::prelude::*;
+
+/// Python class representing the kind of a peeked message
+#[derive(Debug, Clone, Copy, PartialEq)]
+#[pyclass(name = "MessageKind", eq)]
+pub(crate) enum PyMessageKind {
+    Command,
+    Tagged,
+    Untagged,
+    Continuation,
+}
+
+/// Only for local usage, `__str__` and `__repr__` for Python class `MessageKind` are generated
+impl std::fmt::Display for PyMessageKind {
+    fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+        match self {
+            Self::Command => f.write_str("MessageKind.Command"),
+            Self::Tagged => f.write_str("MessageKind.Tagged"),
+            Self::Untagged => f.write_str("MessageKind.Untagged"),
+            Self::Continuation => f.write_str("MessageKind.Continuation"),
+        }
+    }
+}
+
+/// Python class describing a message classified from its first line without decoding it
+#[derive(Debug, Clone, PartialEq)]
+#[pyclass(name = "MessagePeek", eq, frozen)]
+pub(crate) struct PyMessagePeek {
+    kind: PyMessageKind,
+    tag: Option<String>,
+    name: Option<String>,
+    mailbox: Option<String>,
+    length: Option<usize>,
+}
+
+#[pymethods]
+impl PyMessagePeek {
+    /// Retrieve the kind of the message
+    #[getter]
+    fn kind(&self) -> PyMessageKind {
+        self.kind
+    }
+
+    /// Retrieve the tag of the message, if any
+    #[getter]
+    fn tag(&self) -> Option<&str> {
+        self.tag.as_deref()
+    }
+
+    /// Retrieve the upper-cased command name, response name, or status of the message, if any
+    #[getter]
+    fn name(&self) -> Option<&str> {
+        self.name.as_deref()
+    }
+
+    /// Retrieve the mailbox the message refers to, if any
+    #[getter]
+    fn mailbox(&self) -> Option<&str> {
+        self.mailbox.as_deref()
+    }
+
+    /// Retrieve the number of bytes of the message, `None` while the message is incomplete
+    #[getter]
+    fn length(&self) -> Option<usize> {
+        self.length
+    }
+
+    /// Printable representation of the peek,
+    /// e.g. `MessagePeek(kind=MessageKind.Command, tag="A1", name="SELECT", mailbox="INBOX", length=17)`
+    fn __repr__(&self) -> String {
+        let format_option = |value: &Option<String>| {
+            value
+                .as_ref()
+                .map_or_else(|| "None".to_string(), |value| format!("{value:?}"))
+        };
+
+        format!(
+            "MessagePeek(kind={}, tag={}, name={}, mailbox={}, length={})",
+            self.kind,
+            format_option(&self.tag),
+            format_option(&self.name),
+            format_option(&self.mailbox),
+            self.length
+                .map_or_else(|| "None".to_string(), |length| length.to_string()),
+        )
+    }
+}
+
+/// Split `message` into its first line (without line ending) and the bytes following it
+fn first_line(message: &[u8]) -> Option<(&[u8], &[u8])> {
+    let end = message.iter().position(|&b| b == b'\n')?;
+    let line = &message[..end];
+    Some((
+        line.strip_suffix(b"\r").unwrap_or(line),
+        &message[end + 1..],
+    ))
+}
+
+/// Take the next space-separated token from `line`
+fn next_token<'a>(line: &mut &'a [u8]) -> Option<&'a [u8]> {
+    let current: &'a [u8] = *line;
+    let end = current
+        .iter()
+        .position(|&b| b == b' ')
+        .unwrap_or(current.len());
+    let token = &current[..end];
+    *line = current.get(end + 1..).unwrap_or_default();
+    (!token.is_empty()).then_some(token)
+}
+
+fn upper(token: &[u8]) -> String {
+    String::from_utf8_lossy(token).to_ascii_uppercase()
+}
+
+/// Parse the astring at the beginning of `line`, reading literal data from `rest`
+fn astring(line: &[u8], rest: &[u8]) -> Option<String> {
+    let bytes = match *line.first()? {
+        b'"' => {
+            let mut unescaped = Vec::new();
+            let mut chars = line[1..].iter();
+            loop {
+                match *chars.next()? {
+                    b'"' => break,
+                    b'\\' => unescaped.push(*chars.next()?),
+                    b => unescaped.push(b),
+                }
+            }
+            unescaped
+        }
+        b'{' => {
+            let length = line[1..].strip_suffix(b"}")?;
+            let length = length.strip_suffix(b"+").unwrap_or(length);
+            let length: usize = std::str::from_utf8(length).ok()?.parse().ok()?;
+            rest.get(..length)?.to_vec()
+        }
+        _ => {
+            let end = line.iter().position(|&b| b == b' ').unwrap_or(line.len());
+            line[..end].to_vec()
+        }
+    };
+
+    Some(String::from_utf8_lossy(&bytes).into_owned())
+}
+
+/// Classify `message` as command by inspecting its first line
+///
+/// The length of the message is only known if `complete` is set.
+pub(crate) fn peek_command(message: &[u8], complete: bool) -> Option<PyMessagePeek> {
+    let (mut line, rest) = first_line(message)?;
+    let tag = next_token(&mut line)?;
+    let mut name = upper(next_token(&mut line)?);
+    if name == "UID" {
+        name = format!("UID {}", upper(next_token(&mut line)?));
+    }
+
+    let mailbox = match name.as_str() {
+        "SELECT" | "EXAMINE" | "CREATE" | "DELETE" | "RENAME" | "SUBSCRIBE" | "UNSUBSCRIBE"
+        | "STATUS" | "APPEND" => astring(line, rest),
+        "COPY" | "MOVE" | "UID COPY" | "UID MOVE" => {
+            next_token(&mut line)?;
+            astring(line, rest)
+        }
+        _ => None,
+    };
+
+    Some(PyMessagePeek {
+        kind: PyMessageKind::Command,
+        tag: Some(String::from_utf8_lossy(tag).into_owned()),
+        name: Some(name),
+        mailbox,
+        length: complete.then_some(message.len()),
+    })
+}
+
+/// Classify `message` as response by inspecting its first line
+///
+/// The length of the message is only known if `complete` is set.
+pub(crate) fn peek_response(message: &[u8], complete: bool) -> Option<PyMessagePeek> {
+    let (mut line, rest) = first_line(message)?;
+    let (kind, tag, name, mailbox) = match next_token(&mut line) {
+        Some(b"+") => (PyMessageKind::Continuation, None, None, None),
+        Some(b"*") => {
+            let mut name = next_token(&mut line)?;
+            if name.iter().all(u8::is_ascii_digit) {
+                name = next_token(&mut line)?;
+            }
+            let name = upper(name);
+            let mailbox = match name.as_str() {
+                "STATUS" => astring(line, rest),
+                _ => None,
+            };
+            (PyMessageKind::Untagged, None, Some(name), mailbox)
+        }
+        Some(tag) => {
+            let name = upper(next_token(&mut line)?);
+            (
+                PyMessageKind::Tagged,
+                Some(String::from_utf8_lossy(tag).into_owned()),
+                Some(name),
+                None,
+            )
+        }
+        None => return None,
+    };
+
+    Some(PyMessagePeek {
+        kind,
+        tag,
+        name,
+        mailbox,
+        length: complete.then_some(message.len()),
+    })
+}
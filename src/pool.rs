@@ -0,0 +1,152 @@
+use std::collections::HashMap;
+
+use pyo3::{
+    prelude::*,
+    types::{PyBytes, PyDict},
+};
+
+use crate::{
+    ensure_unprojected,
+    fetch::FetchProjection,
+    fragmentizer::PyFragmentizer,
+    result::{PyDecodeResult, PyDecodeStatus},
+};
+
+/// Python class holding one fragmentizer per connection
+///
+/// Connections are identified by non-negative integers, e.g. socket file descriptors. Bytes of
+/// many connections are fed in a single call, which returns the decoded messages of all
+/// connections, so that the Python/Rust crossing is paid once per batch instead of once per
+/// connection and message.
+#[derive(Debug)]
+#[pyclass(name = "FragmentizerPool")]
+pub(crate) struct PyFragmentizerPool {
+    max_message_size: Option<u32>,
+    connections: HashMap<u64, PyFragmentizer>,
+}
+
+impl PyFragmentizerPool {
+    /// Enqueue the `(connection, bytes)` tuples of `batch` and decode all completed messages
+    ///
+    /// Messages are returned in the order of `batch`, and in order of arrival per connection. The
+    /// whole batch is extracted before any bytes are enqueued, so an invalid item leaves all
+    /// connections untouched.
+    fn feed<'py>(
+        &mut self,
+        batch: &Bound<'py, PyAny>,
+        mut decode: impl FnMut(&PyFragmentizer) -> PyResult<PyDecodeResult>,
+    ) -> PyResult<Vec<(u64, PyDecodeResult)>> {
+        let py = batch.py();
+        let batch = batch
+            .try_iter()?
+            .map(|item| item?.extract())
+            .collect::<PyResult<Vec<(u64, Bound<'py, PyBytes>)>>>()?;
+
+        let max_message_size = self.max_message_size;
+        let mut results = Vec::new();
+        for (connection, bytes) in batch {
+            let fragmentizer = self
+                .connections
+                .entry(connection)
+                .or_insert_with(|| PyFragmentizer::without_snapshots(max_message_size));
+
+            fragmentizer.enqueue_bytes_inner(bytes.as_bytes());
+            while fragmentizer.progress_inner().is_some() {
+                if fragmentizer.is_message_complete() {
+                    let result = decode_or_fail(py, fragmentizer, &mut decode);
+                    results.push((connection, result));
+                }
+            }
+        }
+
+        Ok(results)
+    }
+}
+
+/// Decode the current message of `fragmentizer`, reporting raised errors as failed decodes
+///
+/// Messages that were not decoded carry their bytes, e.g., to decode an `AUTHENTICATE`
+/// continuation or `DONE` after a command was rejected.
+fn decode_or_fail(
+    py: Python,
+    fragmentizer: &PyFragmentizer,
+    decode: impl FnOnce(&PyFragmentizer) -> PyResult<PyDecodeResult>,
+) -> PyDecodeResult {
+    let result = match decode(fragmentizer) {
+        Ok(result) => result,
+        Err(error) => {
+            let details = PyDict::new(py);
+            let details = details
+                .set_item("error", error.into_value(py))
+                .map(|()| details)
+                .ok();
+            PyDecodeResult::error(PyDecodeStatus::Failed, details)
+        }
+    };
+
+    if result.is_ok() {
+        result
+    } else {
+        result.with_raw(PyBytes::new(py, fragmentizer.message_bytes_inner()))
+    }
+}
+
+#[pymethods]
+impl PyFragmentizerPool {
+    /// Create a new pool, every connection gets its own fragmentizer with `max_message_size`
+    #[new]
+    #[pyo3(signature = (*, max_message_size))]
+    fn new(max_message_size: Option<u32>) -> Self {
+        Self {
+            max_message_size,
+            connections: HashMap::new(),
+        }
+    }
+
+    /// Enqueue client bytes and decode all completed commands without raising on decoding errors
+    #[pyo3(signature = (batch, *, keep_raw=false))]
+    fn feed_commands(
+        &mut self,
+        py: Python,
+        batch: &Bound<PyAny>,
+        keep_raw: bool,
+    ) -> PyResult<Vec<(u64, PyDecodeResult)>> {
+        self.feed(batch, |fragmentizer| {
+            fragmentizer.try_decode_command_inner(py, keep_raw)
+        })
+    }
+
+    /// Enqueue server bytes and decode all completed responses without raising on decoding
+    /// errors
+    ///
+    /// `fields` and `keep_raw` are handled like in `Fragmentizer.decode_response`.
+    #[pyo3(signature = (batch, *, fields=None, keep_raw=false))]
+    fn feed_responses(
+        &mut self,
+        py: Python,
+        batch: &Bound<PyAny>,
+        fields: Option<&Bound<PyAny>>,
+        keep_raw: bool,
+    ) -> PyResult<Vec<(u64, PyDecodeResult)>> {
+        let projection = fields.map(FetchProjection::from_names).transpose()?;
+        ensure_unprojected(projection, keep_raw)?;
+        self.feed(batch, |fragmentizer| {
+            fragmentizer.try_decode_response_inner(py, projection, keep_raw)
+        })
+    }
+
+    /// Drop the state of a connection, e.g. after it was closed
+    ///
+    /// Returns if the connection was known.
+    fn remove(&mut self, connection: u64) -> bool {
+        self.connections.remove(&connection).is_some()
+    }
+
+    fn __contains__(&self, connection: u64) -> bool {
+        self.connections.contains_key(&connection)
+    }
+
+    fn __len__(&self) -> usize {
+        self.connections.len()
+    }
+}
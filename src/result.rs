@@ -0,0 +1,123 @@
+use pyo3::{
+    prelude::*,
+    types::{PyBytes, PyDict},
+};
+
+/// Python class representing the status of a non-raising decode
+#[derive(Debug, Clone, Copy, PartialEq)]
+#[pyclass(name = "DecodeStatus", eq)]
+pub(crate) enum PyDecodeStatus {
+    Ok,
+    Incomplete,
+    LiteralFound,
+    Failed,
+    DecodingRemainder,
+    MessageTooLong,
+    MessagePoisoned,
+}
+
+/// Only for local usage, `__str__` and `__repr__` for Python class `DecodeStatus` are generated
+impl std::fmt::Display for PyDecodeStatus {
+    fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+        match self {
+            Self::Ok => f.write_str("DecodeStatus.Ok"),
+            Self::Incomplete => f.write_str("DecodeStatus.Incomplete"),
+            Self::LiteralFound => f.write_str("DecodeStatus.LiteralFound"),
+            Self::Failed => f.write_str("DecodeStatus.Failed"),
+            Self::DecodingRemainder => f.write_str("DecodeStatus.DecodingRemainder"),
+            Self::MessageTooLong => f.write_str("DecodeStatus.MessageTooLong"),
+            Self::MessagePoisoned => f.write_str("DecodeStatus.MessagePoisoned"),
+        }
+    }
+}
+
+/// Python class holding the outcome of a non-raising decode
+///
+/// Instead of raising an exception, decoding errors are reported through `status`. `details`
+/// holds the same dictionary that is passed to the corresponding exception, if any.
+#[derive(Debug)]
+#[pyclass(name = "DecodeResult", frozen)]
+pub(crate) struct PyDecodeResult {
+    status: PyDecodeStatus,
+    consumed: usize,
+    message: Option<Py<PyAny>>,
+    details: Option<Py<PyDict>>,
+    raw: Option<Py<PyBytes>>,
+}
+
+impl PyDecodeResult {
+    /// Create a result for a message decoded from `consumed` bytes
+    pub(crate) fn ok(consumed: usize, message: Bound<PyAny>) -> Self {
+        Self {
+            status: PyDecodeStatus::Ok,
+            consumed,
+            message: Some(message.unbind()),
+            details: None,
+            raw: None,
+        }
+    }
+
+    /// Create a result for a decoding error
+    pub(crate) fn error(status: PyDecodeStatus, details: Option<Bound<PyDict>>) -> Self {
+        Self {
+            status,
+            consumed: 0,
+            message: None,
+            details: details.map(Bound::unbind),
+            raw: None,
+        }
+    }
+
+    /// Attach the bytes of the message that was not decoded
+    pub(crate) fn with_raw(mut self, raw: Bound<PyBytes>) -> Self {
+        self.raw = Some(raw.unbind());
+        self
+    }
+
+    pub(crate) fn is_ok(&self) -> bool {
+        self.status == PyDecodeStatus::Ok
+    }
+}
+
+#[pymethods]
+impl PyDecodeResult {
+    /// Retrieve the status of the decode
+    #[getter]
+    fn status(&self) -> PyDecodeStatus {
+        self.status
+    }
+
+    /// Retrieve the number of bytes the decoded message was decoded from, `0` on errors
+    #[getter]
+    fn consumed(&self) -> usize {
+        self.consumed
+    }
+
+    /// Retrieve the decoded message, if any
+    #[getter]
+    fn message(&self, py: Python) -> Option<Py<PyAny>> {
+        self.message.as_ref().map(|message| message.clone_ref(py))
+    }
+
+    /// Retrieve the details of a decoding error, if any
+    #[getter]
+    fn details(&self, py: Python) -> Option<Py<PyDict>> {
+        self.details.as_ref().map(|details| details.clone_ref(py))
+    }
+
+    /// Retrieve the bytes of a message that was not decoded, if retained
+    #[getter]
+    fn raw(&self, py: Python) -> Option<Py<PyBytes>> {
+        self.raw.as_ref().map(|raw| raw.clone_ref(py))
+    }
+
+    /// Return if a message was decoded
+    fn __bool__(&self) -> bool {
+        self.is_ok()
+    }
+
+    /// Printable representation of the result, e.g. `DecodeResult(DecodeStatus.Ok, consumed=8)`
+    fn __repr__(&self) -> String {
+        format!("DecodeResult({}, consumed={})", self.status, self.consumed)
+    }
+}
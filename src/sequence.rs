@@ -0,0 +1,394 @@
+use std::num::NonZeroU32;
+
+use imap_codec::imap_types::sequence::{SeqOrUid, Sequence, SequenceSet};
+use pyo3::{
+    exceptions::PyValueError,
+    prelude::*,
+    types::{PyDict, PyList},
+};
+use serde::Deserialize;
+
+/// Internal representation of `*`, i.e., the largest number in use
+///
+/// `*` is treated as being larger than any valid number, so that `200:*` contains all numbers
+/// starting at 200.
+const ASTERISK: u64 = u32::MAX as u64 + 1;
+
+/// Python class representing a sequence set (or UID set) as a canonical list of ranges
+#[derive(Debug, Clone, PartialEq, Eq, Hash)]
+#[pyclass(name = "SequenceSet", eq, frozen, hash)]
+pub(crate) struct PySequenceSet {
+    /// Sorted, non-overlapping and non-adjacent inclusive ranges
+    ranges: Vec<(u64, u64)>,
+}
+
+impl PySequenceSet {
+    /// Create a sequence set from arbitrary ranges by bringing them into canonical form
+    fn from_unsorted(mut ranges: Vec<(u64, u64)>) -> Self {
+        for range in ranges.iter_mut() {
+            if range.0 > range.1 {
+                *range = (range.1, range.0);
+            }
+        }
+        ranges.sort_unstable();
+
+        let mut canonical: Vec<(u64, u64)> = Vec::with_capacity(ranges.len());
+        for (start, end) in ranges {
+            match canonical.last_mut() {
+                Some(last) if start <= last.1.saturating_add(1) => last.1 = last.1.max(end),
+                _ => canonical.push((start, end)),
+            }
+        }
+
+        Self { ranges: canonical }
+    }
+
+    /// Return whether `*` is part of the sequence set
+    fn has_asterisk(&self) -> bool {
+        self.ranges.last().is_some_and(|(_, end)| *end == ASTERISK)
+    }
+
+    fn ensure_no_asterisk(&self) -> PyResult<()> {
+        if self.has_asterisk() {
+            return Err(PyValueError::new_err(
+                "sequence set contains `*`, use `resolve` first",
+            ));
+        }
+        Ok(())
+    }
+}
+
+fn parse_value(value: &str) -> PyResult<u64> {
+    if value == "*" {
+        return Ok(ASTERISK);
+    }
+    match value.parse::<u32>() {
+        Ok(number) if number > 0 && value.bytes().all(|b| b.is_ascii_digit()) => Ok(number.into()),
+        _ => Err(PyValueError::new_err(format!(
+            "invalid sequence number: {value:?}"
+        ))),
+    }
+}
+
+fn extract_value(value: &Bound<PyAny>) -> PyResult<u64> {
+    if value.is_none() {
+        return Ok(ASTERISK);
+    }
+    match value.extract::<u32>()? {
+        0 => Err(PyValueError::new_err("sequence numbers must be positive")),
+        number => Ok(number.into()),
+    }
+}
+
+fn value_to_py(value: u64) -> Option<u64> {
+    (value != ASTERISK).then_some(value)
+}
+
+fn value_to_seq_or_uid(value: u64) -> SeqOrUid {
+    match u32::try_from(value).ok().and_then(NonZeroU32::new) {
+        Some(number) => SeqOrUid::Value(number),
+        None => SeqOrUid::Asterisk,
+    }
+}
+
+fn seq_or_uid_to_value(value: &SeqOrUid) -> u64 {
+    match value {
+        SeqOrUid::Value(number) => number.get().into(),
+        SeqOrUid::Asterisk => ASTERISK,
+    }
+}
+
+impl From<&SequenceSet> for PySequenceSet {
+    fn from(value: &SequenceSet) -> Self {
+        let sequences: &[Sequence] = value.0.as_ref();
+        Self::from_unsorted(
+            sequences
+                .iter()
+                .map(|sequence| match sequence {
+                    Sequence::Single(value) => {
+                        let value = seq_or_uid_to_value(value);
+                        (value, value)
+                    }
+                    Sequence::Range(start, end) => {
+                        (seq_or_uid_to_value(start), seq_or_uid_to_value(end))
+                    }
+                })
+                .collect(),
+        )
+    }
+}
+
+impl TryFrom<&PySequenceSet> for SequenceSet {
+    type Error = PyErr;
+
+    fn try_from(value: &PySequenceSet) -> Result<Self, Self::Error> {
+        let sequences: Vec<Sequence> = value
+            .ranges
+            .iter()
+            .map(|&(start, end)| {
+                if start == end {
+                    Sequence::Single(value_to_seq_or_uid(start))
+                } else {
+                    Sequence::Range(value_to_seq_or_uid(start), value_to_seq_or_uid(end))
+                }
+            })
+            .collect();
+
+        Ok(SequenceSet(sequences.try_into().map_err(|_| {
+            PyValueError::new_err("sequence set must not be empty")
+        })?))
+    }
+}
+
+#[pymethods]
+impl PySequenceSet {
+    /// Create a sequence set from its IMAP representation, e.g. `1:100,200:*`
+    #[new]
+    fn new(sequence_set: &str) -> PyResult<Self> {
+        let ranges = sequence_set
+            .split(',')
+            .map(|sequence| match sequence.split_once(':') {
+                Some((start, end)) => Ok((parse_value(start)?, parse_value(end)?)),
+                None => {
+                    let value = parse_value(sequence)?;
+                    Ok((value, value))
+                }
+            })
+            .collect::<PyResult<_>>()?;
+
+        Ok(Self::from_unsorted(ranges))
+    }
+
+    /// Create a sequence set from `(start, end)` tuples, `None` denotes `*`
+    #[staticmethod]
+    fn from_ranges(ranges: &Bound<PyAny>) -> PyResult<Self> {
+        let ranges = ranges
+            .try_iter()?
+            .map(|range| {
+                let (start, end): (Bound<PyAny>, Bound<PyAny>) = range?.extract()?;
+                Ok((extract_value(&start)?, extract_value(&end)?))
+            })
+            .collect::<PyResult<_>>()?;
+
+        Ok(Self::from_unsorted(ranges))
+    }
+
+    /// Create a sequence set from an iterable of numbers, compressing them into ranges
+    #[staticmethod]
+    fn from_numbers(numbers: &Bound<PyAny>) -> PyResult<Self> {
+        let ranges = numbers
+            .try_iter()?
+            .map(|number| {
+                let value = extract_value(&number?)?;
+                Ok((value, value))
+            })
+            .collect::<PyResult<_>>()?;
+
+        Ok(Self::from_unsorted(ranges))
+    }
+
+    /// Retrieve the canonical ranges as `(start, end)` tuples, `None` denotes `*`
+    fn ranges(&self) -> Vec<(Option<u64>, Option<u64>)> {
+        self.ranges
+            .iter()
+            .map(|&(start, end)| (value_to_py(start), value_to_py(end)))
+            .collect()
+    }
+
+    /// Return a new sequence set with `*` replaced by `largest`
+    fn resolve(&self, largest: u32) -> Self {
+        let largest = u64::from(largest);
+        Self::from_unsorted(
+            self.ranges
+                .iter()
+                .map(|&(start, end)| {
+                    let resolve = |value: u64| if value == ASTERISK { largest } else { value };
+                    (resolve(start), resolve(end))
+                })
+                .collect(),
+        )
+    }
+
+    /// Return the union of both sequence sets
+    fn union(&self, other: &Self) -> Self {
+        let mut ranges = Vec::with_capacity(self.ranges.len() + other.ranges.len());
+        ranges.extend_from_slice(&self.ranges);
+        ranges.extend_from_slice(&other.ranges);
+        Self::from_unsorted(ranges)
+    }
+
+    /// Return the intersection of both sequence sets
+    fn intersection(&self, other: &Self) -> Self {
+        let mut ranges = Vec::new();
+        let (mut left, mut right) = (0, 0);
+        while let (Some(&(a_start, a_end)), Some(&(b_start, b_end))) =
+            (self.ranges.get(left), other.ranges.get(right))
+        {
+            let (start, end) = (a_start.max(b_start), a_end.min(b_end));
+            if start <= end {
+                ranges.push((start, end));
+            }
+            if a_end < b_end {
+                left += 1;
+            } else {
+                right += 1;
+            }
+        }
+        Self { ranges }
+    }
+
+    fn __or__(&self, other: &Self) -> Self {
+        self.union(other)
+    }
+
+    fn __and__(&self, other: &Self) -> Self {
+        self.intersection(other)
+    }
+
+    fn __contains__(&self, number: u32) -> bool {
+        let number = u64::from(number);
+        let index = self.ranges.partition_point(|&(_, end)| end < number);
+        self.ranges
+            .get(index)
+            .is_some_and(|&(start, _)| start <= number)
+    }
+
+    fn __len__(&self) -> PyResult<usize> {
+        self.ensure_no_asterisk()?;
+        Ok(self
+            .ranges
+            .iter()
+            .map(|&(start, end)| (end - start + 1) as usize)
+            .sum())
+    }
+
+    fn __bool__(&self) -> bool {
+        !self.ranges.is_empty()
+    }
+
+    fn __iter__(&self) -> PyResult<PySequenceSetIterator> {
+        self.ensure_no_asterisk()?;
+        Ok(PySequenceSetIterator {
+            ranges: self.ranges.clone(),
+            index: 0,
+            next: self.ranges.first().map_or(0, |&(start, _)| start),
+        })
+    }
+
+    /// String representation of the sequence set in canonical IMAP form, e.g. `1:100,200:*`
+    fn __str__(&self) -> String {
+        let format_value = |value: u64| match value {
+            ASTERISK => "*".to_string(),
+            value => value.to_string(),
+        };
+
+        self.ranges
+            .iter()
+            .map(|&(start, end)| {
+                if start == end {
+                    format_value(start)
+                } else {
+                    format!("{}:{}", format_value(start), format_value(end))
+                }
+            })
+            .collect::<Vec<_>>()
+            .join(",")
+    }
+
+    /// Printable representation of the sequence set, e.g. `SequenceSet('1:100,200:*')`
+    fn __repr__(&self) -> String {
+        format!("SequenceSet('{}')", self.__str__())
+    }
+}
+
+/// Python class iterating over the numbers of a sequence set without materializing them
+#[derive(Debug, Clone)]
+#[pyclass(name = "SequenceSetIterator")]
+pub(crate) struct PySequenceSetIterator {
+    ranges: Vec<(u64, u64)>,
+    index: usize,
+    next: u64,
+}
+
+#[pymethods]
+impl PySequenceSetIterator {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(&mut self) -> Option<u64> {
+        let &(_, end) = self.ranges.get(self.index)?;
+        let number = self.next;
+        if number == end {
+            self.index += 1;
+            if let Some(&(start, _)) = self.ranges.get(self.index) {
+                self.next = start;
+            }
+        } else {
+            self.next += 1;
+        }
+        Some(number)
+    }
+}
+
+/// Deserialize `object`, accepting nested `SequenceSet` objects in place of their dictionary
+/// representation
+///
+/// Objects without `SequenceSet` objects are deserialized directly. Only if this fails, nested
+/// `SequenceSet` objects are searched for and replaced, and deserialization is retried.
+pub(crate) fn from_pyobject<'de, T: Deserialize<'de>>(object: Bound<PyAny>) -> PyResult<T> {
+    match serde_pyobject::from_pyobject(object.clone()) {
+        Ok(value) => Ok(value),
+        Err(error) => match try_expand_sequence_sets(&object)? {
+            Some(expanded) => Ok(serde_pyobject::from_pyobject(expanded)?),
+            None => Err(error.into()),
+        },
+    }
+}
+
+/// Replace `SequenceSet` objects nested in dictionaries and lists by their dictionary
+/// representation, return `None` if there are none
+///
+/// Containers are only copied if they (transitively) contain a `SequenceSet`.
+fn try_expand_sequence_sets<'py>(
+    object: &Bound<'py, PyAny>,
+) -> PyResult<Option<Bound<'py, PyAny>>> {
+    let py = object.py();
+
+    if let Ok(sequence_set) = object.cast::<PySequenceSet>() {
+        let sequence_set = SequenceSet::try_from(sequence_set.get())?;
+        return Ok(Some(serde_pyobject::to_pyobject(py, &sequence_set)?));
+    }
+
+    if let Ok(dict) = object.cast::<PyDict>() {
+        let mut expanded: Option<Bound<PyDict>> = None;
+        for (key, value) in dict.iter() {
+            if let Some(value) = try_expand_sequence_sets(&value)? {
+                let copy = match expanded.take() {
+                    Some(copy) => copy,
+                    None => dict.copy()?,
+                };
+                copy.set_item(key, value)?;
+                expanded = Some(copy);
+            }
+        }
+        return Ok(expanded.map(Bound::into_any));
+    }
+
+    if let Ok(list) = object.cast::<PyList>() {
+        let mut expanded: Option<Bound<PyList>> = None;
+        for (index, value) in list.iter().enumerate() {
+            if let Some(value) = try_expand_sequence_sets(&value)? {
+                let copy = match expanded.take() {
+                    Some(copy) => copy,
+                    None => PyList::new(py, list.iter())?,
+                };
+                copy.set_item(index, value)?;
+                expanded = Some(copy);
+            }
+        }
+        return Ok(expanded.map(Bound::into_any));
+    }
+
+    Ok(None)
+}
@@ -0,0 +1,349 @@
+use std::{fmt, mem::size_of};
+
+use pyo3::{exceptions::PyRuntimeError, prelude::*};
+use serde::{ser, Serialize};
+
+const WORD: usize = size_of::<usize>();
+
+/// Size of a `Vec`/`String` (pointer, capacity, length), i.e., also of an owned `Cow`
+const VEC_SIZE: usize = 3 * WORD;
+
+/// Estimated size of a value, split into its inline part and the heap memory it owns
+#[derive(Debug, Default, Clone, Copy)]
+struct Size {
+    inline: usize,
+    heap: usize,
+}
+
+impl Size {
+    const fn inline(inline: usize) -> Self {
+        Self { inline, heap: 0 }
+    }
+
+    fn total(self) -> usize {
+        self.inline + self.heap
+    }
+}
+
+/// Estimate the heap memory owned by `value`
+///
+/// The estimate is derived from the serde representation: owned strings, byte buffers, and the
+/// elements of sequences and maps are accounted for, padding and spare capacity are not. Fails
+/// like a conversion into a `dict` if `value` can not be serialized.
+pub(crate) fn heap_size<T: Serialize>(value: &T) -> PyResult<usize> {
+    value
+        .serialize(SizeSerializer)
+        .map(|size| size.heap)
+        .map_err(|error| PyRuntimeError::new_err(error.to_string()))
+}
+
+/// Size of the Python object itself, i.e., `object.__sizeof__`
+pub(crate) fn object_size(object: &Bound<PyAny>) -> PyResult<usize> {
+    object
+        .py()
+        .get_type::<PyAny>()
+        .call_method1("__sizeof__", (object,))?
+        .extract()
+}
+
+#[derive(Debug)]
+struct SizeError(String);
+
+impl fmt::Display for SizeError {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        f.write_str(&self.0)
+    }
+}
+
+impl std::error::Error for SizeError {}
+
+impl ser::Error for SizeError {
+    fn custom<T: fmt::Display>(msg: T) -> Self {
+        Self(msg.to_string())
+    }
+}
+
+struct SizeSerializer;
+
+/// Sums up the sizes of the elements of a compound value
+struct Compound {
+    /// Elements are stored on the heap (sequences and maps) instead of inline
+    boxed: bool,
+    /// Enum variants carry a discriminant
+    variant: bool,
+    size: Size,
+}
+
+impl Compound {
+    fn new(boxed: bool, variant: bool) -> Self {
+        Self {
+            boxed,
+            variant,
+            size: Size::default(),
+        }
+    }
+
+    fn add<T: Serialize + ?Sized>(&mut self, value: &T) -> Result<(), SizeError> {
+        let size = value.serialize(SizeSerializer)?;
+        if self.boxed {
+            self.size.heap += size.total();
+        } else {
+            self.size.inline += size.inline;
+            self.size.heap += size.heap;
+        }
+        Ok(())
+    }
+
+    fn finish(self) -> Size {
+        match (self.boxed, self.variant) {
+            (true, _) => Size {
+                inline: VEC_SIZE,
+                heap: self.size.heap,
+            },
+            (false, true) => Size {
+                inline: self.size.inline + WORD,
+                heap: self.size.heap,
+            },
+            (false, false) => self.size,
+        }
+    }
+}
+
+macro_rules! serialize_primitive {
+    ($($method:ident: $ty:ty),* $(,)?) => {
+        $(
+            fn $method(self, _: $ty) -> Result<Size, SizeError> {
+                Ok(Size::inline(size_of::<$ty>()))
+            }
+        )*
+    };
+}
+
+impl ser::Serializer for SizeSerializer {
+    type Ok = Size;
+    type Error = SizeError;
+    type SerializeSeq = Compound;
+    type SerializeTuple = Compound;
+    type SerializeTupleStruct = Compound;
+    type SerializeTupleVariant = Compound;
+    type SerializeMap = Compound;
+    type SerializeStruct = Compound;
+    type SerializeStructVariant = Compound;
+
+    serialize_primitive! {
+        serialize_bool: bool,
+        serialize_i8: i8,
+        serialize_i16: i16,
+        serialize_i32: i32,
+        serialize_i64: i64,
+        serialize_u8: u8,
+        serialize_u16: u16,
+        serialize_u32: u32,
+        serialize_u64: u64,
+        serialize_f32: f32,
+        serialize_f64: f64,
+        serialize_char: char,
+    }
+
+    fn serialize_str(self, v: &str) -> Result<Size, SizeError> {
+        Ok(Size {
+            inline: VEC_SIZE,
+            heap: v.len(),
+        })
+    }
+
+    fn serialize_bytes(self, v: &[u8]) -> Result<Size, SizeError> {
+        Ok(Size {
+            inline: VEC_SIZE,
+            heap: v.len(),
+        })
+    }
+
+    fn serialize_none(self) -> Result<Size, SizeError> {
+        Ok(Size::inline(WORD))
+    }
+
+    fn serialize_some<T: Serialize + ?Sized>(self, value: &T) -> Result<Size, SizeError> {
+        value.serialize(self)
+    }
+
+    fn serialize_unit(self) -> Result<Size, SizeError> {
+        Ok(Size::default())
+    }
+
+    fn serialize_unit_struct(self, _: &'static str) -> Result<Size, SizeError> {
+        Ok(Size::default())
+    }
+
+    fn serialize_unit_variant(
+        self,
+        _: &'static str,
+        _: u32,
+        _: &'static str,
+    ) -> Result<Size, SizeError> {
+        Ok(Size::inline(1))
+    }
+
+    fn serialize_newtype_struct<T: Serialize + ?Sized>(
+        self,
+        _: &'static str,
+        value: &T,
+    ) -> Result<Size, SizeError> {
+        value.serialize(self)
+    }
+
+    fn serialize_newtype_variant<T: Serialize + ?Sized>(
+        self,
+        _: &'static str,
+        _: u32,
+        _: &'static str,
+        value: &T,
+    ) -> Result<Size, SizeError> {
+        let mut compound = Compound::new(false, true);
+        compound.add(value)?;
+        Ok(compound.finish())
+    }
+
+    fn serialize_seq(self, _: Option<usize>) -> Result<Compound, SizeError> {
+        Ok(Compound::new(true, false))
+    }
+
+    fn serialize_tuple(self, _: usize) -> Result<Compound, SizeError> {
+        Ok(Compound::new(false, false))
+    }
+
+    fn serialize_tuple_struct(self, _: &'static str, _: usize) -> Result<Compound, SizeError> {
+        Ok(Compound::new(false, false))
+    }
+
+    fn serialize_tuple_variant(
+        self,
+        _: &'static str,
+        _: u32,
+        _: &'static str,
+        _: usize,
+    ) -> Result<Compound, SizeError> {
+        Ok(Compound::new(false, true))
+    }
+
+    fn serialize_map(self, _: Option<usize>) -> Result<Compound, SizeError> {
+        Ok(Compound::new(true, false))
+    }
+
+    fn serialize_struct(self, _: &'static str, _: usize) -> Result<Compound, SizeError> {
+        Ok(Compound::new(false, false))
+    }
+
+    fn serialize_struct_variant(
+        self,
+        _: &'static str,
+        _: u32,
+        _: &'static str,
+        _: usize,
+    ) -> Result<Compound, SizeError> {
+        Ok(Compound::new(false, true))
+    }
+}
+
+impl ser::SerializeSeq for Compound {
+    type Ok = Size;
+    type Error = SizeError;
+
+    fn serialize_element<T: Serialize + ?Sized>(&mut self, value: &T) -> Result<(), SizeError> {
+        self.add(value)
+    }
+
+    fn end(self) -> Result<Size, SizeError> {
+        Ok(self.finish())
+    }
+}
+
+impl ser::SerializeTuple for Compound {
+    type Ok = Size;
+    type Error = SizeError;
+
+    fn serialize_element<T: Serialize + ?Sized>(&mut self, value: &T) -> Result<(), SizeError> {
+        self.add(value)
+    }
+
+    fn end(self) -> Result<Size, SizeError> {
+        Ok(self.finish())
+    }
+}
+
+impl ser::SerializeTupleStruct for Compound {
+    type Ok = Size;
+    type Error = SizeError;
+
+    fn serialize_field<T: Serialize + ?Sized>(&mut self, value: &T) -> Result<(), SizeError> {
+        self.add(value)
+    }
+
+    fn end(self) -> Result<Size, SizeError> {
+        Ok(self.finish())
+    }
+}
+
+impl ser::SerializeTupleVariant for Compound {
+    type Ok = Size;
+    type Error = SizeError;
+
+    fn serialize_field<T: Serialize + ?Sized>(&mut self, value: &T) -> Result<(), SizeError> {
+        self.add(value)
+    }
+
+    fn end(self) -> Result<Size, SizeError> {
+        Ok(self.finish())
+    }
+}
+
+impl ser::SerializeMap for Compound {
+    type Ok = Size;
+    type Error = SizeError;
+
+    fn serialize_key<T: Serialize + ?Sized>(&mut self, key: &T) -> Result<(), SizeError> {
+        self.add(key)
+    }
+
+    fn serialize_value<T: Serialize + ?Sized>(&mut self, value: &T) -> Result<(), SizeError> {
+        self.add(value)
+    }
+
+    fn end(self) -> Result<Size, SizeError> {
+        Ok(self.finish())
+    }
+}
+
+impl ser::SerializeStruct for Compound {
+    type Ok = Size;
+    type Error = SizeError;
+
+    fn serialize_field<T: Serialize + ?Sized>(
+        &mut self,
+        _: &'static str,
+        value: &T,
+    ) -> Result<(), SizeError> {
+        self.add(value)
+    }
+
+    fn end(self) -> Result<Size, SizeError> {
+        Ok(self.finish())
+    }
+}
+
+impl ser::SerializeStructVariant for Compound {
+    type Ok = Size;
+    type Error = SizeError;
+
+    fn serialize_field<T: Serialize + ?Sized>(
+        &mut self,
+        _: &'static str,
+        value: &T,
+    ) -> Result<(), SizeError> {
+        self.add(value)
+    }
+
+    fn end(self) -> Result<Size, SizeError> {
+        Ok(self.finish())
+    }
+}
@@ -0,0 +1,344 @@
+use imap_codec::fragmentizer::{FragmentInfo, Fragmentizer};
+use pyo3::{exceptions::PyValueError, prelude::*};
+
+/// Magic bytes at the beginning of every snapshot
+const MAGIC: &[u8; 4] = b"IMCF";
+
+/// Version of the snapshot format, version 1 had no elided bytes
+const VERSION: u8 = 2;
+
+const FLAG_MAX_MESSAGE_SIZE: u8 = 1 << 0;
+const FLAG_POISONED: u8 = 1 << 1;
+
+/// Number of processed bytes kept at the end of a fragment when its other bytes are elided
+///
+/// Whether a line announces a literal depends on its last bytes, e.g., `{4294967295+}\r\n`, so
+/// these must be replayed as they were.
+const TAIL: usize = 32;
+
+/// Replayed in place of elided bytes
+const FILLER: [u8; 4096] = [b'x'; 4096];
+
+/// Bytes of the current message that were removed from the mirror
+#[derive(Debug, Clone, Copy)]
+struct Hole {
+    /// Position in the mirrored bytes the elided bytes were removed from
+    position: usize,
+    /// Number of elided bytes
+    length: usize,
+}
+
+/// Mirror of the input of a fragmentizer
+///
+/// The state of `Fragmentizer` is not accessible, but it is fully determined by its max message
+/// size, the bytes enqueued since the start of the current message, the number of fragments
+/// detected in the current message, and whether the current message was poisoned. Replaying
+/// these recreates the state, including incomplete literals and an exceeded max message size.
+///
+/// Processed bytes beyond the max message size are dropped by the fragmentizer. The mirror drops
+/// them, too, and only retains their number and the last `TAIL` bytes of their fragment. Replaying
+/// filler in their place recreates the same state, so that the mirror of a message exceeding the
+/// max message size stays bounded.
+///
+/// Snapshot format (all integers in little endian):
+///
+/// ```text
+/// magic "IMCF" | version u8 | flags u8 | max_message_size u32 | fragments u32 | length u64 | bytes
+///     | holes u32 | (position u64 | length u64) * holes
+/// ```
+#[derive(Debug, Clone)]
+pub(crate) struct Replay {
+    max_message_size: Option<u32>,
+    /// Bytes enqueued since the start of the current message, without elided bytes
+    bytes: Vec<u8>,
+    /// Elided bytes, ordered by their position
+    holes: Vec<Hole>,
+    /// Total number of elided bytes
+    elided: usize,
+    /// Number of bytes of the current message covered by detected fragments
+    consumed: usize,
+    /// Number of bytes of the current message processed by the fragmentizer
+    processed: usize,
+    /// Number of fragments detected in the current message
+    fragments: u32,
+    poisoned: bool,
+}
+
+impl Replay {
+    pub(crate) fn new(max_message_size: Option<u32>) -> Self {
+        Self {
+            max_message_size,
+            bytes: Vec::new(),
+            holes: Vec::new(),
+            elided: 0,
+            consumed: 0,
+            processed: 0,
+            fragments: 0,
+            poisoned: false,
+        }
+    }
+
+    pub(crate) fn enqueue_bytes(&mut self, bytes: &[u8]) {
+        self.bytes.extend_from_slice(bytes);
+    }
+
+    /// Record a call of `progress`, `message_complete` is the state before the call
+    pub(crate) fn progress(
+        &mut self,
+        message_complete: bool,
+        fragment_info: Option<&FragmentInfo>,
+    ) {
+        if message_complete {
+            // Progressing after a complete message starts the next message
+            self.start_next_message();
+        }
+
+        match fragment_info {
+            Some(FragmentInfo::Line { end, .. } | FragmentInfo::Literal { end, .. }) => {
+                // Fragments are reported at their position including elided bytes, which all
+                // precede the end of the fragment
+                self.consumed = *end - self.elided;
+                self.processed = self.consumed;
+                self.fragments += 1;
+            }
+            None => {
+                // Without a fragment, the fragmentizer processed all enqueued bytes
+                self.processed = self.bytes.len();
+            }
+        }
+
+        self.elide();
+    }
+
+    pub(crate) fn skip_message(&mut self) {
+        self.start_next_message();
+    }
+
+    pub(crate) fn poison_message(&mut self) {
+        self.poisoned = true;
+    }
+
+    fn start_next_message(&mut self) {
+        // The fragmentizer dropped all processed bytes of the current message
+        self.bytes.drain(..self.processed);
+        self.holes.clear();
+        self.elided = 0;
+        self.consumed = 0;
+        self.processed = 0;
+        self.fragments = 0;
+        self.poisoned = false;
+    }
+
+    /// Elide the processed bytes of the current fragment exceeding the max message size
+    fn elide(&mut self) {
+        let Some(max_message_size) = self.max_message_size else {
+            return;
+        };
+        let start = self.consumed.max(max_message_size as usize);
+        let end = self.processed.saturating_sub(TAIL);
+        // Elide at least `TAIL` bytes at once, so that the tail is not moved for every byte
+        if end < start + TAIL {
+            return;
+        }
+
+        self.bytes.drain(start..end);
+        self.processed -= end - start;
+        self.elided += end - start;
+        match self.holes.last_mut() {
+            // The current fragment was elided before, the kept tail is elided now
+            Some(hole) if hole.position == start => hole.length += end - start,
+            _ => self.holes.push(Hole {
+                position: start,
+                length: end - start,
+            }),
+        }
+    }
+
+    /// Recreate the mirrored fragmentizer, passing every replayed fragment to `visit`
+    pub(crate) fn replay(&self, mut visit: impl FnMut(&FragmentInfo)) -> Fragmentizer {
+        self.replay_inner(|fragment_info, _| visit(fragment_info)).0
+    }
+
+    /// Recreate the mirrored fragmentizer and return the number of replayed fragments
+    ///
+    /// Every replayed fragment is passed to `visit` together with the position of its end in the
+    /// mirrored bytes, or `None` if it ends within elided bytes.
+    fn replay_inner(
+        &self,
+        mut visit: impl FnMut(&FragmentInfo, Option<usize>),
+    ) -> (Fragmentizer, u32) {
+        let mut fragmentizer = self
+            .max_message_size
+            .map_or_else(Fragmentizer::without_max_message_size, Fragmentizer::new);
+        let mut fragments = 0;
+        let mut position = 0;
+        let mut elided = 0;
+
+        for hole in &self.holes {
+            fragmentizer.enqueue_bytes(&self.bytes[position..hole.position]);
+            position = hole.position;
+
+            let mut remaining = hole.length;
+            while remaining > 0 {
+                let length = remaining.min(FILLER.len());
+                fragmentizer.enqueue_bytes(&FILLER[..length]);
+                remaining -= length;
+                // Process the filler right away, so that it does not pile up
+                progress_until(
+                    &mut fragmentizer,
+                    &mut fragments,
+                    u32::MAX,
+                    |fragment_info| {
+                        let end = fragment_end(fragment_info)
+                            .checked_sub(elided)
+                            .filter(|end| *end <= position);
+                        visit(fragment_info, end);
+                    },
+                );
+            }
+
+            elided += hole.length;
+        }
+
+        fragmentizer.enqueue_bytes(&self.bytes[position..]);
+        progress_until(
+            &mut fragmentizer,
+            &mut fragments,
+            self.fragments,
+            |fragment_info| {
+                visit(
+                    fragment_info,
+                    fragment_end(fragment_info).checked_sub(elided),
+                )
+            },
+        );
+
+        if self.poisoned {
+            fragmentizer.poison_message();
+        }
+        (fragmentizer, fragments)
+    }
+
+    pub(crate) fn to_bytes(&self) -> Vec<u8> {
+        let mut flags = 0;
+        if self.max_message_size.is_some() {
+            flags |= FLAG_MAX_MESSAGE_SIZE;
+        }
+        if self.poisoned {
+            flags |= FLAG_POISONED;
+        }
+
+        let mut snapshot = Vec::with_capacity(26 + self.bytes.len() + 16 * self.holes.len());
+        snapshot.extend_from_slice(MAGIC);
+        snapshot.push(VERSION);
+        snapshot.push(flags);
+        snapshot.extend_from_slice(&self.max_message_size.unwrap_or(0).to_le_bytes());
+        snapshot.extend_from_slice(&self.fragments.to_le_bytes());
+        snapshot.extend_from_slice(&(self.bytes.len() as u64).to_le_bytes());
+        snapshot.extend_from_slice(&self.bytes);
+        snapshot.extend_from_slice(&(self.holes.len() as u32).to_le_bytes());
+        for hole in &self.holes {
+            snapshot.extend_from_slice(&(hole.position as u64).to_le_bytes());
+            snapshot.extend_from_slice(&(hole.length as u64).to_le_bytes());
+        }
+        snapshot
+    }
+
+    pub(crate) fn from_bytes(snapshot: &[u8]) -> PyResult<Self> {
+        let invalid = || PyValueError::new_err("invalid fragmentizer snapshot");
+        let to_usize = |bytes: &[u8; 8]| usize::try_from(u64::from_le_bytes(*bytes));
+
+        let rest = snapshot.strip_prefix(MAGIC).ok_or_else(invalid)?;
+        let (&[version, flags], rest) = rest.split_first_chunk::<2>().ok_or_else(invalid)?;
+        if !(1..=VERSION).contains(&version) {
+            return Err(PyValueError::new_err(format!(
+                "unsupported fragmentizer snapshot version: {version}"
+            )));
+        }
+        let (max_message_size, rest) = rest.split_first_chunk::<4>().ok_or_else(invalid)?;
+        let (fragments, rest) = rest.split_first_chunk::<4>().ok_or_else(invalid)?;
+        let (length, rest) = rest.split_first_chunk::<8>().ok_or_else(invalid)?;
+        let length = to_usize(length).map_err(|_| invalid())?;
+        if rest.len() < length {
+            return Err(invalid());
+        }
+        let (bytes, mut rest) = rest.split_at(length);
+
+        let mut holes = Vec::new();
+        if version > 1 {
+            let (count, tail) = rest.split_first_chunk::<4>().ok_or_else(invalid)?;
+            rest = tail;
+            for _ in 0..u32::from_le_bytes(*count) {
+                let (position, tail) = rest.split_first_chunk::<8>().ok_or_else(invalid)?;
+                let (length, tail) = tail.split_first_chunk::<8>().ok_or_else(invalid)?;
+                rest = tail;
+                holes.push(Hole {
+                    position: to_usize(position).map_err(|_| invalid())?,
+                    length: to_usize(length).map_err(|_| invalid())?,
+                });
+            }
+        }
+        if !rest.is_empty() {
+            return Err(invalid());
+        }
+
+        // Holes must be ordered, non-empty, and within the mirrored bytes
+        let mut previous = None;
+        for hole in &holes {
+            if hole.length == 0 || hole.position > bytes.len() || Some(hole.position) <= previous {
+                return Err(invalid());
+            }
+            previous = Some(hole.position);
+        }
+
+        let mut replay = Self {
+            max_message_size: (flags & FLAG_MAX_MESSAGE_SIZE != 0)
+                .then(|| u32::from_le_bytes(*max_message_size)),
+            bytes: bytes.to_vec(),
+            elided: holes.iter().map(|hole| hole.length).sum(),
+            holes,
+            consumed: 0,
+            processed: 0,
+            fragments: u32::from_le_bytes(*fragments),
+            poisoned: flags & FLAG_POISONED != 0,
+        };
+
+        // Recover `consumed` and validate the fragment count by replaying, all fragments must
+        // belong to the current message and must not end within elided bytes
+        let mut consumed = Some(0);
+        let (_, fragments) = replay.replay_inner(|_, end| {
+            consumed = consumed.and(end);
+        });
+        let consumed = consumed.ok_or_else(invalid)?;
+        if fragments != replay.fragments {
+            return Err(invalid());
+        }
+        replay.consumed = consumed;
+        replay.processed = consumed;
+
+        Ok(replay)
+    }
+}
+
+/// Return the end of a fragment in the current message
+fn fragment_end(fragment_info: &FragmentInfo) -> usize {
+    match fragment_info {
+        FragmentInfo::Line { end, .. } | FragmentInfo::Literal { end, .. } => *end,
+    }
+}
+
+/// Progress `fragmentizer` until `fragments` reaches `limit`, without starting the next message
+fn progress_until(
+    fragmentizer: &mut Fragmentizer,
+    fragments: &mut u32,
+    limit: u32,
+    mut visit: impl FnMut(&FragmentInfo),
+) {
+    while *fragments < limit && !(*fragments > 0 && fragmentizer.is_message_complete()) {
+        let Some(fragment_info) = fragmentizer.progress() else {
+            break;
+        };
+        visit(&fragment_info);
+        *fragments += 1;
+    }
+}
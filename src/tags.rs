@@ -0,0 +1,103 @@
+use std::collections::HashMap;
+
+use imap_codec::imap_types::{
+    core::Tag,
+    response::{Response, Status, Tagged},
+};
+use pyo3::{
+    exceptions::{PyKeyError, PyValueError},
+    prelude::*,
+};
+
+use crate::{PyCommand, PyResponse};
+
+/// Python class correlating tagged responses with the commands of a pipelining client
+///
+/// Every pending command is identified by its tag and associated with an arbitrary handle, e.g.
+/// a future. Tagged responses are resolved to their handle without converting them into a `dict`.
+#[derive(Debug)]
+#[pyclass(name = "TagTracker")]
+pub(crate) struct PyTagTracker {
+    prefix: String,
+    next: u64,
+    pending: HashMap<String, Py<PyAny>>,
+}
+
+impl PyTagTracker {
+    fn insert(&mut self, tag: String, handle: Py<PyAny>) -> PyResult<()> {
+        if self.pending.contains_key(&tag) {
+            return Err(PyValueError::new_err(format!(
+                "tag is already pending: {tag:?}"
+            )));
+        }
+        self.pending.insert(tag, handle);
+        Ok(())
+    }
+}
+
+#[pymethods]
+impl PyTagTracker {
+    /// Create a tracker issuing the tags `<prefix>1`, `<prefix>2`, ...
+    #[new]
+    #[pyo3(signature = (prefix="A"))]
+    fn new(prefix: &str) -> PyResult<Self> {
+        Tag::try_from(format!("{prefix}1"))
+            .map_err(|_| PyValueError::new_err(format!("invalid tag prefix: {prefix:?}")))?;
+        Ok(Self {
+            prefix: prefix.to_owned(),
+            next: 1,
+            pending: HashMap::new(),
+        })
+    }
+
+    /// Issue a new tag and associate it with `handle`
+    fn issue(&mut self, handle: Py<PyAny>) -> String {
+        loop {
+            let tag = format!("{}{}", self.prefix, self.next);
+            self.next += 1;
+            // Skip tags that were registered explicitly
+            if !self.pending.contains_key(&tag) {
+                self.pending.insert(tag.clone(), handle);
+                return tag;
+            }
+        }
+    }
+
+    /// Associate the tag of an existing command with `handle`
+    fn register(&mut self, command: &PyCommand, handle: Py<PyAny>) -> PyResult<()> {
+        self.insert(command.0.tag.inner().to_owned(), handle)
+    }
+
+    /// Remove the command a tagged response completes and return its handle
+    ///
+    /// Returns `None` for untagged responses and continuation requests.
+    fn resolve(&mut self, response: &PyResponse) -> PyResult<Option<Py<PyAny>>> {
+        match &response.0 {
+            Response::Status(Status::Tagged(Tagged { tag, .. })) => {
+                self.resolve_tag(tag.inner()).map(Some)
+            }
+            _ => Ok(None),
+        }
+    }
+
+    /// Remove the command with `tag` and return its handle, e.g. for the tag of a `MessagePeek`
+    fn resolve_tag(&mut self, tag: &str) -> PyResult<Py<PyAny>> {
+        self.pending
+            .remove(tag)
+            .ok_or_else(|| PyKeyError::new_err(tag.to_owned()))
+    }
+
+    /// Retrieve the prefix of issued tags
+    #[getter]
+    fn prefix(&self) -> &str {
+        &self.prefix
+    }
+
+    fn __contains__(&self, tag: &str) -> bool {
+        self.pending.contains_key(tag)
+    }
+
+    fn __len__(&self) -> usize {
+        self.pending.len()
+    }
+}
@@ -0,0 +1,122 @@
+import unittest
+
+from imap_codec import BodyStructure, ResponseCodec
+
+MULTIPART = (
+    b"* 1 FETCH (UID 10 BODYSTRUCTURE ("
+    b'("TEXT" "PLAIN" ("CHARSET" "UTF-8") NIL NIL "7BIT" 12 1 NIL NIL NIL NIL)'
+    b'("APPLICATION" "PDF" ("NAME" "a.pdf") "<id>" "Report" "BASE64" 100 NIL '
+    b'("ATTACHMENT" ("FILENAME" "report.pdf")) NIL NIL)'
+    b'("MESSAGE" "RFC822" NIL NIL NIL "7BIT" 300 '
+    b'(NIL "Forwarded" NIL NIL NIL NIL NIL NIL NIL NIL) '
+    b'(("TEXT" "HTML" NIL NIL NIL "QUOTED-PRINTABLE" 10 1)'
+    b'("IMAGE" "PNG" ("NAME" "logo.png") NIL NIL "BASE64" 50) "ALTERNATIVE") 20)'
+    b' "MIXED" ("BOUNDARY" "x") NIL NIL))\r\n'
+)
+
+SINGLE = (
+    b'* 2 FETCH (BODYSTRUCTURE ("TEXT" "PLAIN" ("CHARSET" "US-ASCII") NIL NIL "7BIT" '
+    b"3028 92))\r\n"
+)
+
+
+def body_structure(buffer: bytes) -> BodyStructure:
+    _, response = ResponseCodec.decode(buffer)
+    body_structure = BodyStructure.from_response(response)
+    assert body_structure is not None
+    return body_structure
+
+
+class TestBodyStructure(unittest.TestCase):
+    def test_from_response(self):
+        _, response = ResponseCodec.decode(b"* 1 FETCH (UID 10)\r\n")
+        self.assertIsNone(BodyStructure.from_response(response))
+
+        _, response = ResponseCodec.decode(b"* 1 EXISTS\r\n")
+        self.assertIsNone(BodyStructure.from_response(response))
+
+        with self.assertRaises(TypeError):
+            BodyStructure.from_response(MULTIPART)
+
+    def test_root(self):
+        root = body_structure(MULTIPART)
+        self.assertIsNone(root.part_number)
+        self.assertTrue(root.is_multipart)
+        self.assertEqual(root.media_type, "multipart/mixed")
+        self.assertEqual(root.parameters, {"boundary": "x"})
+        self.assertIsNone(root.encoding)
+        self.assertIsNone(root.size)
+        self.assertEqual(len(root), 3)
+        self.assertEqual([part.part_number for part in root.parts], ["1", "2", "3"])
+        self.assertEqual(
+            repr(root), "BodyStructure(part_number=None, media_type='multipart/mixed')"
+        )
+
+    def test_single_part(self):
+        text = body_structure(MULTIPART).part("1")
+        self.assertFalse(text.is_multipart)
+        self.assertEqual(text.media_type, "text/plain")
+        self.assertEqual(text.parameters, {"charset": "UTF-8"})
+        self.assertEqual(text.encoding, "7BIT")
+        self.assertEqual(text.size, 12)
+        self.assertEqual(text.lines, 1)
+        self.assertIsNone(text.disposition)
+        self.assertIsNone(text.filename)
+        self.assertFalse(text.is_attachment)
+        self.assertEqual(text.parts, [])
+
+        pdf = body_structure(MULTIPART).part("2")
+        self.assertEqual(pdf.media_type, "application/pdf")
+        self.assertEqual(pdf.id, "<id>")
+        self.assertEqual(pdf.description, "Report")
+        self.assertIsNone(pdf.lines)
+        self.assertEqual(pdf.disposition, "attachment")
+        self.assertEqual(pdf.disposition_parameters, {"filename": "report.pdf"})
+        self.assertEqual(pdf.filename, "report.pdf")
+        self.assertTrue(pdf.is_attachment)
+
+    def test_encapsulated_message(self):
+        root = body_structure(MULTIPART)
+        message = root.part("3")
+        self.assertEqual(message.media_type, "message/rfc822")
+        self.assertEqual(message.lines, 20)
+        self.assertIsInstance(message.envelope, dict)
+        self.assertEqual(
+            [(part.part_number, part.media_type) for part in message.parts],
+            [("3.1", "text/html"), ("3.2", "image/png")],
+        )
+        self.assertIsNone(root.part("1").envelope)
+
+    def test_part(self):
+        root = body_structure(MULTIPART)
+        self.assertEqual(root.part("3.2").filename, "logo.png")
+        self.assertEqual(root.parts[2].part("1").part_number, "1")
+
+        for number in ["4", "1.1", "3.3", "3.1.1"]:
+            with self.subTest(number=number), self.assertRaises(KeyError):
+                root.part(number)
+
+        for number in ["", "0", "1.", "a", "-1"]:
+            with self.subTest(number=number), self.assertRaises(ValueError):
+                root.part(number)
+
+    def test_part_single(self):
+        root = body_structure(SINGLE)
+        self.assertEqual(root.part_number, "1")
+        self.assertEqual(root.media_type, "text/plain")
+        self.assertEqual(root.size, 3028)
+        self.assertEqual(root.lines, 92)
+        self.assertEqual(root.part("1").as_dict(), root.as_dict())
+
+        with self.assertRaises(KeyError):
+            root.part("2")
+        with self.assertRaises(KeyError):
+            root.part("1.1")
+
+    def test_attachments(self):
+        root = body_structure(MULTIPART)
+        self.assertEqual(
+            [(part.part_number, part.filename) for part in root.attachments()],
+            [("2", "report.pdf"), ("3.2", "logo.png")],
+        )
+        self.assertEqual(body_structure(SINGLE).attachments(), [])
@@ -0,0 +1,114 @@
+import unittest
+
+from imap_codec import (
+    CapabilitySet,
+    DecodeCache,
+    DecodeFailed,
+    DecodeIncomplete,
+    GreetingCodec,
+    ResponseCodec,
+)
+
+GREETING = b"* OK [CAPABILITY IMAP4rev1 AUTH=PLAIN IDLE LITERAL+ X-FOO] ready\r\n"
+CAPABILITY = b"* CAPABILITY IMAP4rev1 AUTH=PLAIN AUTH=XOAUTH2 IDLE\r\n"
+
+
+class TestCapabilitySet(unittest.TestCase):
+    def test_from_greeting(self):
+        _, greeting = GreetingCodec.decode(GREETING)
+        capabilities = CapabilitySet.from_greeting(greeting)
+        assert capabilities is not None
+        self.assertEqual(len(capabilities), 5)
+        self.assertTrue(capabilities.has("IMAP4rev1"))
+        self.assertTrue(capabilities.has("idle"))
+        self.assertTrue(capabilities.has("LITERAL+"))
+        self.assertTrue(capabilities.has("x-foo"))
+        self.assertFalse(capabilities.has("STARTTLS"))
+        self.assertIn("AUTH=PLAIN", capabilities)
+
+        _, greeting = GreetingCodec.decode(b"* OK ready\r\n")
+        self.assertIsNone(CapabilitySet.from_greeting(greeting))
+
+    def test_from_response(self):
+        _, response = ResponseCodec.decode(CAPABILITY)
+        capabilities = CapabilitySet.from_response(response)
+        assert capabilities is not None
+        self.assertEqual(len(capabilities), 4)
+        self.assertEqual(len(capabilities.to_list()), 4)
+
+        _, response = ResponseCodec.decode(
+            b"A1 OK [CAPABILITY IMAP4rev1 IDLE] done\r\n"
+        )
+        capabilities = CapabilitySet.from_response(response)
+        assert capabilities is not None
+        self.assertTrue(capabilities.has("IDLE"))
+
+        for buffer in [b"* 1 EXISTS\r\n", b"A1 OK done\r\n", b"+ ready\r\n"]:
+            with self.subTest(buffer=buffer):
+                _, response = ResponseCodec.decode(buffer)
+                self.assertIsNone(CapabilitySet.from_response(response))
+
+    def test_auth(self):
+        _, response = ResponseCodec.decode(CAPABILITY)
+        capabilities = CapabilitySet.from_response(response)
+        assert capabilities is not None
+        self.assertTrue(capabilities.has_auth("PLAIN"))
+        self.assertTrue(capabilities.has_auth("xoauth2"))
+        self.assertFalse(capabilities.has_auth("LOGIN"))
+        self.assertFalse(capabilities.has_auth("IDLE"))
+        self.assertEqual(
+            [mechanism.upper() for mechanism in capabilities.auth_mechanisms],
+            ["PLAIN", "XOAUTH2"],
+        )
+
+    def test_eq(self):
+        _, first = ResponseCodec.decode(b"* CAPABILITY IMAP4rev1 IDLE\r\n")
+        _, second = ResponseCodec.decode(b"* CAPABILITY IDLE IMAP4rev1 IDLE\r\n")
+        self.assertEqual(
+            CapabilitySet.from_response(first), CapabilitySet.from_response(second)
+        )
+
+
+class TestDecodeCache(unittest.TestCase):
+    def test_decode_greeting(self):
+        cache = DecodeCache()
+        self.assertEqual(cache.max_entries, 64)
+        greeting = cache.decode_greeting(GREETING)
+        self.assertEqual(greeting, GreetingCodec.decode(GREETING)[1])
+        self.assertIs(cache.decode_greeting(GREETING), greeting)
+        self.assertEqual(len(cache), 1)
+
+    def test_decode_response(self):
+        cache = DecodeCache()
+        response = cache.decode_response(CAPABILITY)
+        self.assertEqual(response, ResponseCodec.decode(CAPABILITY)[1])
+        self.assertIs(cache.decode_response(CAPABILITY), response)
+        self.assertIsNot(cache.decode_response(b"* 1 EXISTS\r\n"), response)
+        self.assertEqual(len(cache), 2)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNot(cache.decode_response(CAPABILITY), response)
+
+    def test_eviction(self):
+        cache = DecodeCache(max_entries=2)
+        first = cache.decode_response(b"* 1 EXISTS\r\n")
+        cache.decode_response(b"* 2 EXISTS\r\n")
+        cache.decode_response(b"* 3 EXISTS\r\n")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNot(cache.decode_response(b"* 1 EXISTS\r\n"), first)
+
+        cache = DecodeCache(max_entries=0)
+        response = cache.decode_response(CAPABILITY)
+        self.assertIsNot(cache.decode_response(CAPABILITY), response)
+        self.assertEqual(len(cache), 0)
+
+    def test_errors(self):
+        cache = DecodeCache()
+        with self.assertRaises(DecodeIncomplete):
+            cache.decode_greeting(GREETING[:-2])
+        with self.assertRaises(DecodeFailed):
+            cache.decode_response(b"* CAPABILITY\r\n")
+        with self.assertRaises(ValueError):
+            cache.decode_response(CAPABILITY + b"* 1 EXISTS\r\n")
+        self.assertEqual(len(cache), 0)
@@ -0,0 +1,72 @@
+import unittest
+
+from imap_codec import (
+    Command,
+    CommandCodec,
+    GreetingCodec,
+    IdleDone,
+    IdleDoneCodec,
+    ResponseCodec,
+)
+
+
+class TestCodecInstances(unittest.TestCase):
+    def test_retain_capacity(self):
+        self.assertEqual(ResponseCodec().retain_capacity, 4096)
+        self.assertEqual(ResponseCodec(retain_capacity=0).retain_capacity, 0)
+
+    def test_scratch_buffer_is_reused(self):
+        codec = CommandCodec(retain_capacity=64)
+        capacity = codec.scratch_capacity
+        self.assertGreaterEqual(capacity, 64)
+        command = Command.from_dict({"tag": "a", "body": {"type": "Noop"}})
+        buffer = bytearray()
+        for _ in range(3):
+            self.assertEqual(codec.dump(command), b"a NOOP\r\n")
+            codec.encode_into(command, buffer)
+            # Cleared without giving up the allocation
+            self.assertEqual(codec.scratch_capacity, capacity)
+
+    def test_static_methods_on_instance(self):
+        codec = CommandCodec()
+        remaining, command = codec.decode(b"a NOOP\r\n")
+        self.assertEqual(remaining, b"")
+        self.assertEqual(codec.encode(command).dump(), b"a NOOP\r\n")
+
+    def test_encode_into(self):
+        codec = CommandCodec()
+        command = Command.from_dict({"tag": "a", "body": {"type": "Noop"}})
+        buffer = bytearray(b"prefix ")
+        self.assertEqual(codec.encode_into(command, buffer), 8)
+        self.assertEqual(codec.encode_into(command, buffer), 8)
+        self.assertEqual(buffer, b"prefix a NOOP\r\na NOOP\r\n")
+
+    def test_encode_into_passthrough(self):
+        codec = ResponseCodec()
+        _, response = codec.decode(b"* 3 exists\r\n", keep_raw=True)
+        buffer = bytearray()
+        codec.encode_into(response, buffer, passthrough=True)
+        codec.encode_into(response, buffer)
+        self.assertEqual(buffer, b"* 3 exists\r\n* 3 EXISTS\r\n")
+
+    def test_dump_matches_encoded_dump(self):
+        codec = GreetingCodec()
+        _, greeting = codec.decode(b"* OK [ALERT] hello\r\n")
+        for _ in range(3):
+            self.assertEqual(codec.dump(greeting), codec.encode(greeting).dump())
+
+    def test_large_message(self):
+        codec = CommandCodec(retain_capacity=1024)
+        _, command = codec.decode(
+            b"a LOGIN alice {100000+}\r\n" + b"x" * 100000 + b"\r\n"
+        )
+        self.assertEqual(codec.dump(command), CommandCodec.encode(command).dump())
+        # The allocation of a large message is not pinned
+        self.assertLessEqual(codec.scratch_capacity, 1024)
+
+    def test_idle_done(self):
+        codec = IdleDoneCodec()
+        buffer = bytearray()
+        self.assertEqual(codec.encode_into(IdleDone(), buffer), 6)
+        self.assertEqual(buffer, b"DONE\r\n")
+        self.assertEqual(codec.dump(IdleDone()), b"DONE\r\n")
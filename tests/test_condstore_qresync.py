@@ -0,0 +1,143 @@
+import unittest
+from array import array
+
+from imap_codec import Command, CommandCodec, FetchColumns, Response, ResponseCodec
+
+COMMANDS = [
+    b"A1 ENABLE CONDSTORE\r\n",
+    b"A2 SELECT INBOX (CONDSTORE)\r\n",
+    b"A3 FETCH 1:* (UID FLAGS) (CHANGEDSINCE 12345)\r\n",
+    b"A4 UID FETCH 300:500 (FLAGS) (CHANGEDSINCE 12345 VANISHED)\r\n",
+    b"A5 STORE 1:10 (UNCHANGEDSINCE 12345) +FLAGS (\\Seen)\r\n",
+    b"A6 STATUS INBOX (MESSAGES HIGHESTMODSEQ)\r\n",
+]
+
+RESPONSES = [
+    b"* OK [HIGHESTMODSEQ 715194045007] Highest\r\n",
+    b"* OK [NOMODSEQ] Sorry, this mailbox format doesn't support modsequences\r\n",
+    b"* 1 FETCH (UID 7 MODSEQ (12345) FLAGS (\\Seen))\r\n",
+    b"* VANISHED (EARLIER) 41,43:116,118\r\n",
+    b"* VANISHED 405,407\r\n",
+    b"A5 OK [MODIFIED 7,9] Conditional STORE failed\r\n",
+    b"* STATUS INBOX (MESSAGES 3 HIGHESTMODSEQ 7011231777)\r\n",
+]
+
+
+def sequence_set(text: bytes) -> list:
+    """Return the dictionary representation of sequence set `text`"""
+    _, command = CommandCodec.decode(b"A UID FETCH " + text + b" (UID)\r\n")
+    return command.as_dict()["body"]["content"]["sequence_set"]
+
+
+def inbox() -> dict:
+    """Return the dictionary representation of mailbox `INBOX`"""
+    _, command = CommandCodec.decode(b"A SELECT INBOX\r\n")
+    return command.as_dict()["body"]["content"]["mailbox"]
+
+
+class TestCondstoreQresync(unittest.TestCase):
+    def test_command_round_trip(self):
+        for buffer in COMMANDS:
+            with self.subTest(buffer=buffer):
+                remaining, command = CommandCodec.decode(buffer)
+                self.assertEqual(remaining, b"")
+                encoded = CommandCodec.encode(command).dump()
+                self.assertEqual(CommandCodec.decode(encoded), (b"", command))
+
+    def test_response_round_trip(self):
+        for buffer in RESPONSES:
+            with self.subTest(buffer=buffer):
+                remaining, response = ResponseCodec.decode(buffer)
+                self.assertEqual(remaining, b"")
+                encoded = ResponseCodec.encode(response).dump()
+                self.assertEqual(ResponseCodec.decode(encoded), (b"", response))
+
+    def test_modseq_column(self):
+        responses = [
+            ResponseCodec.decode(b"* 1 FETCH (UID 7 MODSEQ (12345))\r\n")[1],
+            ResponseCodec.decode(b"* 2 FETCH (UID 8)\r\n")[1],
+        ]
+        columns = FetchColumns.from_responses(responses)
+        self.assertEqual(columns.modseq, array("Q", [12345, 0]))
+
+    def test_modseq_projection(self):
+        _, response = ResponseCodec.decode(
+            b"* 1 FETCH (UID 7 MODSEQ (12345) FLAGS (\\Seen))\r\n",
+            fields={"UID", "MODSEQ"},
+        )
+        self.assertEqual(
+            response,
+            ResponseCodec.decode(b"* 1 FETCH (UID 7 MODSEQ (12345))\r\n")[1],
+        )
+
+
+class TestDictionaries(unittest.TestCase):
+    def test_modseq(self):
+        _, response = ResponseCodec.decode(b"* 1 FETCH (UID 7 MODSEQ (12345))\r\n")
+        data = {
+            "type": "Data",
+            "content": {
+                "type": "Fetch",
+                "content": {
+                    "seq": 1,
+                    "items": [
+                        {"type": "Uid", "content": 7},
+                        {"type": "ModSeq", "content": 12345},
+                    ],
+                },
+            },
+        }
+        self.assertEqual(response.as_dict(), data)
+        self.assertEqual(Response.from_dict(data), response)
+
+    def test_vanished_earlier(self):
+        _, response = ResponseCodec.decode(b"* VANISHED (EARLIER) 41,43:116\r\n")
+        data = {
+            "type": "Data",
+            "content": {
+                "type": "Vanished",
+                "content": {"earlier": True, "known_uids": sequence_set(b"41,43:116")},
+            },
+        }
+        self.assertEqual(response.as_dict(), data)
+        self.assertEqual(Response.from_dict(data), response)
+        self.assertEqual(
+            ResponseCodec.encode(Response.from_dict(data)).dump(),
+            b"* VANISHED (EARLIER) 41,43:116\r\n",
+        )
+
+    def test_select_qresync(self):
+        _, command = CommandCodec.decode(
+            b"A1 SELECT INBOX (QRESYNC (67890007 90060115194045000 41:211))\r\n"
+        )
+        data = {
+            "tag": "A1",
+            "body": {
+                "type": "Select",
+                "content": {
+                    "mailbox": inbox(),
+                    "parameters": [
+                        {
+                            "type": "QResync",
+                            "content": {
+                                "uid_validity": 67890007,
+                                "mod_sequence_value": 90060115194045000,
+                                "known_uids": sequence_set(b"41:211"),
+                                "seq_match_data": None,
+                            },
+                        }
+                    ],
+                },
+            },
+        }
+        self.assertEqual(command.as_dict(), data)
+        self.assertEqual(Command.from_dict(data), command)
+
+    def test_fetch_changedsince(self):
+        _, command = CommandCodec.decode(b"A3 FETCH 1:* (UID) (CHANGEDSINCE 12345)\r\n")
+        data = command.as_dict()
+        self.assertEqual(
+            data["body"]["content"]["modifiers"],
+            [{"type": "ChangedSince", "content": 12345}],
+        )
+        self.assertEqual(Command.from_dict(data), command)
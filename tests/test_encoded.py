@@ -0,0 +1,316 @@
+import io
+import tempfile
+import unittest
+
+from imap_codec import (
+    Command,
+    CommandCodec,
+    FileLiteral,
+    LineEnding,
+    LineFragment,
+    LiteralFragment,
+    LiteralMode,
+    StreamLiteral,
+)
+
+
+def _login(password: bytes, mode: str = "Sync") -> Command:
+    return Command.from_dict(
+        {
+            "tag": "A",
+            "body": {
+                "type": "Login",
+                "content": {
+                    "username": {"type": "Atom", "content": "alice"},
+                    "password": {
+                        "type": "String",
+                        "content": {
+                            "type": "Literal",
+                            "content": {"data": list(password), "mode": mode},
+                        },
+                    },
+                },
+            },
+        }
+    )
+
+
+class TestDumpInto(unittest.TestCase):
+    def test_dump_into(self):
+        buffer = bytearray(b"<prefix>")
+        written = CommandCodec.encode(_login(b"\xca\xfe")).dump_into(buffer)
+        self.assertEqual(written, 23)
+        self.assertEqual(buffer, b"<prefix>A LOGIN alice {2}\r\n\xca\xfe\r\n")
+
+    def test_dump_into_remaining(self):
+        encoded = CommandCodec.encode(_login(b"\xca\xfe"))
+        next(encoded)
+        buffer = bytearray()
+        self.assertEqual(encoded.dump_into(buffer), 4)
+        self.assertEqual(buffer, b"\xca\xfe\r\n")
+        self.assertEqual(encoded.dump_into(buffer), 0)
+        self.assertEqual(encoded.dump(), b"")
+
+    def test_dump_into_invalid_buffer(self):
+        encoded = CommandCodec.encode(_login(b"\xca\xfe"))
+        with self.assertRaises(TypeError):
+            encoded.dump_into(b"")
+
+
+class TestDumpSegments(unittest.TestCase):
+    def test_sync_literals(self):
+        command = Command.from_dict(
+            {
+                "tag": "A",
+                "body": {
+                    "type": "Login",
+                    "content": {
+                        "username": {
+                            "type": "String",
+                            "content": {
+                                "type": "Literal",
+                                "content": {"data": list(b"alice"), "mode": "Sync"},
+                            },
+                        },
+                        "password": {
+                            "type": "String",
+                            "content": {
+                                "type": "Literal",
+                                "content": {"data": list(b"secret"), "mode": "Sync"},
+                            },
+                        },
+                    },
+                },
+            }
+        )
+        self.assertEqual(
+            CommandCodec.encode(command).dump_segments(),
+            [b"A LOGIN {5}\r\n", b"alice {6}\r\n", b"secret\r\n"],
+        )
+
+    def test_non_sync_literal(self):
+        encoded = CommandCodec.encode(_login(b"\xca\xfe", mode="NonSync"))
+        self.assertEqual(
+            encoded.dump_segments(), [b"A LOGIN alice {2+}\r\n\xca\xfe\r\n"]
+        )
+
+    def test_without_literal(self):
+        encoded = CommandCodec.encode(
+            Command.from_dict({"tag": "A", "body": {"type": "Noop"}})
+        )
+        self.assertEqual(encoded.dump_segments(), [b"A NOOP\r\n"])
+        self.assertEqual(encoded.dump_segments(), [])
+
+    def test_remaining(self):
+        encoded = CommandCodec.encode(_login(b"\xca\xfe"))
+        next(encoded)
+        self.assertEqual(encoded.dump_segments(), [b"", b"\xca\xfe\r\n"])
+
+    def test_attached(self):
+        encoded = CommandCodec.encode(_login(b""))
+        encoded.attach_literals([FileLiteral(3, 0, 1)])
+        with self.assertRaises(ValueError):
+            encoded.dump_segments()
+
+
+class TestSetLineEnding(unittest.TestCase):
+    def test_lf(self):
+        encoded = CommandCodec.encode(_login(b"\r\n"))
+        encoded.set_line_ending(LineEnding.Lf)
+        self.assertEqual(encoded.dump(), b"A LOGIN alice {2}\n\r\n\n")
+
+    def test_crlf(self):
+        encoded = CommandCodec.encode(_login(b"\n\n"))
+        encoded.set_line_ending(LineEnding.Lf)
+        encoded.set_line_ending(LineEnding.CrLf)
+        self.assertEqual(encoded.dump(), b"A LOGIN alice {2}\r\n\n\n\r\n")
+
+    def test_remaining(self):
+        encoded = CommandCodec.encode(_login(b"\xca\xfe"))
+        self.assertIsInstance(next(encoded), LineFragment)
+        encoded.set_line_ending(LineEnding.Lf)
+        self.assertEqual(encoded.dump(), b"\xca\xfe\n")
+
+    def test_attach_literals(self):
+        encoded = CommandCodec.encode(_login(b""))
+        encoded.set_line_ending(LineEnding.Lf)
+        with tempfile.TemporaryFile() as file:
+            encoded.attach_literals([FileLiteral(file.fileno(), 0, 3)])
+            fragments = list(encoded)
+        self.assertEqual(fragments[0], LineFragment(b"A LOGIN alice {3}\n"))
+        self.assertEqual(fragments[2], LineFragment(b"\n"))
+
+
+class TestFileLiteral(unittest.TestCase):
+    def test_file_literal(self):
+        literal = FileLiteral(3, 10, 5)
+        self.assertEqual(literal.fd, 3)
+        self.assertEqual(literal.offset, 10)
+        self.assertEqual(literal.length, 5)
+        self.assertEqual(literal.mode, LiteralMode.Sync)
+        self.assertEqual(
+            repr(literal),
+            "FileLiteral(fd=3, offset=10, length=5, mode=LiteralMode.Sync)",
+        )
+        self.assertEqual(literal, FileLiteral(3, 10, 5, LiteralMode.Sync))
+        self.assertNotEqual(literal, FileLiteral(3, 10, 5, LiteralMode.NonSync))
+
+    def test_attach_literals(self):
+        encoded = CommandCodec.encode(_login(b""))
+        literal = FileLiteral(3, 10, 1234)
+        encoded.attach_literals([literal])
+        self.assertEqual(
+            list(encoded),
+            [LineFragment(b"A LOGIN alice {1234}\r\n"), literal, LineFragment(b"\r\n")],
+        )
+
+    def test_attach_literals_mode(self):
+        encoded = CommandCodec.encode(_login(b""))
+        encoded.attach_literals([FileLiteral(3, 0, 7, LiteralMode.NonSync)])
+        self.assertEqual(next(encoded), LineFragment(b"A LOGIN alice {7+}\r\n"))
+
+        encoded = CommandCodec.encode(_login(b"", mode="NonSync"))
+        encoded.attach_literals([FileLiteral(3, 0, 7)])
+        self.assertEqual(next(encoded), LineFragment(b"A LOGIN alice {7}\r\n"))
+
+    def test_attach_literals_sendfile(self):
+        with tempfile.TemporaryFile() as file:
+            file.write(b"<header>secret<trailer>")
+            file.flush()
+
+            encoded = CommandCodec.encode(_login(b""))
+            encoded.attach_literals([FileLiteral(file.fileno(), 8, 6)])
+
+            output = bytearray()
+            for fragment in encoded:
+                if isinstance(fragment, FileLiteral):
+                    file.seek(fragment.offset)
+                    output += file.read(fragment.length)
+                else:
+                    output += fragment.data
+
+        self.assertEqual(output, CommandCodec.encode(_login(b"secret")).dump())
+
+    def test_attach_literals_count_mismatch(self):
+        encoded = CommandCodec.encode(_login(b""))
+        with self.assertRaises(ValueError):
+            encoded.attach_literals([])
+        with self.assertRaises(ValueError):
+            encoded.attach_literals([FileLiteral(3, 0, 1), FileLiteral(3, 0, 1)])
+
+        # Non-empty literals are not replaced
+        encoded = CommandCodec.encode(_login(b"\xca\xfe"))
+        with self.assertRaises(ValueError):
+            encoded.attach_literals([FileLiteral(3, 0, 1)])
+        self.assertEqual(encoded.dump(), b"A LOGIN alice {2}\r\n\xca\xfe\r\n")
+
+    def test_attach_literals_invalid_type(self):
+        encoded = CommandCodec.encode(_login(b""))
+        with self.assertRaises(TypeError):
+            encoded.attach_literals([LiteralFragment(b"x", LiteralMode.Sync)])
+
+    def test_dump_attached(self):
+        encoded = CommandCodec.encode(_login(b""))
+        encoded.attach_literals([FileLiteral(3, 0, 1)])
+        with self.assertRaises(ValueError):
+            encoded.dump()
+        with self.assertRaises(ValueError):
+            encoded.dump_into(bytearray())
+        self.assertEqual(len(list(encoded)), 3)
+
+
+class TestStreamLiteral(unittest.TestCase):
+    def test_iterator(self):
+        literal = StreamLiteral(iter([b"ab", b"", b"cde"]), 5)
+        self.assertEqual(literal.length, 5)
+        self.assertEqual(literal.mode, LiteralMode.Sync)
+        self.assertEqual(
+            repr(literal), "StreamLiteral(length=5, mode=LiteralMode.Sync)"
+        )
+        self.assertEqual(list(literal), [b"ab", b"cde"])
+
+    def test_file(self):
+        literal = StreamLiteral(io.BytesIO(b"abcdefg"), 7, chunk_size=3)
+        self.assertEqual(list(literal), [b"abc", b"def", b"g"])
+
+    def test_file_reads_only_length(self):
+        file = io.BytesIO(b"abcdefg")
+        literal = StreamLiteral(file, 4, chunk_size=3)
+        self.assertEqual(list(literal), [b"abc", b"d"])
+        self.assertEqual(file.read(), b"efg")
+
+    def test_source_too_short(self):
+        for source in [io.BytesIO(b"abc"), [b"abc"]]:
+            with self.subTest(source=source):
+                literal = StreamLiteral(source, 5)
+                self.assertEqual(next(literal), b"abc")
+                with self.assertRaises(ValueError):
+                    next(literal)
+
+    def test_source_too_long(self):
+        literal = StreamLiteral([b"abc", b"def"], 5)
+        self.assertEqual(next(literal), b"abc")
+        with self.assertRaises(ValueError):
+            next(literal)
+
+    def test_source_invalid(self):
+        with self.assertRaises(TypeError):
+            StreamLiteral(42, 5)
+        with self.assertRaises(TypeError):
+            next(StreamLiteral(["abc"], 3))
+        with self.assertRaises(TypeError):
+            next(StreamLiteral(io.StringIO("abc"), 3))
+        with self.assertRaises(ValueError):
+            StreamLiteral([], 0, chunk_size=0)
+
+    def test_attach_literals(self):
+        encoded = CommandCodec.encode(_login(b""))
+        literal = StreamLiteral(io.BytesIO(b"secret"), 6, chunk_size=4)
+        encoded.attach_literals([literal])
+
+        output = bytearray()
+        for fragment in encoded:
+            if isinstance(fragment, StreamLiteral):
+                self.assertIs(fragment, literal)
+                for chunk in fragment:
+                    output += chunk
+            else:
+                output += fragment.data
+
+        self.assertEqual(output, CommandCodec.encode(_login(b"secret")).dump())
+
+    def test_attach_mixed_literals(self):
+        command = Command.from_dict(
+            {
+                "tag": "A",
+                "body": {
+                    "type": "Login",
+                    "content": {
+                        "username": {
+                            "type": "String",
+                            "content": {
+                                "type": "Literal",
+                                "content": {"data": [], "mode": "Sync"},
+                            },
+                        },
+                        "password": {
+                            "type": "String",
+                            "content": {
+                                "type": "Literal",
+                                "content": {"data": [], "mode": "Sync"},
+                            },
+                        },
+                    },
+                },
+            }
+        )
+        encoded = CommandCodec.encode(command)
+        encoded.attach_literals(
+            [FileLiteral(3, 0, 5), StreamLiteral([b"secret"], 6, LiteralMode.NonSync)]
+        )
+        fragments = list(encoded)
+        self.assertEqual(fragments[0], LineFragment(b"A LOGIN {5}\r\n"))
+        self.assertEqual(fragments[1], FileLiteral(3, 0, 5))
+        self.assertEqual(fragments[2], LineFragment(b" {6+}\r\n"))
+        self.assertIsInstance(fragments[3], StreamLiteral)
+        self.assertEqual(fragments[4], LineFragment(b"\r\n"))
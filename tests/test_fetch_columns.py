@@ -0,0 +1,125 @@
+import unittest
+from array import array
+from datetime import datetime, timezone
+
+from imap_codec import (
+    DecodeStatus,
+    FetchColumns,
+    Fragmentizer,
+    Response,
+    ResponseCodec,
+)
+
+RESPONSES = [
+    b'* 1 FETCH (UID 10 FLAGS (\\Seen \\Answered) RFC822.SIZE 100 INTERNALDATE "17-Jul-1996 02:44:25 -0700")\r\n',
+    b"* 2 FETCH (UID 11 FLAGS ())\r\n",
+    b"* 3 FETCH (RFC822.SIZE 0)\r\n",
+]
+
+TIMESTAMP = int(datetime(1996, 7, 17, 9, 44, 25, tzinfo=timezone.utc).timestamp())
+
+
+def assert_columns(test, columns):
+    test.assertEqual(len(columns), 3)
+    test.assertEqual(columns.seq, array("I", [1, 2, 3]))
+    test.assertEqual(columns.uid, array("I", [10, 11, 0]))
+    test.assertEqual(columns.size, array("q", [100, -1, 0]))
+    test.assertEqual(columns.internal_date, array("q", [TIMESTAMP, -(2**63), -(2**63)]))
+    test.assertEqual(columns.flags, [["\\Seen", "\\Answered"], [], None])
+
+
+class TestFetchColumns(unittest.TestCase):
+    def test_from_responses(self):
+        responses = [ResponseCodec.decode(buffer)[1] for buffer in RESPONSES]
+        responses.append(ResponseCodec.decode(b"* 3 EXISTS\r\n")[1])
+        assert_columns(self, FetchColumns.from_responses(responses))
+
+    def test_from_responses_type_error(self):
+        with self.assertRaises(TypeError):
+            FetchColumns.from_responses([b"* 1 FETCH (UID 1)\r\n"])
+
+    def test_empty(self):
+        columns = FetchColumns.from_responses([])
+        self.assertEqual(len(columns), 0)
+        self.assertEqual(columns.seq, array("I"))
+        self.assertEqual(columns.flags, [])
+
+    def test_buffer_protocol(self):
+        columns = FetchColumns.from_responses(
+            [ResponseCodec.decode(buffer)[1] for buffer in RESPONSES]
+        )
+        self.assertEqual(memoryview(columns.uid).tolist(), [10, 11, 0])
+
+    def test_fixed_width(self):
+        columns = FetchColumns.from_responses(
+            [ResponseCodec.decode(buffer)[1] for buffer in RESPONSES]
+        )
+        self.assertEqual(columns.seq.itemsize, 4)
+        self.assertEqual(columns.uid.itemsize, 4)
+        self.assertEqual(columns.size.itemsize, 8)
+        self.assertEqual(columns.modseq.itemsize, 8)
+
+    def test_cached(self):
+        columns = FetchColumns.from_responses(
+            [ResponseCodec.decode(buffer)[1] for buffer in RESPONSES]
+        )
+        self.assertIs(columns.uid, columns.uid)
+        self.assertIs(columns.internal_date, columns.internal_date)
+
+
+class TestFragmentizerDecodeFetchColumns(unittest.TestCase):
+    def test_decode_fetch_columns(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(RESPONSES[0] + b"* 3 EXISTS\r\n")
+        fragmentizer.enqueue_bytes(b"".join(RESPONSES[1:]) + b"* 4 FETCH (UID")
+
+        columns, responses, failure = fragmentizer.decode_fetch_columns()
+        self.assertIsNone(failure)
+        assert_columns(self, columns)
+        self.assertEqual(
+            responses,
+            [
+                Response.from_dict(
+                    {"type": "Data", "content": {"type": "Exists", "content": 3}}
+                )
+            ],
+        )
+
+        fragmentizer.enqueue_bytes(b" 12)\r\n")
+        columns, responses, failure = fragmentizer.decode_fetch_columns()
+        self.assertIsNone(failure)
+        self.assertEqual(columns.seq, array("I", [4]))
+        self.assertEqual(columns.uid, array("I", [12]))
+        self.assertEqual(responses, [])
+
+    def test_decode_fetch_columns_current_message(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(b"".join(RESPONSES))
+        # Progress until the first message is complete, but do not decode it
+        while not fragmentizer.is_message_complete():
+            fragmentizer.progress()
+
+        columns, responses, failure = fragmentizer.decode_fetch_columns()
+        self.assertIsNone(failure)
+        assert_columns(self, columns)
+        self.assertEqual(responses, [])
+
+    def test_decode_fetch_columns_failure(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(
+            RESPONSES[0] + b"* 2 EXISTS\r\n" + b"* 2 FETCH (UID x)\r\n"
+        )
+        fragmentizer.enqueue_bytes(b"".join(RESPONSES[1:]))
+
+        columns, responses, failure = fragmentizer.decode_fetch_columns()
+        self.assertEqual(columns.seq, array("I", [1]))
+        self.assertEqual(len(responses), 1)
+        assert failure is not None
+        self.assertEqual(failure.status, DecodeStatus.Failed)
+        # The failing message stays the current message
+        self.assertEqual(fragmentizer.message_bytes(), b"* 2 FETCH (UID x)\r\n")
+
+        columns, responses, failure = fragmentizer.decode_fetch_columns()
+        self.assertIsNone(failure)
+        self.assertEqual(columns.seq, array("I", [2, 3]))
+        self.assertEqual(responses, [])
@@ -0,0 +1,78 @@
+import unittest
+
+from imap_codec import DecodeStatus, Fragmentizer, ResponseCodec
+
+FETCH = (
+    b"* 1 FETCH (UID 7 FLAGS (\\Seen) "
+    b'ENVELOPE ("date" "subject" NIL NIL NIL NIL NIL NIL NIL "<id>") '
+    b'BODYSTRUCTURE ("TEXT" "PLAIN" ("CHARSET" "US-ASCII") NIL NIL "7BIT" 3028 92))\r\n'
+)
+
+
+class TestFetchProjection(unittest.TestCase):
+    def test_decode(self):
+        remaining, response = ResponseCodec.decode(
+            FETCH + b"<remaining>", fields={"UID", "FLAGS"}
+        )
+        self.assertEqual(remaining, b"<remaining>")
+        self.assertEqual(
+            response, ResponseCodec.decode(b"* 1 FETCH (UID 7 FLAGS (\\Seen))\r\n")[1]
+        )
+
+    def test_decode_case_insensitive(self):
+        _, response = ResponseCodec.decode(FETCH, fields=["uid"])
+        self.assertEqual(response, ResponseCodec.decode(b"* 1 FETCH (UID 7)\r\n")[1])
+
+    def test_decode_body_section(self):
+        _, response = ResponseCodec.decode(
+            b"* 1 FETCH (UID 7 BODY[HEADER] {3}\r\nabc)\r\n", fields={"BODY[]"}
+        )
+        self.assertEqual(
+            response,
+            ResponseCodec.decode(b"* 1 FETCH (BODY[HEADER] {3}\r\nabc)\r\n")[1],
+        )
+
+    def test_decode_without_match(self):
+        # A FETCH response can not be empty, so it is skipped
+        remaining, response = ResponseCodec.decode(
+            FETCH + b"<remaining>", fields={"RFC822.SIZE"}
+        )
+        self.assertEqual(remaining, b"<remaining>")
+        self.assertIsNone(response)
+
+    def test_try_decode_without_match(self):
+        data = b"* 1 FETCH (FLAGS (\\Seen) RFC822.SIZE 10)\r\n"
+        result = ResponseCodec.try_decode(data, fields={"UID"})
+        self.assertEqual(result.status, DecodeStatus.Ok)
+        self.assertEqual(result.consumed, len(data))
+        self.assertIsNone(result.message)
+
+    def test_decode_other_response(self):
+        _, response = ResponseCodec.decode(b"* 3 EXISTS\r\n", fields={"UID"})
+        self.assertEqual(response, ResponseCodec.decode(b"* 3 EXISTS\r\n")[1])
+
+    def test_decode_unknown_field(self):
+        with self.assertRaises(ValueError):
+            ResponseCodec.decode(FETCH, fields={"UID", "SUBJECT"})
+
+    def test_fragmentizer(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(FETCH)
+        while not fragmentizer.is_message_complete():
+            fragmentizer.progress()
+        self.assertEqual(
+            fragmentizer.decode_response(fields={"FLAGS"}),
+            ResponseCodec.decode(b"* 1 FETCH (FLAGS (\\Seen))\r\n")[1],
+        )
+
+    def test_fragmentizer_without_match(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(b"* 1 FETCH (UID 7)\r\n* 3 EXISTS\r\n")
+        while not fragmentizer.is_message_complete():
+            fragmentizer.progress()
+        self.assertIsNone(fragmentizer.decode_response(fields={"FLAGS"}))
+        fragmentizer.progress()
+        self.assertEqual(
+            fragmentizer.decode_response(fields={"FLAGS"}),
+            ResponseCodec.decode(b"* 3 EXISTS\r\n")[1],
+        )
@@ -192,6 +192,45 @@ class TestFragmentizer(unittest.TestCase):
         bytes = fragmentizer.message_bytes()
         self.assertEqual(bytes, b"A1 LOGIN {5}\r\nABCDE {5}\r\nFGHIJ\r\n")
 
+    def test_message_bytes_normalize_crlf(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(b"A1 LOGIN {5}\nAB\nCD {5}\r\nEF\r\nG\nA2 NOOP\n")
+
+        fragmentizer.progress()
+        self.assertEqual(
+            fragmentizer.message_bytes(normalize_crlf=True), b"A1 LOGIN {5}\r\n"
+        )
+
+        while not fragmentizer.is_message_complete():
+            fragmentizer.progress()
+        self.assertEqual(
+            fragmentizer.message_bytes(),
+            b"A1 LOGIN {5}\nAB\nCD {5}\r\nEF\r\nG\n",
+        )
+        # Literal data is not changed
+        self.assertEqual(
+            fragmentizer.message_bytes(normalize_crlf=True),
+            b"A1 LOGIN {5}\r\nAB\nCD {5}\r\nEF\r\nG\r\n",
+        )
+
+        fragmentizer.progress()
+        self.assertEqual(
+            fragmentizer.message_bytes(normalize_crlf=True), b"A2 NOOP\r\n"
+        )
+
+    def test_fragment_bytes_normalize_crlf(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(b"A1 LOGIN {3}\na\nb {3}\r\nc\nd\r\n")
+
+        infos = []
+        while not fragmentizer.is_message_complete():
+            infos.append(fragmentizer.progress())
+        self.assertEqual(infos[0].ending, LineEnding.Lf)
+        self.assertEqual(
+            [fragmentizer.fragment_bytes(info, normalize_crlf=True) for info in infos],
+            [b"A1 LOGIN {3}\r\n", b"a\nb", b" {3}\r\n", b"c\nd", b"\r\n"],
+        )
+
     def test_is_max_message_size_exceeded(self):
         fragmentizer = Fragmentizer(max_message_size=20)
         self.assertFalse(fragmentizer.is_max_message_size_exceeded())
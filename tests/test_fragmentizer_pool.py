@@ -0,0 +1,132 @@
+import unittest
+
+from imap_codec import (
+    Command,
+    CommandCodec,
+    DecodeStatus,
+    FragmentizerPool,
+    IdleDone,
+    IdleDoneCodec,
+    Response,
+    ResponseCodec,
+)
+
+
+class TestFragmentizerPool(unittest.TestCase):
+    def test_feed_commands(self):
+        pool = FragmentizerPool(max_message_size=None)
+        results = pool.feed_commands(
+            [
+                (3, b"A1 NOOP\r\nA2 LOG"),
+                (4, b"B1 SELECT INBOX\r\n"),
+                (3, b"IN {5}\r\nalice {6}\r\nsecret\r\n"),
+            ]
+        )
+
+        self.assertEqual([connection for connection, _ in results], [3, 4, 3])
+        self.assertTrue(all(result for _, result in results))
+        self.assertEqual(
+            [result.message for _, result in results],
+            [
+                CommandCodec.decode(b"A1 NOOP\r\n")[1],
+                CommandCodec.decode(b"B1 SELECT INBOX\r\n")[1],
+                CommandCodec.decode(b"A2 LOGIN {5}\r\nalice {6}\r\nsecret\r\n")[1],
+            ],
+        )
+        self.assertEqual(len(pool), 2)
+
+    def test_feed_incomplete(self):
+        pool = FragmentizerPool(max_message_size=None)
+        self.assertEqual(pool.feed_commands([(1, b"A1 NO")]), [])
+        self.assertIn(1, pool)
+
+        [(connection, result)] = pool.feed_commands([(1, b"OP\r\n")])
+        self.assertEqual(connection, 1)
+        self.assertEqual(result.consumed, 9)
+        self.assertIsInstance(result.message, Command)
+
+    def test_feed_responses(self):
+        pool = FragmentizerPool(max_message_size=None)
+        results = pool.feed_responses(
+            [(7, b"* 1 FETCH (UID 10 FLAGS (\\Seen))\r\n* 2 EXISTS\r\n")],
+            fields={"UID"},
+        )
+
+        self.assertEqual(len(results), 2)
+        self.assertIsInstance(results[0][1].message, Response)
+        self.assertEqual(
+            results[0][1].message,
+            ResponseCodec.decode(b"* 1 FETCH (UID 10)\r\n")[1],
+        )
+
+        with self.assertRaises(ValueError):
+            pool.feed_responses([], fields={"UID"}, keep_raw=True)
+
+    def test_feed_errors_are_isolated(self):
+        pool = FragmentizerPool(max_message_size=None)
+        results = pool.feed_commands([(1, b"A1 FOO\r\n"), (2, b"A1 NOOP\r\n")])
+
+        self.assertEqual(results[0][0], 1)
+        self.assertEqual(results[0][1].status, DecodeStatus.Failed)
+        self.assertEqual(results[1][0], 2)
+        self.assertEqual(results[1][1].status, DecodeStatus.Ok)
+
+    def test_feed_max_message_size(self):
+        pool = FragmentizerPool(max_message_size=20)
+        [(_, result)] = pool.feed_commands(
+            [(1, b"A1 LOGIN {5}\r\nABCDE {5}\r\nFGHIJ\r\n")]
+        )
+        self.assertEqual(result.status, DecodeStatus.MessageTooLong)
+        self.assertEqual(result.details, {"initial": b"A1 LOGIN {5}\r\nABCDE "})
+
+    def test_keep_raw(self):
+        pool = FragmentizerPool(max_message_size=None)
+        [(_, result)] = pool.feed_commands([(1, b"A1 NOOP\r\n")], keep_raw=True)
+        self.assertEqual(result.message.raw, b"A1 NOOP\r\n")
+
+    def test_remove(self):
+        pool = FragmentizerPool(max_message_size=None)
+        pool.feed_commands([(1, b"A1 NO")])
+
+        self.assertTrue(pool.remove(1))
+        self.assertFalse(pool.remove(1))
+        self.assertNotIn(1, pool)
+        self.assertEqual(len(pool), 0)
+
+        # State was dropped, the connection starts with a new message
+        [(_, result)] = pool.feed_commands([(1, b"A2 NOOP\r\n")])
+        self.assertEqual(result.message, CommandCodec.decode(b"A2 NOOP\r\n")[1])
+
+    def test_invalid_batch(self):
+        pool = FragmentizerPool(max_message_size=None)
+        with self.assertRaises(TypeError):
+            pool.feed_commands([(1, "A1 NOOP\r\n")])
+        with self.assertRaises(OverflowError):
+            pool.feed_commands([(-1, b"A1 NOOP\r\n")])
+
+    def test_invalid_item_in_batch(self):
+        pool = FragmentizerPool(max_message_size=None)
+        with self.assertRaises(TypeError):
+            pool.feed_commands([(1, b"A1 NO"), (2, "A1 NOOP\r\n"), (3, b"A1 NOOP\r\n")])
+
+        # No bytes of the batch were enqueued
+        self.assertEqual(len(pool), 0)
+        [(_, result)] = pool.feed_commands([(1, b"A1 NOOP\r\n")])
+        self.assertEqual(result.message, CommandCodec.decode(b"A1 NOOP\r\n")[1])
+
+    def test_failure_in_batch(self):
+        pool = FragmentizerPool(max_message_size=None)
+        results = pool.feed_commands(
+            [(1, b"A1 IDLE\r\n"), (1, b"DONE\r\n"), (2, b"A1 NOOP\r\n")]
+        )
+
+        self.assertEqual(
+            [(connection, result.status) for connection, result in results],
+            [(1, DecodeStatus.Ok), (1, DecodeStatus.Failed), (2, DecodeStatus.Ok)],
+        )
+        self.assertIsNone(results[0][1].raw)
+
+        # The bytes of the failed message are retained for another codec
+        failed = results[1][1]
+        self.assertEqual(failed.raw, b"DONE\r\n")
+        self.assertEqual(IdleDoneCodec.decode(failed.raw), (b"", IdleDone()))
@@ -0,0 +1,173 @@
+import unittest
+
+from imap_codec import (
+    Command,
+    Fragmentizer,
+    FragmentizerMessagePoisonedError,
+    FragmentizerMessageTooLongError,
+    LiteralFragmentInfo,
+)
+
+
+def progress_all(fragmentizer: Fragmentizer, data: bytes) -> list:
+    """Enqueue `data` and return all detected fragments and completed messages"""
+    fragmentizer.enqueue_bytes(data)
+    progress: list = []
+    while True:
+        fragment_info = fragmentizer.progress()
+        if fragment_info is None:
+            return progress
+        progress.append(fragment_info)
+        if fragmentizer.is_message_complete():
+            progress.append(fragmentizer.message_bytes())
+
+
+class TestFragmentizerSnapshot(unittest.TestCase):
+    def test_snapshot_disabled(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        with self.assertRaises(ValueError):
+            fragmentizer.snapshot()
+
+    def test_snapshot_empty(self):
+        fragmentizer = Fragmentizer(max_message_size=None, snapshots=True)
+        restored = Fragmentizer.restore(fragmentizer.snapshot())
+        self.assertEqual(restored.progress(), None)
+        self.assertEqual(restored.snapshot(), fragmentizer.snapshot())
+
+    def test_snapshot_within_literal(self):
+        fragmentizer = Fragmentizer(max_message_size=None, snapshots=True)
+        fragmentizer.enqueue_bytes(b"A1 NOOP\r\nA2 LOGIN {5}\r\nAB")
+        while not fragmentizer.is_message_complete():
+            fragmentizer.progress()
+        self.assertEqual(fragmentizer.message_bytes(), b"A1 NOOP\r\n")
+        fragmentizer.progress()
+        self.assertEqual(fragmentizer.progress(), None)
+
+        restored = Fragmentizer.restore(fragmentizer.snapshot())
+        self.assertEqual(restored.message_bytes(), b"A2 LOGIN {5}\r\n")
+        self.assertFalse(restored.is_message_complete())
+
+        restored.enqueue_bytes(b"CDE {5}\r\nFGHIJ\r\n")
+        self.assertEqual(restored.progress(), LiteralFragmentInfo(start=14, end=19))
+        while not restored.is_message_complete():
+            restored.progress()
+        self.assertEqual(
+            restored.message_bytes(), b"A2 LOGIN {5}\r\nABCDE {5}\r\nFGHIJ\r\n"
+        )
+        self.assertIsInstance(restored.decode_command(), Command)
+
+    def test_snapshot_normalize_crlf(self):
+        fragmentizer = Fragmentizer(max_message_size=None, snapshots=True)
+        fragmentizer.enqueue_bytes(b"A1 LOGIN {5}\nAB")
+        fragmentizer.progress()
+
+        restored = Fragmentizer.restore(fragmentizer.snapshot())
+        restored.enqueue_bytes(b"CDE {5}\nFGHIJ\n")
+        while not restored.is_message_complete():
+            restored.progress()
+        self.assertEqual(
+            restored.message_bytes(normalize_crlf=True),
+            b"A1 LOGIN {5}\r\nABCDE {5}\r\nFGHIJ\r\n",
+        )
+
+    def test_snapshot_unprocessed_bytes(self):
+        fragmentizer = Fragmentizer(max_message_size=None, snapshots=True)
+        fragmentizer.enqueue_bytes(b"A1 NOOP\r\nA2 NOOP\r\nA3 NOOP\r\n")
+        fragmentizer.progress()
+
+        restored = Fragmentizer.restore(fragmentizer.snapshot())
+        self.assertEqual(restored.message_bytes(), b"A1 NOOP\r\n")
+        self.assertTrue(restored.is_message_complete())
+
+        messages = []
+        while restored.progress() is not None:
+            messages.append(restored.message_bytes())
+        self.assertEqual(messages, [b"A2 NOOP\r\n", b"A3 NOOP\r\n"])
+
+    def test_snapshot_after_skip_message(self):
+        fragmentizer = Fragmentizer(max_message_size=None, snapshots=True)
+        fragmentizer.enqueue_bytes(b"A1 LOGIN {5}\r\nA2 NOOP\r\n")
+        fragmentizer.progress()
+        fragmentizer.skip_message()
+
+        restored = Fragmentizer.restore(fragmentizer.snapshot())
+        self.assertEqual(restored.progress(), fragmentizer.progress())
+        self.assertEqual(restored.message_bytes(), fragmentizer.message_bytes())
+
+    def test_snapshot_poisoned(self):
+        fragmentizer = Fragmentizer(max_message_size=None, snapshots=True)
+        fragmentizer.enqueue_bytes(b"A1 NOOP\r\n")
+        fragmentizer.progress()
+        fragmentizer.poison_message()
+
+        restored = Fragmentizer.restore(fragmentizer.snapshot())
+        self.assertTrue(restored.is_message_poisoned())
+        with self.assertRaises(FragmentizerMessagePoisonedError):
+            restored.decode_command()
+
+    def test_snapshot_max_message_size_exceeded(self):
+        fragmentizer = Fragmentizer(max_message_size=20, snapshots=True)
+        fragmentizer.enqueue_bytes(b"A1 LOGIN {5}\r\nABCDE {5}\r\nFGHIJ\r\n")
+        while not fragmentizer.is_message_complete():
+            fragmentizer.progress()
+
+        restored = Fragmentizer.restore(fragmentizer.snapshot())
+        self.assertTrue(restored.is_max_message_size_exceeded())
+        self.assertEqual(restored.message_bytes(), b"A1 LOGIN {5}\r\nABCDE ")
+        with self.assertRaises(FragmentizerMessageTooLongError):
+            restored.decode_command()
+
+    def test_snapshot_bounded_when_max_message_size_exceeded(self):
+        fragmentizer = Fragmentizer(max_message_size=64, snapshots=True)
+        fragmentizer.enqueue_bytes(b"A1 LOGIN ")
+        for _ in range(1000):
+            fragmentizer.enqueue_bytes(b"x" * 1000)
+            self.assertIsNone(fragmentizer.progress())
+            self.assertLess(len(fragmentizer.snapshot()), 256)
+
+        restored = Fragmentizer.restore(fragmentizer.snapshot())
+        self.assertTrue(restored.is_max_message_size_exceeded())
+        self.assertEqual(restored.message_bytes(), fragmentizer.message_bytes())
+        self.assertEqual(restored.snapshot(), fragmentizer.snapshot())
+
+        remaining = b"\r\nA2 NOOP\r\n"
+        self.assertEqual(
+            progress_all(restored, remaining), progress_all(fragmentizer, remaining)
+        )
+        self.assertEqual(restored.message_bytes(), b"A2 NOOP\r\n")
+
+    def test_snapshot_bounded_within_literal(self):
+        fragmentizer = Fragmentizer(max_message_size=64, snapshots=True)
+        fragmentizer.enqueue_bytes(b"A1 LOGIN {100000}\r\n")
+        fragmentizer.progress()
+        for _ in range(50):
+            fragmentizer.enqueue_bytes(b"x" * 1000)
+            self.assertIsNone(fragmentizer.progress())
+            self.assertLess(len(fragmentizer.snapshot()), 256)
+
+        restored = Fragmentizer.restore(fragmentizer.snapshot())
+        self.assertTrue(restored.is_max_message_size_exceeded())
+        self.assertEqual(restored.message_bytes(), fragmentizer.message_bytes())
+
+        # The literal must end at the same position, e.g., not within `A2 NOOP`
+        remaining = b"y" * 50000 + b" {5}\r\nxxxxx\r\nA2 NOOP\r\n"
+        self.assertEqual(
+            progress_all(restored, remaining), progress_all(fragmentizer, remaining)
+        )
+        self.assertEqual(restored.message_bytes(), b"A2 NOOP\r\n")
+
+    def test_restore_invalid(self):
+        fragmentizer = Fragmentizer(max_message_size=None, snapshots=True)
+        fragmentizer.enqueue_bytes(b"A1 NOOP\r\n")
+        fragmentizer.progress()
+        snapshot = fragmentizer.snapshot()
+
+        for invalid in [
+            b"",
+            b"IMCF",
+            b"XXXX" + snapshot[4:],
+            snapshot[:-1],
+            snapshot + b"\x00",
+        ]:
+            with self.assertRaises(ValueError):
+                Fragmentizer.restore(invalid)
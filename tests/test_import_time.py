@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+import imap_codec
+
+# Importing `imap_codec` may at most add this many times the startup time of the interpreter.
+# Comparing against the startup keeps the check independent of the machine's speed.
+MAX_RATIO = float(os.environ.get("IMAP_CODEC_IMPORT_MAX_RATIO", "4"))
+# Set by the QEMU jobs on CI, where loading the shared library is disproportionately slow
+EMULATED = os.environ.get("IMAP_CODEC_EMULATED") == "1"
+RUNS = 5
+
+
+def best_run_time(code: str) -> float:
+    """Measure the best wall-clock time (in seconds) of running `code` in a fresh interpreter"""
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(code: str) -> str:
+    """Run `code` in a fresh interpreter and return its output"""
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    ).stdout.strip()
+
+
+class TestImportTime(unittest.TestCase):
+    def test_import_time(self):
+        baseline = best_run_time("pass")
+        with_import = best_run_time("import imap_codec")
+        measured = (
+            f"startup {baseline * 1000:.1f} ms, "
+            f"import {(with_import - baseline) * 1000:.1f} ms"
+        )
+        print(f"imap_codec: {measured}", file=sys.stderr)
+        if EMULATED:
+            self.skipTest(f"timing is not meaningful under emulation ({measured})")
+        self.assertLess(with_import - baseline, baseline * MAX_RATIO)
+
+
+class TestLazyClasses(unittest.TestCase):
+    def test_not_registered_on_import(self):
+        output = run("import imap_codec; print('Greeting' in vars(imap_codec))")
+        self.assertEqual(output, "False")
+
+    def test_registered_on_access(self):
+        output = run(
+            "import imap_codec; greeting = imap_codec.Greeting; "
+            "print(vars(imap_codec)['Greeting'] is greeting)"
+        )
+        self.assertEqual(output, "True")
+
+    def test_from_import(self):
+        output = run(
+            "from imap_codec import GreetingCodec, Greeting; "
+            "_, greeting = GreetingCodec.decode(b'* OK hello\\r\\n'); "
+            "print(isinstance(greeting, Greeting))"
+        )
+        self.assertEqual(output, "True")
+
+    def test_type_of_instance_created_before_access(self):
+        output = run(
+            "import imap_codec; "
+            "_, greeting = imap_codec.GreetingCodec.decode(b'* OK hello\\r\\n'); "
+            "print(type(greeting) is imap_codec.Greeting)"
+        )
+        self.assertEqual(output, "True")
+
+    def test_star_import(self):
+        output = run("from imap_codec import *; print(Fragmentizer.__name__)")
+        self.assertEqual(output, "Fragmentizer")
+
+    def test_dir(self):
+        output = run("import imap_codec; print('ResponseCodec' in dir(imap_codec))")
+        self.assertEqual(output, "True")
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            imap_codec.NoSuchClass  # noqa: B018
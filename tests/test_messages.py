@@ -1,6 +1,16 @@
+import json
+import sys
 import unittest
 
-from imap_codec import AuthenticateData, Command, Greeting, IdleDone, Response
+from imap_codec import (
+    AuthenticateData,
+    Command,
+    CompactResponse,
+    Greeting,
+    IdleDone,
+    Response,
+    ResponseCodec,
+)
 
 
 class TestGreeting(unittest.TestCase):
@@ -64,6 +74,43 @@ class TestCommand(unittest.TestCase):
         dictionary = {"tag": "a", "body": {"type": "Noop"}}
         self.assertEqual(Command.from_dict(dictionary).as_dict(), dictionary)
 
+    def test_from_dicts(self):
+        dictionaries = [
+            {"tag": "a", "body": {"type": "Noop"}},
+            {"tag": "b", "body": {"type": "Logout"}},
+        ]
+        commands = Command.from_dicts(dictionaries)
+        self.assertEqual(commands, [Command.from_dict(d) for d in dictionaries])
+        self.assertEqual(Command.from_dicts(iter([])), [])
+
+        with self.assertRaises(RuntimeError) as cm:
+            Command.from_dicts([dictionaries[0], {"body": {"type": "Noop"}}])
+        self.assertEqual(str(cm.exception), "missing field `tag`")
+
+    def test_as_dicts(self):
+        dictionaries = [
+            {"tag": "a", "body": {"type": "Noop"}},
+            {"tag": "b", "body": {"type": "Logout"}},
+        ]
+        commands = Command.from_dicts(dictionaries)
+        self.assertEqual(Command.as_dicts(commands), dictionaries)
+        self.assertEqual(Command.as_dicts([]), [])
+
+        with self.assertRaises(TypeError):
+            Command.as_dicts([commands[0], dictionaries[1]])
+
+    def test_to_json_lines(self):
+        dictionaries = [
+            {"tag": "a", "body": {"type": "Noop"}},
+            {"tag": "b", "body": {"type": "Logout"}},
+        ]
+        json_lines = Command.to_json_lines(Command.from_dicts(dictionaries))
+        self.assertTrue(json_lines.endswith(b"\n"))
+        self.assertEqual(
+            [json.loads(line) for line in json_lines.splitlines()], dictionaries
+        )
+        self.assertEqual(Command.to_json_lines([]), b"")
+
     def test_repr(self):
         self.assertEqual(
             repr(Command.from_dict({"tag": "a", "body": {"type": "Noop"}})),
@@ -118,6 +165,35 @@ class TestResponse(unittest.TestCase):
         dictionary = {"type": "Data", "content": {"type": "Search", "content": [1]}}
         self.assertEqual(Response.from_dict(dictionary).as_dict(), dictionary)
 
+    def test_from_dicts(self):
+        dictionaries = [
+            {"type": "Data", "content": {"type": "Search", "content": [1]}},
+            {"type": "Data", "content": {"type": "Exists", "content": 3}},
+        ]
+        responses = Response.from_dicts(dictionaries)
+        self.assertEqual(responses, [Response.from_dict(d) for d in dictionaries])
+
+    def test_as_dicts(self):
+        dictionaries = [
+            {"type": "Data", "content": {"type": "Search", "content": [1]}},
+            {"type": "Data", "content": {"type": "Exists", "content": 3}},
+        ]
+        responses = Response.from_dicts(dictionaries)
+        self.assertEqual(Response.as_dicts(responses), dictionaries)
+
+    def test_to_json_lines(self):
+        responses = Response.from_dicts(
+            [
+                {"type": "Data", "content": {"type": "Search", "content": [1]}},
+                {"type": "Data", "content": {"type": "Exists", "content": 3}},
+            ]
+        )
+        json_lines = Response.to_json_lines(responses)
+        self.assertEqual(
+            [json.loads(line) for line in json_lines.splitlines()],
+            [response.as_dict() for response in responses],
+        )
+
     def test_repr(self):
         self.assertEqual(
             repr(
@@ -141,3 +217,91 @@ class TestIdleDone(unittest.TestCase):
             repr(IdleDone()),
             "IdleDone",
         )
+
+
+class TestSerialization(unittest.TestCase):
+    SAMPLES = (
+        (Greeting, {"code": {"type": "Alert"}, "kind": "Ok", "text": "Hello, World!"}),
+        (Command, {"tag": "a", "body": {"type": "Noop"}}),
+        (AuthenticateData, {"type": "Continue", "content": list(b"Test")}),
+        (Response, {"type": "Data", "content": {"type": "Search", "content": [1]}}),
+    )
+
+    def test_to_json(self):
+        for cls, dictionary in self.SAMPLES:
+            with self.subTest(cls=cls.__name__):
+                message = cls.from_dict(dictionary)
+                self.assertEqual(json.loads(message.to_json()), message.as_dict())
+
+    def test_from_json(self):
+        for cls, dictionary in self.SAMPLES:
+            with self.subTest(cls=cls.__name__):
+                message = cls.from_dict(dictionary)
+                self.assertEqual(cls.from_json(message.to_json()), message)
+                self.assertEqual(
+                    cls.from_json(json.dumps(dictionary).encode()), message
+                )
+
+                with self.assertRaises(ValueError):
+                    cls.from_json(b"{")
+                with self.assertRaises(ValueError):
+                    cls.from_json(b"{}")
+
+    def test_msgpack(self):
+        for cls, dictionary in self.SAMPLES:
+            with self.subTest(cls=cls.__name__):
+                message = cls.from_dict(dictionary)
+                msgpack = message.to_msgpack()
+                self.assertIsInstance(msgpack, bytes)
+                self.assertEqual(cls.from_msgpack(msgpack), message)
+
+                with self.assertRaises(ValueError):
+                    cls.from_msgpack(b"\xc1")
+
+
+class TestMemory(unittest.TestCase):
+    FETCH = (
+        b'* 1 FETCH (UID 10 FLAGS (\\Seen) ENVELOPE ("Mon, 7 Feb 1994 21:52:25 -0800" '
+        b'"Hello" (("Alice" NIL "alice" "example.org")) NIL NIL NIL NIL NIL NIL '
+        b'"<1@example.org>"))\r\n'
+    )
+
+    def test_sizeof(self):
+        for cls, dictionary in TestSerialization.SAMPLES:
+            with self.subTest(cls=cls.__name__):
+                message = cls.from_dict(dictionary)
+                self.assertGreater(sys.getsizeof(message), object.__sizeof__(message))
+
+        small = Response.from_dict(
+            {"type": "Data", "content": {"type": "Search", "content": [1]}}
+        )
+        large = Response.from_dict(
+            {"type": "Data", "content": {"type": "Search", "content": [1] * 100}}
+        )
+        self.assertGreater(sys.getsizeof(large), sys.getsizeof(small))
+
+    def test_sizeof_raw(self):
+        _, response = ResponseCodec.decode(self.FETCH)
+        _, raw = ResponseCodec.decode(self.FETCH, keep_raw=True)
+        self.assertGreaterEqual(
+            sys.getsizeof(raw), sys.getsizeof(response) + len(self.FETCH)
+        )
+
+    def test_compact(self):
+        _, response = ResponseCodec.decode(self.FETCH)
+        compact = response.compact()
+        self.assertIsInstance(compact, CompactResponse)
+        self.assertEqual(compact.data, ResponseCodec.encode(response).dump())
+        self.assertEqual(len(compact), len(compact.data))
+        self.assertEqual(compact.expand(), response)
+        self.assertEqual(compact, response.compact())
+        self.assertEqual(repr(compact), f"CompactResponse({len(compact)} bytes)")
+        self.assertLess(sys.getsizeof(compact), sys.getsizeof(response))
+
+    def test_compact_raw(self):
+        _, response = ResponseCodec.decode(
+            b"* 1 FETCH (UID 10 FLAGS (\\Seen))\r\n", keep_raw=True
+        )
+        self.assertEqual(response.compact().data, response.raw)
+        self.assertEqual(response.compact().expand(), response)
+        self.assertIsNone(response.compact().expand().raw)
@@ -0,0 +1,87 @@
+import unittest
+
+from imap_codec import (
+    CommandCodec,
+    Fragmentizer,
+    GreetingCodec,
+    LineFragment,
+    LiteralFragment,
+    LiteralMode,
+    ResponseCodec,
+)
+
+
+class TestPassthrough(unittest.TestCase):
+    def test_raw_not_retained_by_default(self):
+        _, command = CommandCodec.decode(b"a select inbox\r\n")
+        self.assertIsNone(command.raw)
+        self.assertEqual(
+            CommandCodec.encode(command, passthrough=True).dump(),
+            b"a SELECT INBOX\r\n",
+        )
+
+    def test_command_passthrough(self):
+        remaining, command = CommandCodec.decode(
+            b"a select inbox\r\nb noop\r\n", keep_raw=True
+        )
+        self.assertEqual(remaining, b"b noop\r\n")
+        self.assertEqual(command.raw, b"a select inbox\r\n")
+        self.assertEqual(CommandCodec.encode(command).dump(), b"a SELECT INBOX\r\n")
+        self.assertEqual(
+            CommandCodec.encode(command, passthrough=True).dump(),
+            b"a select inbox\r\n",
+        )
+
+    def test_command_passthrough_fragments(self):
+        _, command = CommandCodec.decode(
+            b"A login {5+}\r\nalice {3}\r\npwd\r\n", keep_raw=True
+        )
+        self.assertEqual(
+            list(CommandCodec.encode(command, passthrough=True)),
+            [
+                LineFragment(b"A login {5+}\r\n"),
+                LiteralFragment(b"alice", LiteralMode.NonSync),
+                LineFragment(b" {3}\r\n"),
+                LiteralFragment(b"pwd", LiteralMode.Sync),
+                LineFragment(b"\r\n"),
+            ],
+        )
+
+    def test_equality_ignores_raw(self):
+        _, with_raw = CommandCodec.decode(b"a NOOP\r\n", keep_raw=True)
+        _, without_raw = CommandCodec.decode(b"a NOOP\r\n")
+        self.assertEqual(with_raw, without_raw)
+
+    def test_greeting_passthrough(self):
+        _, greeting = GreetingCodec.decode(b"* ok hello\r\n", keep_raw=True)
+        self.assertEqual(
+            GreetingCodec.encode(greeting, passthrough=True).dump(),
+            b"* ok hello\r\n",
+        )
+
+    def test_response_passthrough(self):
+        _, response = ResponseCodec.decode(b"* 1 fetch (uid 7)\r\n", keep_raw=True)
+        self.assertEqual(
+            ResponseCodec.encode(response, passthrough=True).dump(),
+            b"* 1 fetch (uid 7)\r\n",
+        )
+
+    def test_response_keep_raw_with_fields(self):
+        with self.assertRaises(ValueError):
+            ResponseCodec.decode(
+                b"* 1 FETCH (UID 7)\r\n", fields={"UID"}, keep_raw=True
+            )
+
+    def test_fragmentizer_passthrough(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(b"a select {5}\r\ninbox\r\n")
+        while not fragmentizer.is_message_complete():
+            fragmentizer.progress()
+
+        command = fragmentizer.decode_command(keep_raw=True)
+        self.assertEqual(command.raw, b"a select {5}\r\ninbox\r\n")
+        self.assertIsNone(fragmentizer.decode_command().raw)
+        self.assertEqual(
+            CommandCodec.encode(command, passthrough=True).dump(),
+            b"a select {5}\r\ninbox\r\n",
+        )
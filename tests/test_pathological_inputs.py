@@ -0,0 +1,259 @@
+"""
+Worst-case inputs of hostile peers, checked for linear time and bounded memory per byte.
+
+Every case generates an adversarial input of a given size and processes it like a server (or
+client) would. A case passes if
+
+* it results in the expected status,
+* the time per input byte stays below the budget of the case,
+* growing the input size eightfold does not grow the time per byte by much, and
+* the peak resident memory (including native allocations) grows by less than the memory budget of
+  the case per input byte.
+
+Budgets are generous to keep the suite stable on CI, they catch algorithmic regressions (e.g.
+quadratic rescanning), not small slowdowns. Use `benchmarks/replay.py` to track absolute
+throughput.
+
+Time budgets can be scaled via `IMAP_CODEC_PATHOLOGICAL_BUDGET_SCALE`, e.g. for debug builds. On
+emulated platforms (`IMAP_CODEC_EMULATED=1`, as set by the QEMU jobs on CI) they are scaled by
+`EMULATED_BUDGET_SCALE` by default, and the growth check is skipped, as emulation adds too much
+noise to wall-clock ratios.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+import unittest
+from typing import Callable, NamedTuple
+
+from imap_codec import (
+    CommandCodec,
+    DecodeResult,
+    DecodeStatus,
+    Fragmentizer,
+    ResponseCodec,
+)
+
+EMULATED = os.environ.get("IMAP_CODEC_EMULATED") == "1"
+EMULATED_BUDGET_SCALE = 20
+BUDGET_SCALE = float(
+    os.environ.get(
+        "IMAP_CODEC_PATHOLOGICAL_BUDGET_SCALE",
+        str(EMULATED_BUDGET_SCALE) if EMULATED else "1",
+    )
+)
+# Linear behavior keeps the time per byte when growing the input, quadratic behavior grows it by
+# the same factor as the input
+GROWTH = 8
+GROWTH_LIMIT = 3.0
+SIZE = 16 * 1024
+# Large enough for the growth of the peak RSS to dominate its page granularity
+MEMORY_SIZE = 1024 * 1024
+RUNS = 5
+
+
+class Case(NamedTuple):
+    generate: Callable[[int], bytes]
+    process: Callable[[bytes], DecodeResult | None]
+    # Status of the last decoded message, `None` if no message is complete
+    status: DecodeStatus | None
+    # Time budget in nanoseconds per input byte
+    budget_ns: float
+    # Upper bound of the growth of the peak RSS per input byte
+    memory_budget: float
+
+
+def fragmentize(
+    data: bytes,
+    chunk_size: int,
+    decode: Callable[[Fragmentizer], DecodeResult],
+    max_message_size: int | None = None,
+) -> DecodeResult | None:
+    """Feed `data` in chunks of `chunk_size` and decode every message, return the last result"""
+    fragmentizer = Fragmentizer(max_message_size=max_message_size)
+    result = None
+    for offset in range(0, len(data), chunk_size):
+        fragmentizer.enqueue_bytes(data[offset : offset + chunk_size])
+        while fragmentizer.progress() is not None:
+            if fragmentizer.is_message_complete():
+                result = decode(fragmentizer)
+    return result
+
+
+def nested_search(size: int) -> bytes:
+    depth = (size - 16) // 2
+    return b"A1 SEARCH " + b"(" * depth + b"ALL" + b")" * depth + b"\r\n"
+
+
+def nested_body_structure(size: int) -> bytes:
+    depth = size // 64
+    return (
+        b"* 1 FETCH (BODYSTRUCTURE "
+        + b"(" * depth
+        + b'"TEXT" "PLAIN" NIL NIL NIL "7BIT" 1 1'
+        + b') "MIXED"' * depth
+        + b")\r\n"
+    )
+
+
+def tiny_literals(size: int) -> bytes:
+    count = size // len(b" SUBJECT {1}\r\nx")
+    return b"A1 SEARCH" + b" SUBJECT {1}\r\nx" * count + b"\r\n"
+
+
+def long_line(size: int) -> bytes:
+    return b"A1 SEARCH" + b" ALL" * ((size - 11) // 4) + b"\r\n"
+
+
+def unterminated_line(size: int) -> bytes:
+    return b"A1 SEARCH" + b" ALL" * ((size - 9) // 4)
+
+
+def many_messages(size: int) -> bytes:
+    return b"A1 NOOP\r\n" * (size // 9)
+
+
+def many_flags(size: int) -> bytes:
+    count = size // 8
+    flags = b" ".join(b"$F%05d" % (index % 100000) for index in range(count))
+    return b"* FLAGS (" + flags + b")\r\n"
+
+
+def many_sequence_ranges(size: int) -> bytes:
+    count = size // 8
+    sequence_set = b",".join(b"%d:%d" % (index, index + 1) for index in range(1, count))
+    return b"A1 FETCH " + sequence_set + b" (UID)\r\n"
+
+
+CASES = {
+    # Nesting beyond the recursion limit of the parser is rejected
+    "nested_search": Case(
+        nested_search, CommandCodec.try_decode, DecodeStatus.Failed, 1000, 16
+    ),
+    "nested_body_structure": Case(
+        nested_body_structure, ResponseCodec.try_decode, DecodeStatus.Failed, 1000, 16
+    ),
+    "tiny_literals": Case(
+        tiny_literals,
+        lambda data: fragmentize(data, 4096, Fragmentizer.try_decode_command),
+        DecodeStatus.Ok,
+        1000,
+        64,
+    ),
+    # Just under `max_message_size`, fed in small chunks as read from a slow socket
+    "long_line": Case(
+        long_line,
+        lambda data: fragmentize(
+            data, 64, Fragmentizer.try_decode_command, max_message_size=len(data) + 1
+        ),
+        DecodeStatus.Ok,
+        1000,
+        64,
+    ),
+    # Exceeds `max_message_size` and is never terminated, so only the first 1024 bytes are kept
+    "unterminated_line": Case(
+        unterminated_line,
+        lambda data: fragmentize(
+            data, 64, Fragmentizer.try_decode_command, max_message_size=1024
+        ),
+        None,
+        500,
+        4,
+    ),
+    # Only one message is alive at a time
+    "many_messages": Case(
+        many_messages,
+        lambda data: fragmentize(data, 4096, Fragmentizer.try_decode_command),
+        DecodeStatus.Ok,
+        1000,
+        4,
+    ),
+    "many_flags": Case(many_flags, ResponseCodec.try_decode, DecodeStatus.Ok, 500, 64),
+    "many_sequence_ranges": Case(
+        many_sequence_ranges, CommandCodec.try_decode, DecodeStatus.Ok, 500, 64
+    ),
+}
+
+
+def measure(case: Case, data: bytes) -> float:
+    """Return the best time of `RUNS` runs in nanoseconds"""
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter_ns()
+        case.process(data)
+        best = min(best, time.perf_counter_ns() - start)
+    return best
+
+
+def peak_rss_growth(name: str, size: int) -> int:
+    """Process case `name` in a fresh interpreter and return the growth of the peak RSS in bytes
+
+    Unlike `tracemalloc`, the RSS includes native allocations, e.g. the vectors of the parser.
+    """
+    output = subprocess.run(
+        [sys.executable, __file__, name, str(size)],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return int(output)
+
+
+class TestPathologicalInputs(unittest.TestCase):
+    def test_status(self):
+        for name, case in CASES.items():
+            with self.subTest(case=name):
+                result = case.process(case.generate(SIZE))
+                self.assertEqual(None if result is None else result.status, case.status)
+
+    def test_time_per_byte(self):
+        for name, case in CASES.items():
+            with self.subTest(case=name):
+                data = case.generate(GROWTH * SIZE)
+                per_byte = measure(case, data) / len(data)
+                print(f"{name}: {per_byte:.1f} ns/byte", file=sys.stderr)
+                self.assertLess(per_byte, case.budget_ns * BUDGET_SCALE)
+
+    @unittest.skipIf(EMULATED, "wall-clock ratios are too noisy under emulation")
+    def test_time_growth(self):
+        for name, case in CASES.items():
+            with self.subTest(case=name):
+                small, large = case.generate(SIZE), case.generate(GROWTH * SIZE)
+                small_ns, large_ns = measure(case, small), measure(case, large)
+                growth = (large_ns / len(large)) / (small_ns / len(small))
+                print(f"{name}: growth {growth:.2f}", file=sys.stderr)
+                self.assertLess(growth, GROWTH_LIMIT)
+
+    @unittest.skipIf(sys.platform == "win32", "`getrusage` is not available")
+    def test_memory_per_byte(self):
+        for name, case in CASES.items():
+            with self.subTest(case=name):
+                per_byte = peak_rss_growth(name, MEMORY_SIZE) / MEMORY_SIZE
+                print(f"{name}: {per_byte:.1f} bytes/byte", file=sys.stderr)
+                self.assertLess(per_byte, case.memory_budget)
+
+    def test_max_message_size(self):
+        # Bytes exceeding `max_message_size` are not retained
+        data = unterminated_line(GROWTH * SIZE) + b"\r\n"
+        result = fragmentize(
+            data, 64, Fragmentizer.try_decode_command, max_message_size=1024
+        )
+        assert result is not None and result.details is not None
+        self.assertEqual(result.status, DecodeStatus.MessageTooLong)
+        self.assertLessEqual(len(result.details["initial"]), 1024)
+
+
+if __name__ == "__main__":
+    # Used by `peak_rss_growth`: process a single case and print the growth of the peak RSS
+    import resource
+
+    case = CASES[sys.argv[1]]
+    data = case.generate(int(sys.argv[2]))
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    case.process(data)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # `ru_maxrss` is in bytes on macOS, in kilobytes elsewhere
+    print((after - before) * (1 if sys.platform == "darwin" else 1024))
@@ -0,0 +1,97 @@
+import unittest
+
+from imap_codec import Fragmentizer, MessageKind
+
+
+def fragmentize(data: bytes) -> Fragmentizer:
+    fragmentizer = Fragmentizer(max_message_size=None)
+    fragmentizer.enqueue_bytes(data)
+    while not fragmentizer.is_message_complete():
+        if fragmentizer.progress() is None:
+            break
+    return fragmentizer
+
+
+class TestPeekCommand(unittest.TestCase):
+    def test_select(self):
+        peek = fragmentize(b"A1 select INBOX\r\n").peek_command()
+        self.assertEqual(peek.kind, MessageKind.Command)
+        self.assertEqual(peek.tag, "A1")
+        self.assertEqual(peek.name, "SELECT")
+        self.assertEqual(peek.mailbox, "INBOX")
+        self.assertEqual(peek.length, 17)
+
+    def test_quoted_mailbox(self):
+        peek = fragmentize(b'A1 STATUS "a \\"b\\"" (MESSAGES)\r\n').peek_command()
+        self.assertEqual(peek.name, "STATUS")
+        self.assertEqual(peek.mailbox, 'a "b"')
+
+    def test_literal_mailbox(self):
+        peek = fragmentize(b"A1 CREATE {3}\r\nfoo\r\n").peek_command()
+        self.assertEqual(peek.mailbox, "foo")
+        self.assertEqual(peek.length, 20)
+
+    def test_uid_copy(self):
+        peek = fragmentize(b"A1 UID COPY 1:* Archive\r\n").peek_command()
+        self.assertEqual(peek.name, "UID COPY")
+        self.assertEqual(peek.mailbox, "Archive")
+
+    def test_without_mailbox(self):
+        peek = fragmentize(b"A1 NOOP\r\n").peek_command()
+        self.assertEqual(peek.name, "NOOP")
+        self.assertIsNone(peek.mailbox)
+
+    def test_incomplete(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        self.assertIsNone(fragmentizer.peek_command())
+
+    def test_incomplete_length(self):
+        # The first line is complete, the literal is not
+        peek = fragmentize(b"A1 CREATE {3}\r\nfo").peek_command()
+        self.assertEqual(peek.name, "CREATE")
+        self.assertIsNone(peek.length)
+
+    def test_repr(self):
+        self.assertEqual(
+            repr(fragmentize(b"A1 SELECT INBOX\r\n").peek_command()),
+            'MessagePeek(kind=MessageKind.Command, tag="A1", name="SELECT", '
+            'mailbox="INBOX", length=17)',
+        )
+
+
+class TestPeekResponse(unittest.TestCase):
+    def test_tagged(self):
+        peek = fragmentize(b"A1 OK done\r\n").peek_response()
+        self.assertEqual(peek.kind, MessageKind.Tagged)
+        self.assertEqual(peek.tag, "A1")
+        self.assertEqual(peek.name, "OK")
+
+    def test_untagged_numeric(self):
+        peek = fragmentize(b"* 3 EXISTS\r\n").peek_response()
+        self.assertEqual(peek.kind, MessageKind.Untagged)
+        self.assertIsNone(peek.tag)
+        self.assertEqual(peek.name, "EXISTS")
+
+    def test_untagged_status(self):
+        peek = fragmentize(b"* STATUS INBOX (MESSAGES 3)\r\n").peek_response()
+        self.assertEqual(peek.name, "STATUS")
+        self.assertEqual(peek.mailbox, "INBOX")
+
+    def test_continuation(self):
+        peek = fragmentize(b"+ Ready\r\n").peek_response()
+        self.assertEqual(peek.kind, MessageKind.Continuation)
+        self.assertIsNone(peek.tag)
+        self.assertIsNone(peek.name)
+
+    def test_literal_length(self):
+        fragmentizer = fragmentize(b"* 1 FETCH (BODY[] {5}\r\nhello)\r\n")
+        peek = fragmentizer.peek_response()
+        self.assertEqual(peek.name, "FETCH")
+        self.assertEqual(peek.length, 31)
+
+    def test_incomplete_length(self):
+        fragmentizer = fragmentize(b"* 1 FETCH (BODY[] {5}\r\nhel")
+        self.assertFalse(fragmentizer.is_message_complete())
+        peek = fragmentizer.peek_response()
+        self.assertEqual(peek.name, "FETCH")
+        self.assertIsNone(peek.length)
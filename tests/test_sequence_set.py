@@ -0,0 +1,126 @@
+import unittest
+
+from imap_codec import Command, CommandCodec, SequenceSet, SequenceSetIterator
+
+
+class TestSequenceSet(unittest.TestCase):
+    def test_str(self):
+        self.assertEqual(str(SequenceSet("1:100,200:*")), "1:100,200:*")
+        self.assertEqual(str(SequenceSet("5")), "5")
+        self.assertEqual(str(SequenceSet("*")), "*")
+
+    def test_canonical(self):
+        self.assertEqual(str(SequenceSet("5,3,4,1:2")), "1:5")
+        self.assertEqual(str(SequenceSet("10:1,5:20")), "1:20")
+        self.assertEqual(str(SequenceSet("*:200,1:3")), "1:3,200:*")
+        self.assertEqual(SequenceSet("1,2,3"), SequenceSet("1:3"))
+
+    def test_repr(self):
+        self.assertEqual(repr(SequenceSet("1:3,7")), "SequenceSet('1:3,7')")
+
+    def test_invalid(self):
+        for sequence_set in ["", "0", "1:0", "a", "1,", "1:2:3", "+1", "4294967296"]:
+            with self.assertRaises(ValueError):
+                SequenceSet(sequence_set)
+
+    def test_from_ranges(self):
+        self.assertEqual(
+            SequenceSet.from_ranges([(1, 100), (200, None)]),
+            SequenceSet("1:100,200:*"),
+        )
+
+    def test_from_numbers(self):
+        self.assertEqual(
+            SequenceSet.from_numbers([7, 1, 2, 3, 5, 6, 9]),
+            SequenceSet("1:3,5:7,9"),
+        )
+        self.assertEqual(
+            str(SequenceSet.from_numbers(range(1, 1_000_001))), "1:1000000"
+        )
+
+    def test_ranges(self):
+        self.assertEqual(SequenceSet("200:*,1:100").ranges(), [(1, 100), (200, None)])
+
+    def test_contains(self):
+        sequence_set = SequenceSet("1:100,200:*")
+        self.assertIn(1, sequence_set)
+        self.assertIn(100, sequence_set)
+        self.assertNotIn(101, sequence_set)
+        self.assertIn(200, sequence_set)
+        self.assertIn(4294967295, sequence_set)
+
+    def test_len(self):
+        self.assertEqual(len(SequenceSet("1:100,200")), 101)
+        with self.assertRaises(ValueError):
+            len(SequenceSet("1:*"))
+
+    def test_iter(self):
+        self.assertEqual(list(SequenceSet("5,1:3")), [1, 2, 3, 5])
+        self.assertIsInstance(iter(SequenceSet("1")), SequenceSetIterator)
+        with self.assertRaises(ValueError):
+            iter(SequenceSet("1:*"))
+
+    def test_resolve(self):
+        self.assertEqual(
+            SequenceSet("1:3,200:*").resolve(250), SequenceSet("1:3,200:250")
+        )
+        self.assertEqual(SequenceSet("200:*").resolve(150), SequenceSet("150:200"))
+        self.assertEqual(SequenceSet("*").resolve(7), SequenceSet("7"))
+
+    def test_union(self):
+        left, right = SequenceSet("1:5,10"), SequenceSet("6:8,20:*")
+        self.assertEqual(left.union(right), SequenceSet("1:8,10,20:*"))
+        self.assertEqual(left | right, SequenceSet("1:8,10,20:*"))
+
+    def test_intersection(self):
+        left, right = SequenceSet("1:10,20:30"), SequenceSet("5:25,40:*")
+        self.assertEqual(left.intersection(right), SequenceSet("5:10,20:25"))
+        self.assertEqual(left & right, SequenceSet("5:10,20:25"))
+        self.assertFalse(SequenceSet("1:3") & SequenceSet("5:7"))
+
+    def test_hash(self):
+        self.assertEqual(hash(SequenceSet("1:3")), hash(SequenceSet("1,2,3")))
+
+
+class TestCommandSequenceSet(unittest.TestCase):
+    def test_decoded_command(self):
+        _, command = CommandCodec.decode(b"A FETCH 1:100,200:* (FLAGS)\r\n")
+        self.assertEqual(command.sequence_set, SequenceSet("1:100,200:*"))
+
+    def test_decoded_uid_command(self):
+        _, command = CommandCodec.decode(b"A UID STORE 3,1:2 +FLAGS (\\Seen)\r\n")
+        self.assertEqual(command.sequence_set, SequenceSet("1:3"))
+
+    def test_uid_expunge(self):
+        _, command = CommandCodec.decode(b"A UID EXPUNGE 1:3,5\r\n")
+        self.assertEqual(command.sequence_set, SequenceSet("1:3,5"))
+
+    def test_no_sequence_set(self):
+        command = Command.from_dict({"tag": "a", "body": {"type": "Noop"}})
+        self.assertIsNone(command.sequence_set)
+
+        # Sequence sets of search keys are not taken into account
+        _, command = CommandCodec.decode(b"A SEARCH 1:3\r\n")
+        self.assertIsNone(command.sequence_set)
+
+    def test_from_dict(self):
+        _, command = CommandCodec.decode(b"A FETCH 1 (FLAGS)\r\n")
+        dictionary = command.as_dict()
+        dictionary["body"]["content"]["sequence_set"] = SequenceSet("1:100,200:*")
+        command = Command.from_dict(dictionary)
+        self.assertEqual(
+            CommandCodec.encode(command).dump(), b"A FETCH 1:100,200:* (FLAGS)\r\n"
+        )
+
+    def test_from_dict_nested_in_list(self):
+        _, command = CommandCodec.decode(b"A SEARCH 1 2\r\n")
+        dictionary = command.as_dict()
+        content = dictionary["body"]["content"]
+        content["criteria"][1]["content"] = SequenceSet("5:7")
+        command = Command.from_dict(dictionary)
+        self.assertEqual(CommandCodec.encode(command).dump(), b"A SEARCH 1 5:7\r\n")
+
+    def test_from_dict_invalid(self):
+        # Errors of dictionaries without `SequenceSet` objects are raised unchanged
+        with self.assertRaises(RuntimeError):
+            Command.from_dict({"tag": "a", "body": {"type": "Invalid"}})
@@ -0,0 +1,46 @@
+import importlib
+import os
+import sys
+import textwrap
+import unittest
+from typing import Any
+
+# The low-level module was renamed in Python 3.13, neither is known to type checkers
+try:
+    interpreters: Any = importlib.import_module("_interpreters")
+except ImportError:
+    try:
+        interpreters = importlib.import_module("_xxsubinterpreters")
+    except ImportError:
+        interpreters = None
+
+
+@unittest.skipIf(interpreters is None, "requires subinterpreter support")
+class TestSubinterpreters(unittest.TestCase):
+    def run_in_subinterpreter(self, script: str) -> str:
+        read, write = os.pipe()
+        interpreter = interpreters.create()
+        try:
+            interpreters.run_string(
+                interpreter,
+                textwrap.dedent(f"""
+                    import os, sys
+                    sys.path[:] = {sys.path!r}
+                    try:
+                        {script}
+                    except BaseException as error:
+                        result = type(error).__name__
+                    else:
+                        result = "ok"
+                    os.write({write}, result.encode())
+                    """),
+            )
+        finally:
+            interpreters.destroy(interpreter)
+            os.close(write)
+        with os.fdopen(read, "rb") as pipe:
+            return pipe.read().decode()
+
+    def test_import_fails_cleanly(self):
+        # The module does not support subinterpreters (see README), importing it must not crash
+        self.assertEqual(self.run_in_subinterpreter("import imap_codec"), "ImportError")
@@ -0,0 +1,96 @@
+import unittest
+
+from imap_codec import (
+    Command,
+    CommandCodec,
+    Fragmentizer,
+    ResponseCodec,
+    TagTracker,
+)
+
+
+def _noop(tag: str) -> Command:
+    return Command.from_dict({"tag": tag, "body": {"type": "Noop"}})
+
+
+class TestTagTracker(unittest.TestCase):
+    def test_issue(self):
+        tracker = TagTracker()
+        self.assertEqual(tracker.prefix, "A")
+        self.assertEqual(tracker.issue("first"), "A1")
+        self.assertEqual(tracker.issue("second"), "A2")
+        self.assertEqual(len(tracker), 2)
+        self.assertIn("A1", tracker)
+        self.assertNotIn("A3", tracker)
+
+        self.assertEqual(TagTracker("imap.").issue(None), "imap.1")
+
+    def test_invalid_prefix(self):
+        for prefix in ["A B", "A+", "{", "\r\n"]:
+            with self.subTest(prefix=prefix), self.assertRaises(ValueError):
+                TagTracker(prefix)
+
+    def test_resolve(self):
+        tracker = TagTracker()
+        handles = [object(), object()]
+        tags = [tracker.issue(handle) for handle in handles]
+
+        _, response = ResponseCodec.decode(f"{tags[1]} OK done\r\n".encode())
+        self.assertIs(tracker.resolve(response), handles[1])
+        self.assertEqual(len(tracker), 1)
+
+        with self.assertRaises(KeyError):
+            tracker.resolve(response)
+
+        for untagged in [b"* 1 EXISTS\r\n", b"+ go ahead\r\n", b"* BYE\r\n"]:
+            with self.subTest(response=untagged):
+                _, response = ResponseCodec.decode(untagged)
+                self.assertIsNone(tracker.resolve(response))
+        self.assertEqual(len(tracker), 1)
+
+    def test_resolve_tag(self):
+        tracker = TagTracker()
+        tag = tracker.issue("handle")
+
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(f"{tag} NO failed\r\n".encode())
+        fragmentizer.progress()
+        peek = fragmentizer.peek_response()
+        assert peek is not None and peek.tag is not None
+
+        self.assertEqual(tracker.resolve_tag(peek.tag), "handle")
+        with self.assertRaises(KeyError):
+            tracker.resolve_tag(peek.tag)
+
+    def test_register(self):
+        tracker = TagTracker()
+        tracker.register(_noop("A2"), "registered")
+        with self.assertRaises(ValueError):
+            tracker.register(_noop("A2"), "duplicate")
+
+        # Registered tags are not issued again
+        self.assertEqual(tracker.issue("issued"), "A1")
+        self.assertEqual(tracker.issue("issued"), "A3")
+
+        _, response = ResponseCodec.decode(b"A2 OK done\r\n")
+        self.assertEqual(tracker.resolve(response), "registered")
+
+    def test_pipelining(self):
+        tracker = TagTracker()
+        client = b"".join(
+            CommandCodec.encode(_noop(tracker.issue(index))).dump()
+            for index in range(100)
+        )
+        self.assertEqual(client.count(b"NOOP"), 100)
+
+        server = b"".join(
+            b"A%d OK NOOP completed\r\n" % tag for tag in range(100, 0, -1)
+        )
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(server)
+        resolved = []
+        while fragmentizer.progress() is not None:
+            if fragmentizer.is_message_complete():
+                resolved.append(tracker.resolve(fragmentizer.decode_response()))
+        self.assertEqual(resolved, list(range(99, -1, -1)))
+        self.assertEqual(len(tracker), 0)
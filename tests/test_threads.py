@@ -0,0 +1,95 @@
+import os
+import sys
+import sysconfig
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from imap_codec import FetchColumns, Fragmentizer, ResponseCodec
+
+THREADS = 8
+MESSAGES = 2000
+
+
+def free_threaded() -> bool:
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def gil_disabled_build() -> bool:
+    return bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+
+
+def stream(offset: int) -> bytes:
+    return b"".join(
+        b"* %d FETCH (UID %d FLAGS (\\Seen) RFC822.SIZE %d)\r\n"
+        % (n, offset + n, n * 10)
+        for n in range(1, MESSAGES + 1)
+    )
+
+
+def decode_stream(offset: int) -> int:
+    # One fragmentizer per thread, like one per connection
+    fragmentizer = Fragmentizer(max_message_size=None)
+    fragmentizer.enqueue_bytes(stream(offset))
+    responses = []
+    while fragmentizer.progress() is not None:
+        if fragmentizer.is_message_complete():
+            responses.append(fragmentizer.decode_response())
+    return sum(FetchColumns.from_responses(responses).uid)
+
+
+def expected_uids(offset: int) -> int:
+    return sum(offset + n for n in range(1, MESSAGES + 1))
+
+
+class TestThreads(unittest.TestCase):
+    def test_gil_stays_disabled(self):
+        if not hasattr(sys, "_is_gil_enabled"):
+            self.skipTest("requires Python 3.13+")
+        if not gil_disabled_build() or os.environ.get("PYTHON_GIL") == "1":
+            self.skipTest("requires a free-threaded Python build")
+        # Importing an extension module without `gil_used = false` re-enables the GIL
+        self.assertFalse(sys._is_gil_enabled())
+
+    def test_fragmentizer_per_thread(self):
+        offsets = [n * 1_000_000 for n in range(THREADS)]
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            results = list(executor.map(decode_stream, offsets))
+        self.assertEqual(results, [expected_uids(offset) for offset in offsets])
+
+    def test_shared_codec(self):
+        codec = ResponseCodec()
+        data = b"* 3 EXISTS\r\n"
+        _, response = codec.decode(data)
+
+        def encode(_):
+            buffer = bytearray()
+            for _ in range(MESSAGES):
+                codec.encode_into(response, buffer)
+            return bytes(buffer)
+
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            results = list(executor.map(encode, range(THREADS)))
+        self.assertEqual(results, [data * MESSAGES] * THREADS)
+
+    def test_scaling(self):
+        if not free_threaded():
+            self.skipTest("requires a free-threaded Python build")
+        if (os.cpu_count() or 1) < 4:
+            self.skipTest("requires at least 4 CPUs")
+
+        offsets = [n * 1_000_000 for n in range(4)]
+
+        start = time.perf_counter()
+        for offset in offsets:
+            decode_stream(offset)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(offsets)) as executor:
+            list(executor.map(decode_stream, offsets))
+        parallel = time.perf_counter() - start
+
+        # Generous bound, perfect scaling would be a quarter
+        self.assertLess(parallel, sequential * 0.75)
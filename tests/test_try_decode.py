@@ -0,0 +1,114 @@
+import unittest
+
+from imap_codec import (
+    AuthenticateDataCodec,
+    CommandCodec,
+    DecodeResult,
+    DecodeStatus,
+    Fragmentizer,
+    GreetingCodec,
+    IdleDone,
+    IdleDoneCodec,
+    ResponseCodec,
+)
+
+
+class TestTryDecode(unittest.TestCase):
+    def test_ok(self):
+        buffer = b"a NOOP\r\n<remaining>"
+        result = CommandCodec.try_decode(buffer)
+        self.assertIsInstance(result, DecodeResult)
+        self.assertTrue(result)
+        self.assertEqual(result.status, DecodeStatus.Ok)
+        self.assertEqual(result.consumed, 8)
+        self.assertEqual(buffer[result.consumed :], b"<remaining>")
+        self.assertEqual(result.message, CommandCodec.decode(buffer)[1])
+        self.assertIsNone(result.details)
+        self.assertEqual(repr(result), "DecodeResult(DecodeStatus.Ok, consumed=8)")
+
+    def test_incomplete(self):
+        for codec, buffer in [
+            (GreetingCodec, b"* OK"),
+            (CommandCodec, b"a NOOP"),
+            (AuthenticateDataCodec, b"VGVzdA=="),
+            (ResponseCodec, b"* 3 EXISTS"),
+            (IdleDoneCodec, b"DONE"),
+        ]:
+            with self.subTest(codec=codec):
+                result = codec.try_decode(buffer)
+                self.assertFalse(result)
+                self.assertEqual(result.status, DecodeStatus.Incomplete)
+                self.assertEqual(result.consumed, 0)
+                self.assertIsNone(result.message)
+                self.assertIsNone(result.details)
+
+    def test_failed(self):
+        result = CommandCodec.try_decode(b"* NOOP\r\n")
+        self.assertEqual(result.status, DecodeStatus.Failed)
+        self.assertIsNone(result.message)
+
+    def test_command_literal_found(self):
+        result = CommandCodec.try_decode(b"a SELECT {5}\r\n")
+        self.assertEqual(result.status, DecodeStatus.LiteralFound)
+        self.assertEqual(result.details, {"tag": "a", "length": 5, "mode": "Sync"})
+
+    def test_response_literal_found(self):
+        result = ResponseCodec.try_decode(b"* 1 FETCH (BODY[] {5}\r\n")
+        self.assertEqual(result.status, DecodeStatus.LiteralFound)
+        self.assertEqual(result.details, {"length": 5})
+
+    def test_response_fields(self):
+        result = ResponseCodec.try_decode(
+            b"* 1 FETCH (UID 7 RFC822.SIZE 10)\r\n", fields={"UID"}
+        )
+        self.assertEqual(
+            result.message, ResponseCodec.decode(b"* 1 FETCH (UID 7)\r\n")[1]
+        )
+
+    def test_keep_raw(self):
+        result = GreetingCodec.try_decode(b"* ok hello\r\n", keep_raw=True)
+        self.assertEqual(result.message.raw, b"* ok hello\r\n")
+
+    def test_idle_done(self):
+        result = IdleDoneCodec.try_decode(b"DONE\r\n")
+        self.assertEqual(result.message, IdleDone())
+
+
+class TestFragmentizerTryDecode(unittest.TestCase):
+    def test_ok(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(b"a NOOP\r\n")
+        fragmentizer.progress()
+        result = fragmentizer.try_decode_command()
+        self.assertEqual(result.status, DecodeStatus.Ok)
+        self.assertEqual(result.consumed, 8)
+        self.assertEqual(result.message, fragmentizer.decode_command())
+
+    def test_failed(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(b"* NOOP\r\n")
+        fragmentizer.progress()
+        self.assertEqual(fragmentizer.try_decode_command().status, DecodeStatus.Failed)
+
+    def test_message_too_long(self):
+        fragmentizer = Fragmentizer(max_message_size=20)
+        fragmentizer.enqueue_bytes(b"A1 LOGIN {5}\r\nABCDE {5}\r\nFGHIJ\r\n")
+        for _ in range(3):
+            fragmentizer.progress()
+        result = fragmentizer.try_decode_command()
+        self.assertEqual(result.status, DecodeStatus.MessageTooLong)
+        self.assertEqual(result.details, {"initial": b"A1 LOGIN {5}\r\nABCDE "})
+
+    def test_message_poisoned(self):
+        fragmentizer = Fragmentizer(max_message_size=None)
+        fragmentizer.enqueue_bytes(b"A1 LOGIN {5}\r\nABCDE {5}\r\nFGHIJ\r\n")
+        fragmentizer.progress()
+        fragmentizer.poison_message()
+        for _ in range(4):
+            fragmentizer.progress()
+        result = fragmentizer.try_decode_command()
+        self.assertEqual(result.status, DecodeStatus.MessagePoisoned)
+        self.assertEqual(
+            result.details,
+            {"discarded": b"A1 LOGIN {5}\r\nABCDE {5}\r\nFGHIJ\r\n"},
+        )